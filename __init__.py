@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
+from homeassistant.helpers.device_registry import async_entries_for_config_entry
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.exceptions import ConfigEntryNotReady
 from pymodbus.exceptions import ConnectionException
 
@@ -17,9 +19,26 @@ from .const import (
     CONF_MODBUS_HOST,
     CONF_MODBUS_PORT,
     CONF_SLAVE_ID,
-    CONF_MODEL
+    CONF_MODEL,
+    CONF_UPDATE_INTERVAL,
+    CONF_MAX_REGISTER_CHUNK_SIZE,
+    CONF_HISTORY_HOURS,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_REGISTER_CHUNK_SIZE,
+    DEFAULT_HISTORY_HOURS,
+    PLANT_DATA,
+    SIGNAL_MODULES_CHANGED,
+    get_entry_option,
+    get_module_counts,
+    get_module_of_key,
 )
+from .cascade import cascade_inputs
+from .climate import CLIMATE_DESCRIPTIONS
 from .coordinator import LambdaHeatpumpCoordinator, ModbusConfig
+from .core import CascadeTotals, RegisterProfile
+from .metrics import async_register_metrics_view
+from .modbus_server import async_stop_modbus_server, async_update_modbus_server
+from .services import async_setup_services, async_unload_services, register_profile_path
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,8 +65,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         connection_timeout=5,  # Standard-Timeout
         retry_count=3,  # Standard-Anzahl von Wiederholungsversuchen
         retry_delay=1.0,  # Standard-Verzögerung zwischen Wiederholungsversuchen
-        update_interval=timedelta(seconds=10),  # Standard-Update-Intervall
-        max_register_chunk_size=50  # Standard-Chunk-Größe
+        update_interval=timedelta(
+            seconds=get_entry_option(entry, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        ),
+        max_register_chunk_size=get_entry_option(
+            entry, CONF_MAX_REGISTER_CHUNK_SIZE, DEFAULT_MAX_REGISTER_CHUNK_SIZE
+        ),
+        history_hours=get_entry_option(entry, CONF_HISTORY_HOURS, DEFAULT_HISTORY_HOURS),
     )
 
     coordinator = LambdaHeatpumpCoordinator(
@@ -55,11 +79,33 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         config=modbus_config
     )
 
+    # Registerprofil aus dem Service scan_registers, falls vorhanden
+    profile_path = register_profile_path(hass, entry.entry_id)
+    try:
+        profile = await hass.async_add_executor_job(RegisterProfile.load, profile_path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Registerprofil %s wird ignoriert: %s", profile_path, err)
+    else:
+        coordinator.client.apply_profile(profile)
+
+    # Stand der Energie- und Laufzeitzähler vor dem Anlegen der Sensoren laden
+    await coordinator.async_load_accumulators(entry.entry_id)
+    # Beiträge zu den Summen über die Wärmepumpen dieses und aller Controller
+    coordinator.attach_plant(hass.data.setdefault(PLANT_DATA, CascadeTotals()), entry.entry_id)
+    coordinator.async_set_cascade_inputs(cascade_inputs(get_module_counts(entry)["heatpump"]))
+
     try:
         await coordinator.async_config_entry_first_refresh()
     except ConnectionException as ex:
         _LOGGER.error("Modbus-Verbindung fehlgeschlagen während des Setups: %s", ex)
+        await coordinator.async_shutdown()
         raise ConfigEntryNotReady from ex
+    except Exception:
+        # Modbus-Thread und Socket schließen, sonst bleibt bei jedem erneuten Setup-Versuch einer zurück
+        await coordinator.async_shutdown()
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
@@ -74,6 +120,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Die erste Abfrage lief vor dem Abonnieren der Entitäten
+    await coordinator.async_refresh_subscriptions()
+    await async_setup_services(hass)
+    async_register_metrics_view(hass)
+    await async_update_modbus_server(hass, entry, coordinator)
 
     # Update-Listener hinzufügen, um bei Änderungen im Config Flow die neuen entry.data zu laden
     entry.async_on_unload(entry.add_update_listener(async_update_options))
@@ -83,10 +134,81 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        await async_stop_modbus_server(hass, entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        async_unload_services(hass)
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Entferne die Beiträge eines gelöschten Controllers aus den Anlagensummen."""
+    # Beim bloßen Entladen bleiben sie erhalten, damit die Energiesummen nicht springen
+    plant: CascadeTotals | None = hass.data.get(PLANT_DATA)
+    if plant is not None:
+        plant.discard_source(entry.entry_id)
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update options: Reload the config entry so that new data is applied."""
-    _LOGGER.debug("Konfigurationsänderungen erkannt für %s, lade die Config Entry neu.", entry.entry_id)
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Update options: Apply changes in place, reload only for new connection data."""
+    coordinator: LambdaHeatpumpCoordinator | None = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is None or (
+        coordinator.config.host,
+        coordinator.config.port,
+        coordinator.config.slave_id,
+    ) != (
+        entry.data[CONF_MODBUS_HOST],
+        entry.data[CONF_MODBUS_PORT],
+        entry.data[CONF_SLAVE_ID],
+    ):
+        _LOGGER.debug("Verbindungsdaten geändert für %s, lade die Config Entry neu.", entry.entry_id)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    _LOGGER.debug("Konfigurationsänderungen erkannt für %s, übernehme sie ohne Neuverbindung.", entry.entry_id)
+    try:
+        coordinator.async_apply_options(
+            update_interval=timedelta(
+                seconds=get_entry_option(entry, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+            ),
+            max_register_chunk_size=get_entry_option(
+                entry, CONF_MAX_REGISTER_CHUNK_SIZE, DEFAULT_MAX_REGISTER_CHUNK_SIZE
+            ),
+            history_hours=get_entry_option(entry, CONF_HISTORY_HOURS, DEFAULT_HISTORY_HOURS),
+        )
+    except ValueError as err:
+        _LOGGER.error("Ungültige Optionen für %s: %s", entry.entry_id, err)
+        return
+
+    coordinator.async_set_cascade_inputs(cascade_inputs(get_module_counts(entry)["heatpump"]))
+    await async_update_modbus_server(hass, entry, coordinator)
+    _async_remove_stale_modules(hass, entry)
+    # Die Plattformen legen Entitäten für hinzugekommene Module an
+    async_dispatcher_send(hass, SIGNAL_MODULES_CHANGED.format(entry.entry_id))
+
+@callback
+def _async_remove_stale_modules(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Entferne Entitäten und Geräte von Modulen, die nicht mehr konfiguriert sind."""
+    counts = get_module_counts(entry)
+    prefix = f"{entry.entry_id}_"
+    # Klima-Entitäten auf den Registern eines anderen Moduls folgen dessen Anzahl
+    module_types = {
+        description.key: description.module_type
+        for description in CLIMATE_DESCRIPTIONS
+        if description.module_type
+    }
+
+    def is_stale(identifier: str) -> bool:
+        key = identifier.removeprefix(prefix)
+        module = get_module_of_key(key)
+        return module is not None and module[1] > counts[module_types.get(key, module[0])]
+
+    entity_registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        if is_stale(entity_entry.unique_id):
+            _LOGGER.debug("Entferne Entität %s eines entfernten Moduls", entity_entry.entity_id)
+            entity_registry.async_remove(entity_entry.entity_id)
+
+    device_registry = async_get_device_registry(hass)
+    for device in async_entries_for_config_entry(device_registry, entry.entry_id):
+        if any(domain == DOMAIN and is_stale(identifier) for domain, identifier in device.identifiers):
+            _LOGGER.debug("Entferne Gerät %s eines entfernten Moduls", device.name)
+            device_registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
@@ -0,0 +1,119 @@
+"""Langzeitstatistik der Sensoren aus der hochfrequenten Aufzeichnung nachtragen.
+
+Die Statistik des Recorders entsteht aus den geschriebenen Zuständen; mit
+Totband, Mindestabstand oder kurzem Abfrageintervall bildet sie den
+Verlauf nur ungenau ab. Aus einer Sample-Datei (siehe core.samples)
+werden deshalb zeitgewichtete Stundenwerte (Mittel, Minimum, Maximum)
+berechnet und pro Sensor in einem Schwung über async_import_statistics
+importiert, ohne einen Zustand pro Datensatz zu schreiben.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, get_module_counts
+from .coordinator import LambdaHeatpumpCoordinator
+from .core import MAX_INTEGRATION_GAP, StatisticBuckets, ValueSpec, aggregate_samples
+from .sensor import SENSOR_DESCRIPTIONS, LambdaSensorEntityDescription, _module_descriptions, _value_spec
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant vor 2025.6 kennt nur has_mean
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Die Stunde muss abgeschlossen und vom Recorder bereits kompiliert sein
+IMPORT_DELAY = 600
+# Nur Stunden, die die Aufzeichnung zu mindestens 90 % abdeckt, ersetzen die Recorder-Statistik
+MIN_COVERAGE = 0.9
+
+
+def _statistic_sensors(hass: HomeAssistant, entry_id: str) -> Dict[str, LambdaSensorEntityDescription]:
+    """Entity-ID -> Beschreibung der Messwert-Sensoren aller Module, deren Einheit der Aufzeichnung entspricht."""
+    registry = er.async_get(hass)
+    entry = hass.config_entries.async_get_entry(entry_id)
+    sensors = {}
+    for description in _module_descriptions(SENSOR_DESCRIPTIONS, get_module_counts(entry)):
+        if description.state_class != SensorStateClass.MEASUREMENT or description.states:
+            continue
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{entry_id}_{description.key}")
+        state = hass.states.get(entity_id) if entity_id else None
+        if state is None:
+            continue
+        # Eine in Home Assistant umgestellte Einheit passt nicht mehr zu den Rohwerten
+        if state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) != description.unit_of_measurement:
+            _LOGGER.debug("Skipping %s: unit differs from the register unit", entity_id)
+            continue
+        sensors[entity_id] = description
+    return sensors
+
+
+def _statistic_rows(buckets: StatisticBuckets) -> List[StatisticData]:
+    return [
+        StatisticData(start=dt_util.utc_from_timestamp(start), mean=mean, min=minimum, max=maximum)
+        for start, mean, minimum, maximum in zip(
+            buckets.start.tolist(), buckets.mean.tolist(), buckets.min.tolist(), buckets.max.tolist()
+        )
+    ]
+
+
+def _metadata(entity_id: str, unit: Optional[str]) -> StatisticMetaData:
+    metadata: Dict[str, Any] = {
+        "has_mean": True,
+        "has_sum": False,
+        "name": None,
+        "source": "recorder",
+        "statistic_id": entity_id,
+        "unit_of_measurement": unit,
+    }
+    if StatisticMeanType is not None:
+        metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+    return StatisticMetaData(**metadata)
+
+
+async def async_import_sample_statistics(
+    hass: HomeAssistant,
+    coordinator: LambdaHeatpumpCoordinator,
+    entry_id: str,
+    path: str,
+    since: Optional[float] = None,
+) -> int:
+    """Importiere die Stundenstatistik aus der Sample-Datei path; liefert die Anzahl Stundenwerte.
+
+    Raises:
+        HomeAssistantError: Recorder nicht geladen.
+        OSError, ValueError: Sample-Datei fehlt oder ist ungültig.
+    """
+    if "recorder" not in hass.config.components:
+        raise HomeAssistantError("The recorder integration is not loaded")
+    sensors = _statistic_sensors(hass, entry_id)
+    if not sensors:
+        return 0
+    specs: Dict[str, ValueSpec] = {entity_id: _value_spec(description) for entity_id, description in sensors.items()}
+    max_gap = max(MAX_INTEGRATION_GAP, 3 * coordinator.config.update_interval.total_seconds())
+    statistics = await hass.async_add_executor_job(aggregate_samples, path, specs, 3600, max_gap, since)
+
+    latest_start = time.time() - IMPORT_DELAY - 3600
+    imported = 0
+    for entity_id, buckets in statistics.items():
+        buckets = buckets.complete(MIN_COVERAGE)
+        rows = [row for row in _statistic_rows(buckets) if row["start"].timestamp() <= latest_start]
+        if not rows:
+            continue
+        async_import_statistics(hass, _metadata(entity_id, sensors[entity_id].unit_of_measurement), rows)
+        imported += len(rows)
+        _LOGGER.debug("Importing %d hourly statistics for %s", len(rows), entity_id)
+    _LOGGER.info("Imported %d hourly statistics from %s for %d sensors", imported, path, len(statistics))
+    return imported
@@ -0,0 +1,276 @@
+"""Mitschnitt des Modbus-Verkehrs und deterministische Wiedergabe.
+
+Der Mitschnitt ist ein kompaktes, nur angehängtes Binärformat: ein
+Dateikopf (CAPTURE_MAGIC, Version) gefolgt von Frames mit Zeitstempel,
+Funktionscode, Status, Startadresse, Registeranzahl, Latenz und den
+Rohwörtern der Antwort (bzw. den geschriebenen Wörtern bei Schreibzugriffen).
+
+Das Modul ist unabhängig von Home Assistant, damit Mitschnitte auch in den
+Werkzeugen unter tools/ ausgewertet werden können.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymodbus.exceptions import ConnectionException
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"LMBC"
+CAPTURE_VERSION = 1
+CAPTURE_SUFFIX = ".lmbc"
+_HEADER = struct.Struct(">4sB3x")
+# Zeitstempel (Unix), Funktionscode, Status, Adresse, Anzahl, Latenz (s), Anzahl Wörter
+_FRAME = struct.Struct(">dBBHHfH")
+
+READ_HOLDING_REGISTERS = 3
+READ_INPUT_REGISTERS = 4
+WRITE_SINGLE_REGISTER = 6
+WRITE_MULTIPLE_REGISTERS = 16
+READ_FUNCTIONS = (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS)
+
+STATUS_OK = 0
+# Antwort mit Modbus-Exception bzw. isError()
+STATUS_ERROR = 1
+# Der Aufruf selbst ist fehlgeschlagen (Timeout, Verbindungsabbruch)
+STATUS_FAILED = 2
+
+# Wie weit die deterministische Wiedergabe nach einer passenden Anfrage sucht
+REPLAY_LOOKAHEAD = 1000
+
+# Gepufferte Frames werden spätestens nach dieser Anzahl auf die Platte geschrieben
+FLUSH_EVERY = 64
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    """Eine mitgeschnittene Modbus-Anfrage samt Antwort."""
+    timestamp: float
+    function_code: int
+    status: int
+    address: int
+    count: int
+    latency: float
+    words: Tuple[int, ...]
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+class CaptureWriter:
+    """Hängt Frames an eine Mitschnittdatei an.
+
+    record() wird im Modbus-Thread aufgerufen; die Datei wird deshalb nie
+    vom Event-Loop aus beschrieben.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file: Optional[BinaryIO] = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+
+    def record(
+        self,
+        function_code: int,
+        address: int,
+        count: int,
+        words: Sequence[int],
+        latency: float,
+        status: int = STATUS_OK,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Schreibe einen Frame."""
+        frame = _FRAME.pack(
+            time.time() if timestamp is None else timestamp,
+            function_code,
+            status,
+            address,
+            count,
+            latency,
+            len(words),
+        ) + struct.pack(f">{len(words)}H", *words)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(frame)
+            self.frames += 1
+            if self.frames % FLUSH_EVERY == 0:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_capture(path: str) -> Iterator[CapturedFrame]:
+    """Lies alle Frames einer Mitschnittdatei.
+
+    Ein unvollständiger letzter Frame (z. B. nach einem Absturz) wird
+    ignoriert.
+    """
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a Lambda capture file")
+        magic, version = _HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"{path} is not a Lambda capture file (version {CAPTURE_VERSION})")
+        while True:
+            raw = file.read(_FRAME.size)
+            if len(raw) < _FRAME.size:
+                return
+            timestamp, function_code, status, address, count, latency, length = _FRAME.unpack(raw)
+            payload = file.read(length * 2)
+            if len(payload) < length * 2:
+                return
+            yield CapturedFrame(
+                timestamp, function_code, status, address, count, latency,
+                struct.unpack(f">{length}H", payload),
+            )
+
+
+class ReplayResponse:
+    """Antwort der Wiedergabe mit der von pymodbus bekannten Schnittstelle."""
+
+    def __init__(self, registers: Optional[List[int]] = None, error: Optional[str] = None):
+        self.registers = registers or []
+        self._error = error
+
+    def isError(self) -> bool:  # noqa: N802 - Name wie in pymodbus
+        return self._error is not None
+
+    def __str__(self) -> str:
+        return self._error or f"ReplayResponse({len(self.registers)} registers)"
+
+
+class ReplayClient:
+    """Ersatz für ModbusTcpClient, der einen Mitschnitt wiedergibt.
+
+    Mit speed > 0 läuft die Wiedergabe in Echtzeit (bzw. beschleunigt um
+    den Faktor speed): Eine Leseanfrage erhält die Wörter aus allen bis zum
+    aktuellen Wiedergabezeitpunkt mitgeschnittenen Antworten, inklusive der
+    aufgezeichneten Latenz.
+
+    Mit speed = 0 ist die Wiedergabe vollständig deterministisch und ohne
+    Wartezeit: Jede Leseanfrage springt zum nächsten Frame mit gleichem
+    Funktionscode, gleicher Adresse und gleicher Anzahl. So liefert jeder
+    Abfragezyklus exakt die Daten des entsprechenden mitgeschnittenen
+    Zyklus. Ist der Mitschnitt erschöpft (exhausted), schlagen weitere
+    Anfragen wie bei einer unterbrochenen Verbindung fehl; in Echtzeit
+    bleibt das Registerabbild auf dem letzten Stand stehen.
+    """
+
+    def __init__(self, frames: Sequence[CapturedFrame], speed: float = 1.0):
+        if speed < 0:
+            raise ValueError(f"Invalid replay speed: {speed}")
+        self.frames = [frame for frame in frames if frame.function_code in READ_FUNCTIONS]
+        self.speed = speed
+        self.position = 0
+        self.writes: List[Tuple[int, Tuple[int, ...]]] = []
+        self._image: Dict[int, int] = {}
+        self._started: Optional[float] = None
+        self._connected = False
+
+    @classmethod
+    def from_file(cls, path: str, speed: float = 1.0) -> "ReplayClient":
+        return cls(list(read_capture(path)), speed)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self.frames)
+
+    def connect(self) -> bool:
+        self._connected = True
+        if self._started is None:
+            self._started = time.monotonic()
+        return True
+
+    def close(self) -> None:
+        self._connected = False
+
+    def is_socket_open(self) -> bool:
+        return self._connected
+
+    def _apply(self, frame: CapturedFrame) -> None:
+        if frame.ok:
+            for offset, word in enumerate(frame.words):
+                self._image[frame.address + offset] = word
+
+    def _advance_to_key(self, function_code: int, address: int, count: int) -> Optional[CapturedFrame]:
+        """Springe zum nächsten Frame mit gleicher Anfrage.
+
+        Gibt es keinen (z. B. weil sich der Read-Plan seit der Aufzeichnung
+        geändert hat), rückt die Wiedergabe nur um einen Frame vor und die
+        Antwort kommt aus dem bisher aufgebauten Registerabbild.
+        """
+        key = (function_code, address, count)
+        end = min(len(self.frames), self.position + REPLAY_LOOKAHEAD)
+        for index in range(self.position, end):
+            frame = self.frames[index]
+            if (frame.function_code, frame.address, frame.count) == key:
+                for skipped in self.frames[self.position:index]:
+                    self._apply(skipped)
+                self.position = index + 1
+                return frame
+        self._apply(self.frames[self.position])
+        self.position += 1
+        return None
+
+    def _advance_to_time(self) -> None:
+        if not self.frames:
+            return
+        clock = self.frames[0].timestamp + (time.monotonic() - self._started) * self.speed
+        while not self.exhausted and self.frames[self.position].timestamp <= clock:
+            self._apply(self.frames[self.position])
+            self.position += 1
+
+    def _read(self, function_code: int, address: int, count: int) -> ReplayResponse:
+        if not self._connected:
+            raise ConnectionException("Replay client is not connected")
+        if self.speed == 0:
+            if self.exhausted:
+                raise ConnectionException("End of capture reached")
+            frame = self._advance_to_key(function_code, address, count)
+            if frame is not None:
+                self._apply(frame)
+                if not frame.ok:
+                    return ReplayResponse(error=f"Recorded error for {count} registers at {address}")
+        else:
+            self._advance_to_time()
+            latency = next(
+                (f.latency for f in self.frames[self.position:] if (f.function_code, f.address, f.count) == (function_code, address, count)),
+                0.0,
+            )
+            if latency:
+                time.sleep(latency / self.speed)
+        words = [self._image.get(address + offset) for offset in range(count)]
+        if None in words:
+            return ReplayResponse(error=f"No recorded data for {count} registers at {address}")
+        return ReplayResponse(words)
+
+    def read_holding_registers(self, address: int, count: int = 1, slave: int = 1, **kwargs) -> ReplayResponse:
+        return self._read(READ_HOLDING_REGISTERS, address, count)
+
+    def read_input_registers(self, address: int, count: int = 1, slave: int = 1, **kwargs) -> ReplayResponse:
+        return self._read(READ_INPUT_REGISTERS, address, count)
+
+    def write_register(self, address: int, value: int, slave: int = 1, **kwargs) -> ReplayResponse:
+        return self.write_registers(address, [value], slave)
+
+    def write_registers(self, address: int, values: Sequence[int], slave: int = 1, **kwargs) -> ReplayResponse:
+        """Schreibzugriffe werden nur protokolliert, der Mitschnitt bleibt maßgeblich."""
+        self.writes.append((address, tuple(values)))
+        return ReplayResponse()
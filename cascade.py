@@ -0,0 +1,53 @@
+"""Beiträge der Wärmepumpen-Module zu den Anlagensummen.
+
+Die Größen entsprechen den Sensoren der ersten Wärmepumpe (Leistungsaufnahme,
+berechnete thermische Leistung, Energiezähler) und werden für jedes weitere
+Modul auf dessen Registerfenster verschoben. Die Beiträge registriert der
+Koordinator unabhängig davon, ob die Sensoren der einzelnen Module aktiv
+sind, damit die Summen vollständig bleiben.
+"""
+from __future__ import annotations
+
+from typing import Final, List
+
+from .core import CascadeInput, module_input
+from .sensor import (
+    ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY,
+    DERIVED_SENSOR_DESCRIPTIONS_BY_KEY,
+    SENSOR_DESCRIPTIONS_BY_KEY,
+    LambdaAccumulatorSensorEntityDescription,
+    _derived_spec,
+    _value_spec,
+)
+
+
+def _accumulator_input(quantity: str, description: LambdaAccumulatorSensorEntityDescription) -> CascadeInput:
+    return CascadeInput(
+        quantity=quantity,
+        module=1,
+        accumulator=description.accumulator,
+        factory=description.factory,
+        value_fn=description.value_fn,
+    )
+
+
+# Beiträge der ersten Wärmepumpe je Größe
+CASCADE_INPUTS: Final[tuple[CascadeInput, ...]] = (
+    CascadeInput(
+        quantity="electrical_power",
+        module=1,
+        spec=_value_spec(SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_frequency_inverter_actual_power_consumption"]),
+    ),
+    CascadeInput(
+        quantity="thermal_power",
+        module=1,
+        spec=_derived_spec(DERIVED_SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_thermal_power"]),
+    ),
+    _accumulator_input("electrical_energy", ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_electrical_energy"]),
+    _accumulator_input("thermal_energy", ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_thermal_energy"]),
+)
+
+
+def cascade_inputs(heatpumps: int) -> List[CascadeInput]:
+    """Die Beiträge aller heatpumps Wärmepumpen-Module eines Controllers."""
+    return [module_input(template, index) for index in range(1, heatpumps + 1) for template in CASCADE_INPUTS]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 from typing import Any, final
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from homeassistant.components.climate import (
     ClimateEntity,
@@ -15,12 +15,16 @@ from homeassistant.components.climate import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
-from .coordinator import LambdaHeatpumpCoordinator
+from .const import DOMAIN, MANUFACTURER, SIGNAL_MODULES_CHANGED, get_module_counts
+from .coordinator import LambdaHeatpumpCoordinator, ValueSpec
+from .core import MODULE_SEGMENT_SIZE
+from .entity import LambdaHeatpumpEntity
+from .logs import ENTITIES
+from .sensor import _get_device_name
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +43,9 @@ class LambdaClimateEntityDescription(ClimateEntityDescription):
     force_heat_only: bool = False
     device_type: str = "boiler"  # "boiler", "heatpump", "buffer", etc.
     device_index: int = 1  # Index des Geräts (1-based)
+    # Module whose address window and count the registers follow; None = device_type
+    module_type: str | None = None
+    module_name: str | None = None  # Name of further modules, e.g. "Heating Circuit"
     supports_cooling: bool = False
     supports_auto: bool = False
     supports_fan_only: bool = False
@@ -87,6 +94,9 @@ CLIMATE_DESCRIPTIONS: tuple[LambdaClimateEntityDescription, ...] = (
         force_heat_only=True,
         device_type="heatpump",
         device_index=1,
+        # Registers of heating circuit 1: one entity per heating circuit
+        module_type="heatingcircuit",
+        module_name="Heating Circuit",
         supports_cooling=False,
         supports_auto=False,
         supports_fan_only=False,
@@ -119,7 +129,7 @@ CLIMATE_DESCRIPTIONS: tuple[LambdaClimateEntityDescription, ...] = (
     ),
 )
 
-class LambdaHeatpumpClimate(CoordinatorEntity[LambdaHeatpumpCoordinator], ClimateEntity):
+class LambdaHeatpumpClimate(LambdaHeatpumpEntity, ClimateEntity):
     """Representation of a Lambda Heatpump climate device."""
 
     _attr_has_entity_name = True
@@ -161,77 +171,62 @@ class LambdaHeatpumpClimate(CoordinatorEntity[LambdaHeatpumpCoordinator], Climat
         if not description.force_heat_only:
             self._attr_hvac_modes.append(HVACMode.OFF)
         
-        # Register required modbus registers
-        _LOGGER.debug(f"Registering registers for {description.name}:")
-        _LOGGER.debug(f"  - Temperature register: {description.register_temp} ({description.data_type})")
-        coordinator.add_register(description.register_temp, description.data_type)
-        
-        _LOGGER.debug(f"  - Setpoint register: {description.register_setpoint} ({description.data_type})")
-        coordinator.add_register(description.register_setpoint, description.data_type)
-        
+        # Pre-scaled values computed by the coordinator once per poll,
+        # subscribed in async_added_to_hass
+        self._temp_value = ValueSpec(
+            register=description.register_temp,
+            data_type=description.data_type,
+            factor=description.factor,
+        )
+        self._setpoint_value = ValueSpec(
+            register=description.register_setpoint,
+            data_type=description.data_type,
+            factor=description.factor,
+            digits=1,
+        )
+        self._mode_value = None
+        self._value_specs = (self._temp_value, self._setpoint_value)
         if description.register_mode is not None:
-            _LOGGER.debug(f"  - Mode register: {description.register_mode} ({description.data_type})")
-            coordinator.add_register(description.register_mode, description.data_type)
-            
-        # Debug-Ausgabe der registrierten Register
-        _LOGGER.debug(f"Registered registers for {description.name}:")
-        for register, reg_type in coordinator._registers_to_read.items():
-            _LOGGER.debug(f"  - Register {register} ({reg_type})")
+            self._mode_value = ValueSpec(
+                register=description.register_mode,
+                data_type=description.data_type,
+            )
+            self._value_specs += (self._mode_value,)
 
-    @property
-    def current_temperature(self) -> float | None:
-        """Return the current temperature."""
-        try:
-            register_key = str(self.entity_description.register_temp)
-            if register_key not in self.coordinator.data:
-                _LOGGER.debug(f"Temperature register {self.entity_description.register_temp} not found in coordinator data for {self.name}")
-                return None
-                
-            value = self.coordinator.data[register_key]
-            if value is None:
-                _LOGGER.debug(f"Temperature register {self.entity_description.register_temp} has no value for {self.name}")
-                return None
-                
-            return float(value) * self.entity_description.factor
-            
-        except Exception as e:
-            _LOGGER.error(f"Error getting current temperature for {self.name}: {e}")
-            return None
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator values and take over the current ones."""
+        await super().async_added_to_hass()
+        self._update_from_values()
 
-    @property
-    def target_temperature(self) -> float | None:
-        """Return the temperature we try to reach."""
-        if (value := self.coordinator.data.get(str(self.entity_description.register_setpoint))) is not None:
-            return round(value * self.entity_description.factor, 1)
-        return None
+    @callback
+    def _update_from_values(self) -> None:
+        """Take over the coordinator's pre-scaled values, once per poll."""
+        description = self.entity_description
+        values = self.coordinator.values
+        current_temp = values.get(self._temp_value)
+        target_temp = values.get(self._setpoint_value)
+        self._attr_current_temperature = current_temp
+        self._attr_target_temperature = target_temp
 
-    @property
-    def hvac_mode(self) -> HVACMode:
-        """Return current hvac mode."""
-        if self.entity_description.force_heat_only:
-            return HVACMode.HEAT
-            
-        if self.entity_description.register_mode is None:
-            return HVACMode.HEAT
-            
-        if (mode := self.coordinator.data.get(str(self.entity_description.register_mode))) is not None:
-            if self.entity_description.supports_cooling:
-                return HVACMode.COOL if mode == 2 else HVACMode.HEAT
-            return HVACMode.HEAT if mode else HVACMode.OFF
-        return HVACMode.OFF
+        hvac_mode = HVACMode.HEAT
+        if not description.force_heat_only and self._mode_value is not None:
+            mode = values.get(self._mode_value)
+            if mode is None:
+                hvac_mode = HVACMode.OFF
+            elif description.supports_cooling:
+                hvac_mode = HVACMode.COOL if mode == 2 else HVACMode.HEAT
+            else:
+                hvac_mode = HVACMode.HEAT if mode else HVACMode.OFF
+        self._attr_hvac_mode = hvac_mode
 
-    @property
-    def hvac_action(self) -> HVACAction | None:
-        """Return the current running hvac operation."""
-        if self.hvac_mode == HVACMode.OFF and not self.entity_description.force_heat_only:
-            return HVACAction.OFF
-            
-        if None in (current_temp := self.current_temperature, target_temp := self.target_temperature):
-            return None
-            
-        if self.hvac_mode == HVACMode.COOL:
-            return HVACAction.COOLING if current_temp > target_temp else HVACAction.IDLE
-        return HVACAction.HEATING if current_temp < target_temp else HVACAction.IDLE
+        if hvac_mode == HVACMode.OFF and not description.force_heat_only:
+            self._attr_hvac_action = HVACAction.OFF
+        elif current_temp is None or target_temp is None:
+            self._attr_hvac_action = None
+        elif hvac_mode == HVACMode.COOL:
+            self._attr_hvac_action = HVACAction.COOLING if current_temp > target_temp else HVACAction.IDLE
+        else:
+            self._attr_hvac_action = HVACAction.HEATING if current_temp < target_temp else HVACAction.IDLE
 
     @property
     def target_temperature_step(self) -> float:
@@ -286,26 +281,30 @@ class LambdaHeatpumpClimate(CoordinatorEntity[LambdaHeatpumpCoordinator], Climat
         try:
             self._attr_available = self.coordinator.last_update_success
             if not self._attr_available:
-                _LOGGER.warning(f"{self.name} is not available")
+                ENTITIES.debug("%s is not available", self.entity_id)
                 return
                 
-            # Überprüfe, ob die erforderlichen Register vorhanden sind
-            temp_key = str(self.entity_description.register_temp)
-            setpoint_key = str(self.entity_description.register_setpoint)
-            
-            if temp_key not in self.coordinator.data:
-                _LOGGER.debug(f"Temperature register {self.entity_description.register_temp} not found in coordinator data, waiting for next update")
+            # Überprüfe, ob die erforderlichen Werte vorhanden sind
+            values = self.coordinator.values
+            if values.get(self._temp_value) is None:
+                ENTITIES.debug(
+                    "Temperature register %s has no value yet, waiting for next update",
+                    self.entity_description.register_temp,
+                )
                 return
-                
-            if setpoint_key not in self.coordinator.data:
-                _LOGGER.debug(f"Setpoint register {self.entity_description.register_setpoint} not found in coordinator data, waiting for next update")
+
+            if values.get(self._setpoint_value) is None:
+                ENTITIES.debug(
+                    "Setpoint register %s has no value yet, waiting for next update",
+                    self.entity_description.register_setpoint,
+                )
                 return
-                
-            _LOGGER.debug(f"Updating {self.name} with new data")
+
+            self._update_from_values()
             super()._handle_coordinator_update()
             
         except Exception as e:
-            _LOGGER.error(f"Error updating {self.name}: {e}")
+            _LOGGER.error("Error updating %s: %s", self.entity_id, e)
             self._attr_available = False
 
 async def async_setup_entry(
@@ -316,55 +315,84 @@ async def async_setup_entry(
     """Set up Lambda heatpump climate entities from a config entry."""
     coordinator: LambdaHeatpumpCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     model = config_entry.data.get("model", "Unknown Model")
-    
-    # Get device counts from config
-    num_boilers = config_entry.data.get("amount_of_boilers", 1)
-    num_heatpumps = config_entry.data.get("amount_of_heatpumps", 1)
-    num_buffers = config_entry.data.get("amount_of_buffers", 1)
+    created: set[str] = set()
+
+    @callback
+    def async_add_module_climates() -> None:
+        """Create climate entities for configured modules that do not exist yet."""
+        counts = get_module_counts(config_entry)
+        descriptions = list(_module_descriptions(counts))
+        # Module removed: the entity is deleted via the entity registry
+        created.intersection_update(description.key for description in descriptions)
+        entities: list[LambdaHeatpumpClimate] = []
+
+        for description in descriptions:
+            device_type = description.device_type
+            i = description.device_index
+            if description.key in created:
+                continue
 
-    entities: list[LambdaHeatpumpClimate] = []
-    
-    # Create entities for each device type
-    for device_type, count in [
-        ("boiler", num_boilers),
-        ("heatpump", num_heatpumps),
-        ("buffer", num_buffers)
-    ]:
-        for i in range(1, count + 1):
             device_info = DeviceInfo(
                 identifiers={(DOMAIN, f"{config_entry.entry_id}_{device_type}_{i}")},
-                name=f"{device_type.capitalize()} {i}",
+                name=_get_device_name(f"{device_type}_{i}"),
                 manufacturer=MANUFACTURER,
                 model=model,
                 via_device=(DOMAIN, config_entry.entry_id),
             )
 
-            # Find matching description
-            for description in CLIMATE_DESCRIPTIONS:
-                if description.device_type == device_type and description.device_index == i:
-                    _LOGGER.debug(f"Creating {device_type} {i} with registers: temp={description.register_temp}, setpoint={description.register_setpoint}")
-                    
-                    # Register required modbus registers
-                    coordinator.add_register(description.register_temp, description.data_type)
-                    coordinator.add_register(description.register_setpoint, description.data_type)
-                    if description.register_mode is not None:
-                        coordinator.add_register(description.register_mode, description.data_type)
-                        
-                    # Debug-Ausgabe der registrierten Register
-                    _LOGGER.debug(f"Registered registers for {device_type} {i}:")
-                    _LOGGER.debug(f"  - Temperature: {description.register_temp} ({description.data_type})")
-                    _LOGGER.debug(f"  - Setpoint: {description.register_setpoint} ({description.data_type})")
-                    if description.register_mode is not None:
-                        _LOGGER.debug(f"  - Mode: {description.register_mode} ({description.data_type})")
-                        
-                    entities.append(
-                        LambdaHeatpumpClimate(
-                            coordinator=coordinator,
-                            config_entry=config_entry,
-                            description=description,
-                            device_info=device_info,
-                        )
-                    )
-                    break
-
-    async_add_entities(entities, update_before_add=True)
\ No newline at end of file
+            _LOGGER.debug(
+                "Creating %s %d with registers: temp=%s, setpoint=%s",
+                device_type, i, description.register_temp, description.register_setpoint,
+            )
+
+            entities.append(
+                LambdaHeatpumpClimate(
+                    coordinator=coordinator,
+                    config_entry=config_entry,
+                    description=description,
+                    device_info=device_info,
+                )
+            )
+            created.add(description.key)
+
+        if entities:
+            async_add_entities(entities, update_before_add=True)
+
+    async_add_module_climates()
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_MODULES_CHANGED.format(config_entry.entry_id), async_add_module_climates
+        )
+    )
+
+
+def _module_descriptions(counts: dict[str, int]):
+    """Climate descriptions for every configured module."""
+    for description in CLIMATE_DESCRIPTIONS:
+        for index in range(1, counts.get(description.module_type or description.device_type, 0) + 1):
+            yield _module_description(description, index)
+
+
+def _module_description(
+    description: LambdaClimateEntityDescription, index: int
+) -> LambdaClimateEntityDescription:
+    """Shift a description of the first module to module index (1-based).
+
+    Descriptions with a module_type other than their device_type (the
+    heatpump climate on heating-circuit registers) become entities of that
+    module from index 2 on.
+    """
+    if index == 1:
+        return description
+    offset = (index - 1) * MODULE_SEGMENT_SIZE
+    module_type = description.module_type or description.device_type
+    return replace(
+        description,
+        key=f"{module_type}_{index}_climate",
+        name=f"{description.module_name or module_type.capitalize()} {index}",
+        device_type=module_type,
+        device_index=index,
+        register_temp=description.register_temp + offset,
+        register_setpoint=description.register_setpoint + offset,
+        register_mode=None if description.register_mode is None else description.register_mode + offset,
+    )
@@ -26,6 +26,22 @@ from .const import (
     CONF_AMOUNT_OF_BUFFERS,
     CONF_AMOUNT_OF_SOLAR,
     CONF_AMOUNT_OF_HEAT_CIRCUITS,
+    CONF_UPDATE_INTERVAL,
+    CONF_MAX_REGISTER_CHUNK_SIZE,
+    CONF_PROMETHEUS_METRICS,
+    CONF_MODBUS_SERVER,
+    CONF_MODBUS_SERVER_PORT,
+    CONF_MODBUS_SERVER_HOST,
+    CONF_HISTORY_HOURS,
+    CONF_PLANT_TOTALS,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MODBUS_SERVER_PORT,
+    DEFAULT_MODBUS_SERVER_HOST,
+    DEFAULT_MAX_REGISTER_CHUNK_SIZE,
+    DEFAULT_HISTORY_HOURS,
+    MAX_HISTORY_HOURS,
+    MODULE_TYPES,
+    get_entry_option,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -188,35 +204,54 @@ class LambdaHeatpumpsOptionsFlow(config_entries.OptionsFlow):
 
     def _get_options_schema(self) -> vol.Schema:
         """Return the options schema."""
-        return vol.Schema(
-            {
-                vol.Required(
-                    CONF_MODBUS_HOST,
-                    default=self._config_entry.data[CONF_MODBUS_HOST],
-                ): str,
-                vol.Required(
-                    CONF_SLAVE_ID,
-                    default=self._config_entry.data[CONF_SLAVE_ID],
-                ): int,
-                vol.Required(
-                    CONF_AMOUNT_OF_HEATPUMPS,
-                    default=self._config_entry.options.get(CONF_AMOUNT_OF_HEATPUMPS, 1),
-                ): int,
-                vol.Required(
-                    CONF_AMOUNT_OF_BOILERS,
-                    default=self._config_entry.options.get(CONF_AMOUNT_OF_BOILERS, 1),
-                ): int,
-                vol.Required(
-                    CONF_AMOUNT_OF_BUFFERS,
-                    default=self._config_entry.options.get(CONF_AMOUNT_OF_BUFFERS, 1),
-                ): int,
-                vol.Required(
-                    CONF_AMOUNT_OF_SOLAR,
-                    default=self._config_entry.options.get(CONF_AMOUNT_OF_SOLAR, 0),
-                ): int,
-                vol.Required(
-                    CONF_AMOUNT_OF_HEAT_CIRCUITS,
-                    default=self._config_entry.options.get(CONF_AMOUNT_OF_HEAT_CIRCUITS, 1),
-                ): int,
-            }
-        )
+        schema = {
+            vol.Required(
+                CONF_MODBUS_HOST,
+                default=self._config_entry.data[CONF_MODBUS_HOST],
+            ): str,
+            vol.Required(
+                CONF_SLAVE_ID,
+                default=self._config_entry.data[CONF_SLAVE_ID],
+            ): int,
+        }
+        # Modulanzahlen, Abfrageintervall, Chunk-Größe und Verlauf werden ohne Neuladen übernommen
+        for conf_key, default in MODULE_TYPES.values():
+            schema[vol.Required(
+                conf_key,
+                default=get_entry_option(self._config_entry, conf_key, default),
+            )] = vol.All(int, vol.Range(min=0))
+        schema[vol.Required(
+            CONF_UPDATE_INTERVAL,
+            default=get_entry_option(self._config_entry, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+        )] = vol.All(int, vol.Range(min=1))
+        schema[vol.Required(
+            CONF_MAX_REGISTER_CHUNK_SIZE,
+            default=get_entry_option(
+                self._config_entry, CONF_MAX_REGISTER_CHUNK_SIZE, DEFAULT_MAX_REGISTER_CHUNK_SIZE
+            ),
+        )] = vol.All(int, vol.Range(min=1, max=125))
+        schema[vol.Required(
+            CONF_HISTORY_HOURS,
+            default=get_entry_option(self._config_entry, CONF_HISTORY_HOURS, DEFAULT_HISTORY_HOURS),
+        )] = vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_HISTORY_HOURS))
+        schema[vol.Required(
+            CONF_PROMETHEUS_METRICS,
+            default=get_entry_option(self._config_entry, CONF_PROMETHEUS_METRICS, False),
+        )] = bool
+        schema[vol.Required(
+            CONF_PLANT_TOTALS,
+            default=get_entry_option(self._config_entry, CONF_PLANT_TOTALS, False),
+        )] = bool
+        schema[vol.Required(
+            CONF_MODBUS_SERVER,
+            default=get_entry_option(self._config_entry, CONF_MODBUS_SERVER, False),
+        )] = bool
+        schema[vol.Required(
+            CONF_MODBUS_SERVER_PORT,
+            default=get_entry_option(self._config_entry, CONF_MODBUS_SERVER_PORT, DEFAULT_MODBUS_SERVER_PORT),
+        )] = vol.All(int, vol.Range(min=1, max=65535))
+        schema[vol.Required(
+            CONF_MODBUS_SERVER_HOST,
+            default=get_entry_option(self._config_entry, CONF_MODBUS_SERVER_HOST, DEFAULT_MODBUS_SERVER_HOST),
+        )] = str
+        return vol.Schema(schema)
@@ -1,7 +1,3 @@
-import json
-from homeassistant.const import CONF_LANGUAGE
-
-
 # Domain
 DOMAIN = "lambda_heatpumps"
 
@@ -20,8 +16,106 @@ CONF_AMOUNT_OF_BUFFERS = "amount_of_buffers"
 CONF_AMOUNT_OF_SOLAR = "amount_of_solar"
 CONF_AMOUNT_OF_HEAT_CIRCUITS = "amount_of_heat_circuits"
 
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_MAX_REGISTER_CHUNK_SIZE = "max_register_chunk_size"
+CONF_PROMETHEUS_METRICS = "prometheus_metrics"
+CONF_MODBUS_SERVER = "modbus_server"
+CONF_MODBUS_SERVER_PORT = "modbus_server_port"
+CONF_MODBUS_SERVER_HOST = "modbus_server_host"
+CONF_HISTORY_HOURS = "history_hours"
+CONF_PLANT_TOTALS = "plant_totals"
+
 DEFAULT_PORT = 502
 DEFAULT_SLAVE_ID = 1
+DEFAULT_UPDATE_INTERVAL = 10  # Sekunden
+DEFAULT_MAX_REGISTER_CHUNK_SIZE = 50
+DEFAULT_MODBUS_SERVER_PORT = 5502
+# Nur lokal erreichbar; für andere Rechner im Netz z. B. "0.0.0.0"
+DEFAULT_MODBUS_SERVER_HOST = "127.0.0.1"
+DEFAULT_HISTORY_HOURS = 6  # Stunden Verlauf im Speicher, 0 = aus
+MAX_HISTORY_HOURS = 48
+
+# Gespeicherter Zustand der Energie- und Laufzeitzähler je Config Entry
+ACCUMULATOR_STORAGE_KEY = f"{DOMAIN}.accumulators.{{}}"
+ACCUMULATOR_STORAGE_VERSION = 1
+ACCUMULATOR_SAVE_DELAY = 300  # Sekunden
+
+# Anlagensummen über alle Config Entries (core.CascadeTotals) in hass.data
+PLANT_DATA = f"{DOMAIN}_plant"
+
+# Modultypen mit konfigurierbarer Anzahl:
+# Präfix im Entity-Key => (Konfigurationsschlüssel, Standardanzahl)
+MODULE_TYPES = {
+    "heatpump": (CONF_AMOUNT_OF_HEATPUMPS, 1),
+    "boiler": (CONF_AMOUNT_OF_BOILERS, 1),
+    "buffer": (CONF_AMOUNT_OF_BUFFERS, 0),
+    "solar": (CONF_AMOUNT_OF_SOLAR, 0),
+    "heatingcircuit": (CONF_AMOUNT_OF_HEAT_CIRCUITS, 1),
+}
+
+# Adressraum je Modultyp: erstes Register und höchste Anzahl Module;
+# jedes Modul belegt ein 100er-Fenster ab seiner Basisadresse
+MODULE_ADDRESS_SPACE = {
+    "general_ambient": (0, 1),
+    "e_manager": (100, 1),
+    "heatpump": (1000, 3),
+    "boiler": (2000, 5),
+    "buffer": (3000, 5),
+    "solar": (4000, 2),
+    "heatingcircuit": (5000, 12),
+}
+
+# Dispatcher-Signal, wenn sich die Modulanzahlen eines Config Entries geändert haben
+SIGNAL_MODULES_CHANGED = f"{DOMAIN}_modules_changed_{{}}"
+
+# Services
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_PROFILE = "profile"
+SERVICE_START_TRACE = "start_trace"
+SERVICE_STOP_TRACE = "stop_trace"
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_SCAN_REGISTERS = "scan_registers"
+SERVICE_START_SAMPLES = "start_samples"
+SERVICE_STOP_SAMPLES = "stop_samples"
+SERVICE_EXPORT_SAMPLES = "export_samples"
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_FILENAME = "filename"
+ATTR_CYCLES = "cycles"
+ATTR_TOP = "top"
+ATTR_SECONDS = "seconds"
+ATTR_SIZE_MB = "size_mb"
+ATTR_FORMAT = "format"
+
+
+
+def get_entry_option(entry, key, default=None):
+    """Lies einen Konfigurationswert, Optionen haben Vorrang vor den Daten."""
+    return entry.options.get(key, entry.data.get(key, default))
+
+def get_module_counts(entry) -> dict:
+    """Gib die konfigurierte Anzahl je Modultyp zurück."""
+    return {
+        module_type: get_entry_option(entry, conf_key, default)
+        for module_type, (conf_key, default) in MODULE_TYPES.items()
+    }
+
+def get_module_of_key(key: str):
+    """Ermittle Modultyp und Modulnummer aus einem Key wie "boiler_2_operating_state".
+
+    Gibt None für Keys ohne Modulnummer zurück (General Ambient, E-Manager).
+    """
+    module_type, _, rest = key.partition("_")
+    index = rest.split("_", 1)[0]
+    if module_type in MODULE_TYPES and index.isdigit():
+        return module_type, int(index)
+    return None
+
+def module_key(key: str, index: int) -> str:
+    """Key des ersten Moduls für Modul index, z. B. "boiler_1_operating_state" -> "boiler_2_operating_state"."""
+    module_type = key.split("_", 1)[0]
+    return key.replace(f"{module_type}_1_", f"{module_type}_{index}_", 1)
 
 
 
@@ -632,6 +726,13 @@ def get_hp_states(language="en"):
     return states
 
 
+# Zustände (Register 1002), in denen der Verdichter läuft, und der Abtauzustand
+HP_STATES_COMPRESSOR_RUNNING = frozenset({5, 6, 7, 9, 10})
+HP_STATE_DEFROSTING = 10
+# Anforderungsart (Register 1015) der Warmwasserbereitung
+HP_REQUEST_DHW = 4
+
+
 def get_hp_operation_states(language="en"):
     # Beispielhafte Zustände, diese sollten entsprechend der tatsächlichen Zustände angepasst werden
     states = {
@@ -1,91 +1,107 @@
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pymodbus.exceptions import ConnectionException
-from pymodbus.client import ModbusTcpClient
-from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
-from pymodbus.constants import Endian
 from datetime import timedelta
 import logging
-from typing import Dict, Any, Optional, Union, List
-import asyncio
-from functools import wraps
-from dataclasses import dataclass
-import struct
-from homeassistant.core import HomeAssistant
+from typing import Callable, Dict, Any, Iterable, Optional, List, Set, Tuple
+import time
+from collections import deque
+from dataclasses import replace
+from functools import partial
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 
-logging.getLogger("pymodbus.logging").setLevel(logging.ERROR)
+from .capture import CaptureWriter
+from .const import ACCUMULATOR_SAVE_DELAY, ACCUMULATOR_STORAGE_KEY, ACCUMULATOR_STORAGE_VERSION
+from .core import (
+    Accumulator,
+    MAX_INTEGRATION_GAP,
+    AccumulatorSet,
+    CascadeInput,
+    CascadeTotals,
+    DerivedSpec,
+    LambdaClient,
+    LambdaClientError,
+    ModbusConfig,
+    RegisterBlock,
+    RegisterHistory,
+    RegisterProfile,
+    RegisterScanner,
+    SampleWriter,
+    ValueSpec,
+    export_samples,
+    is_significant,
+)
+from .instrumentation import CycleMetrics, PollStatistics
+from .logs import ENTITIES
+from .profiler import PollProfiler
+from .tracing import CAT_NOTIFY, TID_LOOP, TraceRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
-@dataclass
-class ModbusConfig:
-    """Konfiguration für die Modbus-Verbindung."""
-    host: str
-    port: int
-    slave_id: int
-    connection_timeout: int = 5
-    retry_count: int = 3
-    retry_delay: float = 1.0
-    update_interval: timedelta = timedelta(seconds=10)
-    max_register_chunk_size: int = 50
-
-def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(max_retries):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    if attempt < max_retries - 1:
-                        wait_time = delay * (2 ** attempt)  # Exponential backoff
-                        _LOGGER.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time} seconds...")
-                        await asyncio.sleep(wait_time)
-            raise last_exception
-        return wrapper
-    return decorator
-
 class LambdaHeatpumpCoordinator(DataUpdateCoordinator):
-    """Koordinator für die Lambda-Wärmepumpe über Modbus."""
-    
+    """Koordinator für die Lambda-Wärmepumpe über Modbus.
+
+    Transport, Read-Plan und Dekodierung liegen im LambdaClient aus core;
+    der Koordinator übernimmt Abfrageintervall, Entprellung neuer
+    Abonnements und die gefilterte Benachrichtigung der Entitäten.
+    """
+
     def __init__(
         self,
         hass: HomeAssistant,
         config: ModbusConfig,
+        client_factory: Optional[Callable[[], Any]] = None,
     ):
         """Initialisiere den Lambda-Wärmepumpen-Koordinator.
-        
+
         Args:
             hass: Home Assistant Instanz
             config: Modbus-Konfiguration
+            client_factory: Erzeugt den Modbus-Client (Standard: ModbusTcpClient),
+                z. B. capture.ReplayClient für die Wiedergabe eines Mitschnitts
         """
         if not hass:
             raise ValueError("Home Assistant Instanz darf nicht None sein")
-            
+
         if not config:
             raise ValueError("Modbus-Konfiguration darf nicht None sein")
-            
-        self.config = config
-        self._validate_config()
-        
-        self._registers_to_read: Dict[int, str] = {}
-        self._client: Optional[ModbusTcpClient] = None
-        self._last_successful_update: Optional[float] = None
-        self._connection_status: bool = False
-        self._register_cache: Dict[int, Any] = {}
-        self._cache_timestamp: Dict[int, float] = {}
-        self._cache_duration: float = 5.0  # Cache-Dauer in Sekunden
+
+        self.client = LambdaClient(config, client_factory)
+        # Zuletzt veröffentlichte Werte samt Zeitpunkt (Signifikanzfilter)
+        self._published: Dict[ValueSpec, Tuple[Any, float]] = {}
+        self._notified_success: Optional[bool] = None
+        # (Zeitpunkt, Anzahl) unterdrückter Zustandsänderungen der letzten Stunde
+        self._suppressed_writes: deque = deque()
         self.data: Dict[str, Any] = {}  # Initialisiere data als leeres Dictionary
 
+        # Abgeschlossener Zyklus bis zur Benachrichtigung der Listener und die
+        # gleitende Statistik
+        self._finished_cycle: Optional[CycleMetrics] = None
+        self.poll_statistics = PollStatistics()
+        self._profiler: Optional[PollProfiler] = None
+
+        # Energie- und Laufzeitzähler, fortgeschrieben pro Abfrage
+        self.accumulators = AccumulatorSet()
+        self._accumulator_store: Optional[Store] = None
+        self._changed_accumulators: Set[Accumulator] = set()
+        self._accumulator_save_pending = False
+
+        # Summen über die Wärmepumpen dieses Controllers und, geteilt mit den
+        # anderen Config Entries, über die ganze Anlage
+        self.cascade = CascadeTotals()
+        self.plant: Optional[CascadeTotals] = None
+        self._plant_source: Optional[str] = None
+        self._cascade_inputs: Dict[Tuple[str, int], Tuple[CascadeInput, Callable[[], Any]]] = {}
+        self._cascade_revisions = (0, 0)
+
         _LOGGER.debug(
             "Initializing Coordinator: Host=%s, Port=%d, Slave ID=%d, "
             "Update Interval=%s, Connection Timeout=%d",
-            self.config.host,
-            self.config.port,
-            self.config.slave_id,
-            self.config.update_interval,
-            self.config.connection_timeout
+            config.host,
+            config.port,
+            config.slave_id,
+            config.update_interval,
+            config.connection_timeout
         )
 
         try:
@@ -93,307 +109,468 @@ class LambdaHeatpumpCoordinator(DataUpdateCoordinator):
                 hass,
                 _LOGGER,
                 name="LambdaHeatpumpCoordinator",
-                update_interval=self.config.update_interval,
+                update_interval=config.update_interval,
             )
         except Exception as e:
             _LOGGER.error("Fehler bei der Initialisierung des Coordinators: %s", e)
             raise
 
-    def _validate_config(self) -> None:
-        """Validiere die Modbus-Konfiguration."""
-        if not self.config.host:
-            raise ValueError("Host-Adresse darf nicht leer sein")
-            
-        if not 1 <= self.config.port <= 65535:
-            raise ValueError(f"Ungültiger Port: {self.config.port}")
-            
-        if not 1 <= self.config.slave_id <= 247:
-            raise ValueError(f"Ungültige Slave-ID: {self.config.slave_id}")
-            
-        if self.config.connection_timeout < 1:
-            raise ValueError(f"Ungültiger Connection Timeout: {self.config.connection_timeout}")
-            
-        if self.config.retry_count < 1:
-            raise ValueError(f"Ungültige Anzahl von Wiederholungsversuchen: {self.config.retry_count}")
-            
-        if self.config.retry_delay < 0:
-            raise ValueError(f"Ungültige Verzögerung zwischen Wiederholungsversuchen: {self.config.retry_delay}")
-            
-        if self.config.max_register_chunk_size < 1 or self.config.max_register_chunk_size > 125:
-            raise ValueError(f"Ungültige Chunk-Größe: {self.config.max_register_chunk_size}")
-
-    def add_register(self, register: int, register_type: str = 'int16') -> None:
-        """Füge ein Register zur Liste der zu lesenden Register hinzu.
-        
-        Args:
-            register: Die Register-Adresse
-            register_type: Der Typ des Registers (int16, uint16, int32, float32)
+        # Neu abonnierte Register gesammelt nachladen, statt pro Entität einzeln
+        self._subscription_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=1.0,
+            immediate=False,
+            function=self.async_refresh,
+        )
+
+    @property
+    def config(self) -> ModbusConfig:
+        """Die Modbus-Konfiguration des Clients."""
+        return self.client.config
+
+    @callback
+    def async_apply_options(
+        self, update_interval: timedelta, max_register_chunk_size: int, history_hours: float = 0.0
+    ) -> None:
+        """Übernimm geänderte Abfrage-Optionen ohne Neuverbindung.
+
+        Der Read-Plan wird vollständig neu berechnet, die Verbindung, die
+        bisherigen Daten, das Register-Abbild und die neuesten Zeilen des
+        Verlaufs bleiben erhalten.
+        """
+        self.client.apply_config(replace(
+            self.config,
+            update_interval=update_interval,
+            max_register_chunk_size=max_register_chunk_size,
+            history_hours=history_hours,
+        ))
+        self.update_interval = update_interval
+        _LOGGER.debug(
+            "Applied options: update interval %s, chunk size %d",
+            update_interval, max_register_chunk_size
+        )
+
+    def _prune_data(self, registers: Iterable[Tuple[int, str]]) -> None:
+        """Entferne nicht mehr abonnierte Register aus data."""
+        if self.data:
+            for register, _ in registers:
+                if register not in self.client.planner.registers:
+                    self.data.pop(str(register), None)
+
+    @callback
+    def subscribe_registers(self, registers: Iterable[Tuple[int, str]]) -> None:
+        """Abonniere die Register einer Entität.
+
+        Kommen dabei neue Register in den Read-Plan, wird eine (entprellte)
+        Aktualisierung angestoßen, damit die Entität nicht bis zum nächsten
+        regulären Intervall ohne Wert bleibt.
+        """
+        if self.client.subscribe_registers(registers):
+            self._subscription_debouncer.async_schedule_call()
+
+    async def async_refresh_subscriptions(self) -> None:
+        """Lies neu abonnierte Register sofort statt nach der Entprellung.
+
+        Nach dem Setup der Plattformen aufrufen: Die erste Abfrage lief vor
+        dem Abonnieren der Entitäten, die sonst bis zur entprellten
+        Aktualisierung ohne Wert blieben.
+        """
+        self._subscription_debouncer.async_cancel()
+        await self.async_refresh()
+
+    @callback
+    def unsubscribe_registers(self, registers: Iterable[Tuple[int, str]]) -> None:
+        """Gib die Register einer Entität wieder frei."""
+        registers = tuple(registers)
+        self.client.unsubscribe_registers(registers)
+        self._prune_data(registers)
+
+    @callback
+    def subscribe_values(self, specs: Iterable[ValueSpec | DerivedSpec]) -> None:
+        """Abonniere vorberechnete Werte samt der zugehörigen Register."""
+        if self.client.subscribe_values(specs):
+            self._subscription_debouncer.async_schedule_call()
+
+    @callback
+    def unsubscribe_values(self, specs: Iterable[ValueSpec | DerivedSpec]) -> None:
+        """Gib vorberechnete Werte und ihre Register wieder frei."""
+        specs = tuple(specs)
+        for spec in self.client.unsubscribe_values(specs):
+            self._published.pop(spec, None)
+        self._prune_data(register for spec in specs for register in spec.registers)
+
+    async def async_load_accumulators(self, entry_id: str) -> None:
+        """Lade den gespeicherten Zustand der Zähler; vor dem Anlegen der Entitäten aufrufen."""
+        self._accumulator_store = Store(
+            self.hass, ACCUMULATOR_STORAGE_VERSION, ACCUMULATOR_STORAGE_KEY.format(entry_id)
+        )
+        state = await self._accumulator_store.async_load()
+        self.accumulators = AccumulatorSet(state if isinstance(state, dict) else None)
+
+    @callback
+    def register_accumulator(self, key: str, factory: Callable[[], Accumulator]) -> Accumulator:
+        """Registriere einen Zähler samt seiner Eingangswerte; gleiche keys teilen sich einen Zähler."""
+        accumulator, added = self.accumulators.register(key, factory)
+        if added:
+            self.subscribe_values(accumulator.specs)
+        return accumulator
+
+    @callback
+    def unregister_accumulator(self, key: str) -> None:
+        """Gib einen Zähler frei; sein Stand bleibt gespeichert."""
+        accumulator = self.accumulators.unregister(key)
+        if accumulator is not None:
+            self.unsubscribe_values(accumulator.specs)
+            self._async_save_accumulators()
+
+    @callback
+    def _async_save_accumulators(self) -> None:
+        """Speichere die Zähler spätestens nach ACCUMULATOR_SAVE_DELAY Sekunden.
+
+        async_delay_save verschiebt einen bereits geplanten Schreibvorgang bei
+        jedem Aufruf; geplant wird deshalb nur, wenn keiner aussteht.
+        """
+        if self._accumulator_store is not None and not self._accumulator_save_pending:
+            self._accumulator_save_pending = True
+            self._accumulator_store.async_delay_save(self._accumulator_data, ACCUMULATOR_SAVE_DELAY)
+
+    def _accumulator_data(self) -> Dict[str, Any]:
+        self._accumulator_save_pending = False
+        return self.accumulators.as_dict()
+
+    @callback
+    def attach_plant(self, plant: CascadeTotals, source: str) -> None:
+        """Trage ab sofort auch zu den Anlagensummen plant bei, Mitglieder als (source, Modul)."""
+        self.plant = plant
+        self._plant_source = source
+
+    @callback
+    def async_set_cascade_inputs(self, inputs: Iterable[CascadeInput]) -> None:
+        """Setze die Beiträge dieses Controllers zu den Summen; ersetzt die bisherigen.
+
+        Werte werden abonniert, Zähler registriert, solange sie beitragen.
+        Unveränderte Beiträge behalten ihren Zählerstand ohne Unterbrechung.
+        """
+        inputs = {(item.quantity, item.module): item for item in inputs}
+        for key, (item, _) in list(self._cascade_inputs.items()):
+            new = inputs.get(key)
+            if new is not None and (new.spec, new.accumulator) == (item.spec, item.accumulator):
+                del inputs[key]
+                continue
+            del self._cascade_inputs[key]
+            if item.spec is not None:
+                self.unsubscribe_values((item.spec,))
+            else:
+                self.unregister_accumulator(item.accumulator)
+            self.cascade.discard(item.quantity, item.module)
+            if self.plant is not None:
+                self.plant.discard(item.quantity, (self._plant_source, item.module))
+
+        for key, item in inputs.items():
+            if item.spec is not None:
+                self.subscribe_values((item.spec,))
+                # client.values wird pro Abfrage ersetzt, deshalb erst beim Lesen nachschlagen
+                read = partial(self._cascade_value, item.spec)
+            else:
+                read = partial(item.value_fn, self.register_accumulator(item.accumulator, item.factory))
+            self._cascade_inputs[key] = (item, read)
+        # Zählerstände sofort übernehmen, damit die Energiesummen nicht bei 0 beginnen
+        self._update_cascade()
+
+    def _cascade_value(self, spec: ValueSpec | DerivedSpec) -> Any:
+        return self.client.values.get(spec)
+
+    def _update_cascade(self) -> None:
+        plant = self.plant
+        for (quantity, module), (item, read) in self._cascade_inputs.items():
+            value = read()
+            # Zählerstände: die Summe fällt nicht, wenn ein Mitglied ausscheidet
+            cumulative = item.accumulator is not None
+            self.cascade.set(quantity, module, value, cumulative)
+            if plant is not None:
+                plant.set(quantity, (self._plant_source, module), value, cumulative)
+
+    @property
+    def values(self) -> Dict[ValueSpec, Any]:
+        """Vorberechnete Entitätswerte der letzten Abfrage."""
+        return self.client.values
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Benachrichtige nur Entitäten, deren Werte sich signifikant geändert haben.
+
+        Der Kontext einer Lambda-Entität ist die Menge ihrer ValueSpecs bzw.
+        Zähler. Bei einem Wechsel der Verfügbarkeit werden alle Listener
+        benachrichtigt, Listener ohne Kontext immer.
         """
-        if register_type not in ['int16', 'uint16', 'int32', 'float32']:
-            _LOGGER.warning(f"Unsupported register type: {register_type}. Using default type 'int16'")
-            register_type = 'int16'
-            
-        self._registers_to_read[register] = register_type
-        _LOGGER.debug(f"Added register {register} with type {register_type} to read list. Total registers: {len(self._registers_to_read)}")
-        
-        # Debug-Ausgabe aller registrierten Register
-        _LOGGER.debug("Currently registered registers:")
-        for reg, reg_type in self._registers_to_read.items():
-            _LOGGER.debug(f"  - Register {reg} (Type: {reg_type})")
-    
-    def remove_register(self, register):
-        self._registers_to_read.pop(register, None)
-
-    def clear_registers(self):
-        self._registers_to_read.clear()
-
-    @retry_on_failure(max_retries=3)
-    async def _ensure_client(self) -> None:
-        """Stelle sicher, dass ein aktiver Modbus-Client vorhanden ist."""
-        if not self._client or not self._client.is_socket_open():
-            _LOGGER.debug("Kein aktiver Client gefunden oder Socket nicht geöffnet. Erstelle neuen Client.")
-            self._client = ModbusTcpClient(
-                self.config.host,
-                port=self.config.port,
-                timeout=self.config.connection_timeout
+        fanout_started = time.perf_counter()
+        cycle, self._finished_cycle = self._finished_cycle, None
+
+        success = self.last_update_success
+        notify_all = not success or success != self._notified_success
+        self._notified_success = success
+        now = time.monotonic()
+        values = self.client.values
+
+        changed = set()
+        if not notify_all:
+            for spec, value in values.items():
+                published = self._published.get(spec)
+                if published is None or is_significant(spec, value, published, now):
+                    changed.add(spec)
+            changed |= self._changed_accumulators
+        self._changed_accumulators = set()
+        # Summen-Sensoren haben die Kaskade als Kontext: höchstens eine Benachrichtigung pro Abfrage
+        revisions = (self.cascade.revision, self.plant.revision if self.plant is not None else 0)
+        if revisions != self._cascade_revisions:
+            self._cascade_revisions = revisions
+            changed.add(self.cascade)
+
+        suppressed = 0
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or not context or not changed.isdisjoint(context):
+                if context and success:
+                    for spec in context:
+                        if spec in values:
+                            self._published[spec] = (values[spec], now)
+                update_callback()
+            else:
+                suppressed += 1
+
+        fanout_finished = time.perf_counter()
+        if cycle is not None:
+            self.poll_statistics.record_fanout(cycle, fanout_finished - fanout_started)
+        tracer = self.client.tracer
+        if tracer is not None:
+            tracer.complete(
+                "notify", CAT_NOTIFY, fanout_started, fanout_finished, TID_LOOP,
+                {"notified": len(self._listeners) - suppressed, "suppressed": suppressed},
+            )
+        # Die Messung eines Zyklus endet nach der Benachrichtigung der Entitäten
+        profiler = self._profiler
+        if profiler is not None and profiler.disable_loop() and profiler.cycle_finished():
+            self.hass.async_create_task(self.async_stop_profile())
+        if suppressed:
+            self._suppressed_writes.append((now, suppressed))
+            self.client.transport.state_writes_suppressed += suppressed
+        while self._suppressed_writes and now - self._suppressed_writes[0][0] > 3600:
+            self._suppressed_writes.popleft()
+        if self.client.debug.entities:
+            ENTITIES.debug(
+                "Notified %d of %d listeners, %d state writes saved in the last hour",
+                len(self._listeners) - suppressed, len(self._listeners), self.suppressed_writes_per_hour
             )
-            if not await self.hass.async_add_executor_job(self._client.connect):
-                self._client = None
-                self._connection_status = False
-                raise UpdateFailed(f"Failed to connect to Modbus client {self.config.host}:{self.config.port}")
-            self._connection_status = True
+
+    def is_subscribed(self, address: int) -> bool:
+        """True, wenn address zu einem abonnierten Register gehört (auch als zweites Wort)."""
+        return self.client.is_subscribed(address)
+
+    def read_image(self, address: int, count: int, max_age: float) -> Tuple[List[int], List[int]]:
+        """Lies count Wörter ab address aus dem Registerabbild (siehe LambdaClient.read_image)."""
+        return self.client.read_image(address, count, max_age)
+
+    @property
+    def connected(self) -> bool:
+        """True, solange die Modbus-Verbindung besteht."""
+        return self.client.connected
+
+    @property
+    def read_plan(self) -> List[RegisterBlock]:
+        """Der kompilierte Read-Plan."""
+        return self.client.read_plan
+
+    @property
+    def register_profile(self) -> Optional[RegisterProfile]:
+        """Das geladene Registerprofil oder None."""
+        return self.client.planner.profile
+
+    @property
+    def executor_stats(self):
+        """Übergabe-Latenz zwischen Event-Loop und Modbus-Thread."""
+        return self.client.executor_stats
+
+    @property
+    def block_histograms(self):
+        """Latenz-Histogramm pro Block (Startadresse)."""
+        return self.client.block_histograms
+
+    @property
+    def connection_history(self):
+        """Die letzten Verbindungsereignisse."""
+        return self.client.connection_history
+
+    @property
+    def write_statistics(self):
+        """Statistik der Schreibzugriffe."""
+        return self.client.write_statistics
+
+    @property
+    def transport(self):
+        """Zähler für Anfragen, Fehler und Bytes."""
+        return self.client.transport
+
+    @property
+    def history(self) -> Optional[RegisterHistory]:
+        """Verlauf der dekodierten Werte der letzten history_hours Stunden oder None."""
+        return self.client.history
+
+    @property
+    def suppressed_writes_per_hour(self) -> int:
+        """Durch den Signifikanzfilter eingesparte Zustands- bzw. Recorder-Schreibvorgänge der letzten Stunde."""
+        return sum(count for _, count in self._suppressed_writes)
+
+    @property
+    def capture(self) -> Optional[CaptureWriter]:
+        """Der aktive Mitschnitt oder None."""
+        return self.client.capture
+
+    async def async_start_capture(self, path: str) -> None:
+        """Schneide ab sofort jede Modbus-Anfrage samt Antwort in path mit."""
+        await self.client.async_start_capture(path)
+
+    async def async_stop_capture(self) -> Optional[str]:
+        """Beende den Mitschnitt und liefere den Pfad der Datei."""
+        return await self.client.async_stop_capture()
+
+    @property
+    def samples(self) -> Optional[SampleWriter]:
+        """Die laufende Aufzeichnung in eine Sample-Datei oder None."""
+        return self.client.samples
+
+    async def async_start_samples(self, path: str, size_bytes: int) -> None:
+        """Zeichne ab sofort die Werte jeder Abfrage in die Ringdatei path auf."""
+        await self.client.async_start_samples(path, size_bytes)
+
+    async def async_stop_samples(self) -> Optional[str]:
+        """Beende die Aufzeichnung und liefere den Pfad der Datei."""
+        return await self.client.async_stop_samples()
+
+    async def async_export_samples(
+        self, path: str, output: str, export_format: str, since: Optional[float] = None
+    ) -> int:
+        """Exportiere die Sample-Datei path als CSV bzw. .npy nach output, auch während der Aufzeichnung."""
+        return await self.hass.async_add_executor_job(export_samples, path, output, export_format, since)
+
+    @property
+    def profiling(self) -> bool:
+        """True, solange eine Profilmessung angefordert oder aktiv ist."""
+        return self._profiler is not None
+
+    def async_start_profile(self, profiler: PollProfiler) -> None:
+        """Profiliere die nächsten Zyklen inklusive der ausgelösten Entitäts-Updates."""
+        if self._profiler is not None:
+            raise ValueError("Profiling is already running")
+        self._profiler = profiler
+        _LOGGER.info("Profiling the next %d poll cycles", profiler.cycles)
+
+    async def async_stop_profile(self) -> None:
+        """Beende eine laufende Profilmessung und schreibe die bisherigen Daten."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return
+        profiler.disable_loop()
+        await self.client.async_run_modbus(profiler.disable_modbus)
+        if not profiler.active:
+            _LOGGER.info("Profiling cancelled before the first poll cycle")
+            return
+        prof_path, text_path = await self.hass.async_add_executor_job(profiler.write)
+        _LOGGER.info("Poll profile written to %s (summary: %s)", prof_path, text_path)
+
+    @property
+    def tracer(self) -> Optional[TraceRecorder]:
+        """Die aktive Zeitleiste oder None."""
+        return self.client.tracer
+
+    def async_start_trace(self) -> None:
+        """Zeichne ab sofort Trace-Ereignisse im Ringpuffer auf."""
+        self.client.start_trace()
+
+    def async_stop_trace(self) -> None:
+        """Beende die Aufzeichnung und verwirf den Ringpuffer."""
+        self.client.stop_trace()
+
+    async def async_dump_trace(self, path: str, seconds: Optional[float] = None) -> int:
+        """Schreibe die letzten seconds Sekunden als Chrome-Trace nach path."""
+        return await self.client.async_dump_trace(path, seconds)
+
+    async def async_scan_registers(self, path: str) -> RegisterProfile:
+        """Scanne den Adressraum, speichere das Registerprofil unter path und lies ab sofort danach."""
+        try:
+            profile = await RegisterScanner(self.client).async_scan()
+        except LambdaClientError as err:
+            raise UpdateFailed(str(err)) from err
+        await self.hass.async_add_executor_job(profile.save, path)
+        self.client.apply_profile(profile)
+        await self.async_request_refresh()
+        return profile
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Aktualisiere die Daten von der Wärmepumpe."""
-        try:
-            await self._ensure_client()
-            data = {}
-            self._last_successful_update = self.hass.loop.time()
-            
-            # Debug-Ausgabe der zu lesenden Register
-            _LOGGER.debug("Registers to read:")
-            for register, reg_type in self._registers_to_read.items():
-                _LOGGER.debug(f"  - Register {register} ({reg_type})")
-            
-            # Gruppiere Register für effizientere Abfragen
-            grouped_registers = self._group_registers_by_type()
-            
-            for register_type, registers in grouped_registers.items():
-                try:
-                    _LOGGER.debug(f"Reading registers of type {register_type}: {registers}")
-                    result = await self._read_grouped_registers(registers, register_type)
-                    
-                    for register, value in result.items():
-                        if value is not None:
-                            data[str(register)] = value
-                            _LOGGER.debug(f"Register {register} value: {value}")
-                        else:
-                            _LOGGER.warning(f"Register {register} returned None")
-                            
-                except Exception as e:
-                    _LOGGER.error(f"Error reading registers of type {register_type}: {e}")
-                    for register in registers:
-                        data[str(register)] = None
-                        _LOGGER.warning(f"Setting register {register} to None due to error")
-
-            _LOGGER.debug(f"Update completed. Data contains {len(data)} values")
-            _LOGGER.debug(f"Available registers in data: {list(data.keys())}")
-
-            # Debug-Ausgabe für Register 2002 und 2003
-            for register in [2002, 2003]:
-                _LOGGER.debug(f"Starting Modbus read for register {register}")
-                
-                # Lesen der Holding-Register
-                result = await self.hass.async_add_executor_job(
-                    lambda: self._client.read_holding_registers(address=register, count=1, slave=self.config.slave_id)
-                )
-                
-                if result.isError():
-                    _LOGGER.error(f"Modbus error reading register {register}: {result}")
-                    continue
-                    
-                _LOGGER.debug(f"Raw Modbus response for register {register}: {result.registers}")
-                
-                # Decodieren des Wertes
-                value = struct.unpack(">h", struct.pack(">H", result.registers[0]))[0]
-                _LOGGER.debug(f"Decoded int16 value for register {register}: {value}")
-                
-                # Speichern des Wertes
-                data[str(register)] = value
-                _LOGGER.debug(f"Register {register} value: {value}")
-            
-            return data
-            
-        except ConnectionException as conn_err:
-            self._connection_status = False
-            _LOGGER.error("Connection error: %s", conn_err)
-            raise UpdateFailed(f"Connection error: {conn_err}")
-        except Exception as err:
-            _LOGGER.exception("Error fetching data: %s", err)
-            raise UpdateFailed(f"Error fetching data: {err}")
-
-    def _group_registers_by_type(self) -> Dict[str, list]:
-        """Gruppiere Register nach ihrem Typ für effizientere Abfragen."""
-        grouped = {}
-        for register, reg_type in self._registers_to_read.items():
-            if reg_type not in grouped:
-                grouped[reg_type] = []
-            grouped[reg_type].append(register)
-            
-        # Debug-Ausgabe der gruppierten Register
-        _LOGGER.debug("Grouped registers by type:")
-        for reg_type, registers in grouped.items():
-            _LOGGER.debug(f"  - Type {reg_type}: {registers}")
-            
-        return grouped
-
-    def _split_registers_into_chunks(self, registers: list, max_chunk_size: int = 50) -> list:
-        """Teile Register in kleinere Blöcke auf."""
-        if not registers:
-            return []
-        
-        registers.sort()
-        chunks = []
-        current_chunk = []
-        
-        for register in registers:
-            if not current_chunk:
-                current_chunk.append(register)
-            else:
-                if register - current_chunk[0] < max_chunk_size:
-                    current_chunk.append(register)
-                else:
-                    chunks.append(current_chunk)
-                    current_chunk = [register]
-        
-        if current_chunk:
-            chunks.append(current_chunk)
-            
-        return chunks
-
-    async def _read_grouped_registers(self, registers: list, register_type: str) -> Dict[int, Any]:
-        """Lese eine Gruppe von Registern effizient."""
-        if not registers:
-            return {}
-            
-        values = {}
-        register_chunks = self._split_registers_into_chunks(registers)
-        
-        for chunk in register_chunks:
+        profiler = self._profiler
+        if profiler is not None:
             try:
-                start_register = chunk[0]
-                count = len(chunk)
-                
-                # Für 32-Bit-Werte müssen wir die Anzahl der Register anpassen
-                if register_type in ['int32', 'float32']:
-                    count = count * 2
-                
-                _LOGGER.debug(f"Reading {count} registers starting at {start_register}")
-                
-                # Versuche zuerst die Holding-Register zu lesen
-                try:
-                    result = await self.hass.async_add_executor_job(
-                        lambda: self._client.read_holding_registers(address=start_register, count=count, slave=self.config.slave_id)
-                    )
-                    _LOGGER.debug(f"Holding registers response for {start_register}: {result.registers}")
-                except Exception as e:
-                    _LOGGER.debug(f"Failed to read holding registers, trying input registers: {e}")
-                    result = await self.hass.async_add_executor_job(
-                        lambda: self._client.read_input_registers(address=start_register, count=count, slave=self.config.slave_id)
-                    )
-                    _LOGGER.debug(f"Input registers response for {start_register}: {result.registers}")
-                
-                if result.isError():
-                    _LOGGER.error(f"Error reading registers starting at {start_register}: {result}")
-                    continue
-                    
-                if not result.registers:
-                    _LOGGER.error(f"No registers returned for address {start_register}")
-                    continue
-                
-                # Erstelle einen Decoder mit der korrekten Byte-Reihenfolge
-                decoder = BinaryPayloadDecoder.fromRegisters(
-                    result.registers,
-                    byteorder=Endian.BIG,
-                    wordorder=Endian.BIG
-                )
-                
-                for register in chunk:
-                    try:
-                        if register_type == 'int16':
-                            value = decoder.decode_16bit_int()
-                            _LOGGER.debug(f"Decoded int16 value for register {register}: {value}")
-                            values[register] = value
-                        elif register_type == 'uint16':
-                            value = decoder.decode_16bit_uint()
-                            _LOGGER.debug(f"Decoded uint16 value for register {register}: {value}")
-                            values[register] = value
-                        elif register_type == 'int32':
-                            value = decoder.decode_32bit_int()
-                            _LOGGER.debug(f"Decoded int32 value for register {register}: {value}")
-                            values[register] = value
-                        elif register_type == 'float32':
-                            value = decoder.decode_32bit_float()
-                            _LOGGER.debug(f"Decoded float32 value for register {register}: {value}")
-                            values[register] = value
-                        else:
-                            _LOGGER.error(f"Unsupported register type: {register_type}")
-                            values[register] = None
-                            
-                    except Exception as e:
-                        _LOGGER.error(f"Error decoding register {register}: {e}")
-                        values[register] = None
-                        
-            except Exception as e:
-                _LOGGER.error(f"Error processing chunk starting at {chunk[0]}: {e}")
-                for register in chunk:
-                    values[register] = None
-                    
-        return values
-
-    def _read_register(self, register: int, count: int = 1) -> Any:
-        """Lese ein einzelnes Register oder eine Gruppe von Registern."""
+                await self.client.async_run_modbus(profiler.enable_modbus)
+                profiler.enable_loop()
+            except ValueError as err:
+                # Ab Python 3.12 darf nur ein Profiler im Prozess aktiv sein
+                _LOGGER.warning("Profiling stopped, another profiler is active: %s", err)
+                self._profiler = None
+                profiler.disable_loop()
+                await self.client.async_run_modbus(profiler.disable_modbus)
+                profiler = None
         try:
-            # Versuche zuerst die Holding-Register zu lesen
-            try:
-                return self._client.read_holding_registers(register, count, slave=self.config.slave_id)
-            except Exception as e:
-                _LOGGER.debug(f"Failed to read holding register {register}, trying input register: {e}")
-                # Wenn das fehlschlägt, versuche die Input-Register
-                return self._client.read_input_registers(register, count, slave=self.config.slave_id)
-        except Exception as e:
-            _LOGGER.error(f"Error reading register {register}: {e}")
-            raise
+            decoded = await self.client.async_poll()
+        except LambdaClientError as err:
+            if profiler is not None:
+                profiler.disable_loop()
+            raise UpdateFailed(str(err)) from err
+        finally:
+            # Auch fehlgeschlagene Zyklen zählen; HA benachrichtigt nach
+            # wiederholten Fehlern keine Listener mehr
+            cycle = self._finished_cycle = self.client.last_cycle
+            if cycle is not None:
+                self.poll_statistics.record(cycle)
+            if profiler is not None:
+                await self.client.async_run_modbus(profiler.disable_modbus)
+        # Zähler mit dem Zeitpunkt der Abfrage fortschreiben, nicht dem der Benachrichtigung
+        max_gap = max(MAX_INTEGRATION_GAP, 3 * self.config.update_interval.total_seconds())
+        self._changed_accumulators = self.accumulators.update(
+            self.client.last_cycle.started, self.client.values, max_gap
+        )
+        if self._changed_accumulators:
+            self._async_save_accumulators()
+        self._update_cascade()
+        if self.plant is not None:
+            self.plant.sources.add(self._plant_source)
+        return {str(register): value for register, value in decoded.items()}
+
+    def async_get_diagnostics(self) -> Dict[str, Any]:
+        """Zustand des Koordinators für den Diagnose-Download (ohne Host-Adresse)."""
+        return {
+            **self.client.diagnostics(),
+            "poll_statistics": self.poll_statistics.as_dict(),
+            "suppressed_writes_per_hour": self.suppressed_writes_per_hour,
+            "accumulators": self.accumulators.as_dict(),
+        }
 
     async def async_shutdown(self):
-        """Schließe die Verbindung beim Herunterfahren."""
-        if self._client:
-            self._client.close()
-            self._client = None
+        """Schließe die Verbindung und den Modbus-Thread beim Herunterfahren."""
+        await super().async_shutdown()
+        self._subscription_debouncer.async_cancel()
+        await self.async_stop_profile()
+        if self._accumulator_store is not None:
+            await self._accumulator_store.async_save(self.accumulators.as_dict())
+        await self.client.async_close()
 
     async def async_write_register(self, register, value):
         """Schreibe einen Wert in ein Modbus-Register."""
-        try:
-            await self._ensure_client()
-
-            def write_to_register():
-                return self._client.write_registers(
-                    address=register,
-                    values=[value],
-                    slave=self.config.slave_id
-                )
+        await self.async_write_registers(register, [value])
 
-            result = await self.hass.async_add_executor_job(write_to_register)
-
-            if result.isError():
-                raise UpdateFailed(f"Failed to write to register {register}: {result}")
-
-            _LOGGER.debug("Successfully wrote value %s to register %s", value, register)
-            await self.async_request_refresh()
-
-        except Exception as err:
-            _LOGGER.exception("Error writing to register %s: %s", register, err)
-            raise UpdateFailed(f"Error writing to register {register}: {err}")
-
-    def _write_registers(self, register, payload, count):
-        return self._client.write_registers(register, payload, slave=self.config.slave_id, count=count)
\ No newline at end of file
+    async def async_write_registers(self, register: int, values: List[int]) -> None:
+        """Schreibe aufeinanderfolgende Register ab register mit einer Anfrage."""
+        try:
+            await self.client.async_write_registers(register, values)
+        except LambdaClientError as err:
+            raise UpdateFailed(str(err)) from err
+        await self.async_request_refresh()
@@ -0,0 +1,67 @@
+"""Kern der Integration ohne Abhängigkeit von Home Assistant.
+
+Register-Map, Read-Plan, Transport und Dekodierung lassen sich damit auch
+außerhalb von Home Assistant verwenden, etwa in ``tools.cli``. Da das
+__init__.py der Integration Home Assistant importiert, wird der Kern dort
+über ``tools.import_integration_module("core")`` geladen::
+
+    core = import_integration_module("core")
+    client = core.LambdaClient(core.ModbusConfig(host="192.168.1.50", port=502, slave_id=1))
+    client.subscribe_values(definition.spec for definition in core.register_map())
+    decoded = await client.async_poll()
+"""
+from .accumulators import (
+    MAX_INTEGRATION_GAP,
+    Accumulator,
+    AccumulatorSet,
+    EnergyAccumulator,
+    StateCounter,
+)
+from .aggregate import STATISTICS_PERIODS, StatisticBuckets, aggregate_samples, aggregate_series
+from .analytics import (
+    MIN_COMPRESSOR_RUNTIME,
+    DailyStatistics,
+    Episodes,
+    HeatpumpAnalysis,
+    HeatpumpSpecs,
+    SampleTable,
+    analyze_heatpump,
+    read_table,
+)
+from .cascade import CascadeInput, CascadeTotals, RunningTotal, module_factory, module_input, module_spec
+from .client import (
+    ExecutorStatistics,
+    LambdaClient,
+    LambdaClientError,
+    ModbusConfig,
+)
+from .derived import WATER_HEAT_CAPACITY, DerivedSpec, compile_derived, compile_derived_array
+from .history import HistoryWindow, RegisterHistory, history_capacity
+from .planner import ReadPlanner
+from .profile import PROFILE_SUFFIX, RegisterProfile, merge_ranges
+from .registers import (
+    MAX_REGISTER_GAP,
+    MODULE_SEGMENT_SIZE,
+    PUBLISH_HEARTBEAT,
+    REGISTER_FORMATS,
+    REGISTER_WIDTHS,
+    RegisterBlock,
+    RegisterDefinition,
+    ValueSpec,
+    build_array_converter,
+    build_converter,
+    decode_block,
+    is_significant,
+    register_map,
+)
+from .samples import (
+    DEFAULT_SAMPLES_SIZE_MB,
+    EXPORT_FORMATS,
+    SAMPLE_DTYPE,
+    SAMPLES_SUFFIX,
+    SampleWriter,
+    export_samples,
+    pivot_samples,
+    read_samples,
+)
+from .scanner import RegisterScanner, default_scan_windows, parse_ranges
@@ -0,0 +1,190 @@
+"""Zähler für Energie, Laufzeit und Zustandswechsel, fortgeschrieben pro Abfrage.
+
+Anders als ein Riemann-Summen-Helfer über Zustandsänderungen integrieren
+die Akkumulatoren jeden abgefragten Wert mit dem Zeitstempel seiner
+Abfrage, unabhängig von Rundung, Totband und Mindestabstand der Sensoren.
+Der Zustand ist ein einfaches Dict und wird vom Koordinator gespeichert;
+nach einem Neustart wird ab der ersten Abfrage weitergezählt.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from .derived import DerivedSpec
+from .registers import ValueSpec
+
+_LOGGER = logging.getLogger(__name__)
+
+# Längere Lücken zwischen zwei Abfragen (Verbindungsausfall) werden nicht
+# integriert; bei langen Abfrageintervallen wählt der Koordinator ein Vielfaches
+MAX_INTEGRATION_GAP = 300.0
+
+InputSpec = Union[ValueSpec, DerivedSpec]
+
+
+@dataclass(eq=False)
+class EnergyAccumulator:
+    """Integriert eine Leistung in W zu Energie in Wh (Trapezregel).
+
+    Negative Leistung (z. B. thermische Leistung beim Abtauen) zählt als 0,
+    damit der Zähler nur steigt.
+    """
+    spec: InputSpec
+    total_wh: float = 0.0
+    _last: Optional[Tuple[float, float]] = field(default=None, repr=False)
+
+    @property
+    def specs(self) -> Tuple[InputSpec, ...]:
+        return (self.spec,)
+
+    @property
+    def display(self) -> Tuple[Any, ...]:
+        """Angezeigte Werte; eine Änderung benachrichtigt die Sensoren."""
+        return (round(self.total_wh / 1000, 3),)
+
+    def update(self, timestamp: float, values: Mapping[Any, Any], max_gap: float = MAX_INTEGRATION_GAP) -> None:
+        value = values.get(self.spec)
+        if not isinstance(value, (int, float)):
+            self._last = None
+            return
+        power = max(float(value), 0.0)
+        if self._last is not None:
+            last_time, last_power = self._last
+            elapsed = timestamp - last_time
+            if 0 < elapsed <= max_gap:
+                self.total_wh += (last_power + power) / 2 * elapsed / 3600
+        self._last = (timestamp, power)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"total_wh": self.total_wh}
+
+    def restore(self, data: Mapping[str, Any]) -> None:
+        self.total_wh = float(data.get("total_wh", 0.0))
+
+
+@dataclass(eq=False)
+class StateCounter:
+    """Zählt Wechsel in eine Gruppe von Zuständen und summiert die Zeit darin.
+
+    Beispiele: Verdichterstarts und -laufzeit aus dem Wärmepumpenstatus,
+    Abtauvorgänge aus dem Zustand DEFROSTING.
+    """
+    spec: InputSpec
+    states: FrozenSet[int]
+    count: int = 0
+    seconds: float = 0.0
+    _last: Optional[Tuple[float, bool]] = field(default=None, repr=False)
+
+    @property
+    def specs(self) -> Tuple[InputSpec, ...]:
+        return (self.spec,)
+
+    @property
+    def display(self) -> Tuple[Any, ...]:
+        return (self.count, round(self.seconds / 3600, 2))
+
+    def update(self, timestamp: float, values: Mapping[Any, Any], max_gap: float = MAX_INTEGRATION_GAP) -> None:
+        value = values.get(self.spec)
+        if value is None:
+            self._last = None
+            return
+        active = value in self.states
+        if self._last is not None:
+            last_time, was_active = self._last
+            elapsed = timestamp - last_time
+            if was_active and 0 < elapsed <= max_gap:
+                self.seconds += elapsed
+            if active and not was_active:
+                self.count += 1
+        self._last = (timestamp, active)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "seconds": self.seconds}
+
+    def restore(self, data: Mapping[str, Any]) -> None:
+        self.count = int(data.get("count", 0))
+        self.seconds = float(data.get("seconds", 0.0))
+
+
+Accumulator = Union[EnergyAccumulator, StateCounter]
+
+
+class AccumulatorSet:
+    """Die registrierten Akkumulatoren eines Clients samt gespeichertem Zustand."""
+
+    def __init__(self, state: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self.accumulators: Dict[str, Accumulator] = {}
+        self._refcount: Dict[str, int] = {}
+        # Gespeicherter Zustand, auch von gerade nicht registrierten Akkumulatoren
+        self._state: Dict[str, Dict[str, Any]] = {key: dict(data) for key, data in (state or {}).items()}
+        self._display: Dict[str, Tuple[Any, ...]] = {}
+
+    def register(self, key: str, factory: Callable[[], Accumulator]) -> Tuple[Accumulator, bool]:
+        """Registriere einen Akkumulator unter key; ein bereits registrierter wird geteilt.
+
+        Args:
+            factory: Erzeugt den Akkumulator, falls key noch nicht registriert ist.
+                Ein gespeicherter Zustand unter key wird übernommen.
+
+        Returns:
+            Den registrierten Akkumulator und True, wenn er neu ist.
+        """
+        self._refcount[key] = self._refcount.get(key, 0) + 1
+        existing = self.accumulators.get(key)
+        if existing is not None:
+            return existing, False
+        accumulator = factory()
+        if key in self._state:
+            try:
+                accumulator.restore(self._state[key])
+            except (TypeError, ValueError) as err:
+                _LOGGER.warning("Ignoring stored state of accumulator %s: %s", key, err)
+        self.accumulators[key] = accumulator
+        self._display[key] = accumulator.display
+        return accumulator, True
+
+    def unregister(self, key: str) -> Optional[Accumulator]:
+        """Gib einen Akkumulator frei; liefert ihn, wenn ihn niemand mehr nutzt."""
+        count = self._refcount.get(key, 0)
+        if count > 1:
+            self._refcount[key] = count - 1
+            return None
+        if not count:
+            return None
+        del self._refcount[key]
+        accumulator = self.accumulators.pop(key)
+        self._display.pop(key, None)
+        self._state[key] = accumulator.as_dict()
+        return accumulator
+
+    def update(
+        self, timestamp: float, values: Mapping[Any, Any], max_gap: float = MAX_INTEGRATION_GAP
+    ) -> Set[Accumulator]:
+        """Schreibe alle Akkumulatoren mit den Werten einer Abfrage fort.
+
+        Args:
+            max_gap: Längster Abstand zur vorigen Abfrage in Sekunden, der noch integriert wird.
+
+        Returns:
+            Die Akkumulatoren, deren angezeigte Werte sich geändert haben.
+        """
+        changed = set()
+        for key, accumulator in self.accumulators.items():
+            accumulator.update(timestamp, values, max_gap)
+            display = accumulator.display
+            if display != self._display[key]:
+                self._display[key] = display
+                changed.add(accumulator)
+        return changed
+
+    def specs(self) -> List[InputSpec]:
+        return [spec for accumulator in self.accumulators.values() for spec in accumulator.specs]
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Zustand aller bekannten Akkumulatoren zum Speichern."""
+        return {**self._state, **{key: accumulator.as_dict() for key, accumulator in self.accumulators.items()}}
+
+    def keys(self) -> Iterable[str]:
+        return self.accumulators.keys()
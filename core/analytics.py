@@ -0,0 +1,360 @@
+"""Auswertung einer Aufzeichnung über Tage und Betriebsabschnitte.
+
+Eine Sample-Datei (core.samples) oder ein Modbus-Mitschnitt (capture) wird
+in eine Tabelle mit einer Zeile pro Abfrage und einer Spalte pro Register
+geladen. Die Werte entstehen mit denselben ValueSpecs und DerivedSpecs wie
+die der Sensoren (build_array_converter, compile_derived_array), Energie
+und Zustandszeiten werden wie von EnergyAccumulator und StateCounter
+gezählt, nur über ganze Arrays statt pro Abfrage. Daraus ergeben sich pro
+Tag COP, Verdichterstarts und -takten, Abtauvorgänge und die Effizienz der
+Warmwasserbereitung.
+"""
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ..capture import CAPTURE_MAGIC, READ_FUNCTIONS, read_capture
+from .accumulators import MAX_INTEGRATION_GAP, InputSpec
+from .cascade import module_spec
+from .derived import DerivedSpec, compile_derived_array
+from .registers import REGISTER_FORMATS, REGISTER_WIDTHS, ValueSpec, build_array_converter
+from .samples import read_samples
+
+# Kürzere Verdichterläufe gelten als Takten
+MIN_COMPRESSOR_RUNTIME = 600.0
+
+DAY = 86400
+
+
+@dataclass(frozen=True)
+class SampleTable:
+    """Rohwerte einer Aufzeichnung: eine Zeile pro Abfrage, eine Spalte pro Register (NaN = fehlt)."""
+    timestamps: np.ndarray
+    columns: Dict[int, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def raw(self, register: int) -> np.ndarray:
+        column = self.columns.get(register)
+        return column if column is not None else np.full(len(self.timestamps), np.nan)
+
+    def values(self, spec: InputSpec) -> np.ndarray:
+        """Die Werte einer Spec je Zeile, wie sie der Koordinator berechnet."""
+        if isinstance(spec, DerivedSpec):
+            return compile_derived_array(spec)({register: self.raw(register) for register, _ in spec.registers})
+        return build_array_converter(spec)(self.raw(spec.register))
+
+
+def sample_table(samples: np.ndarray) -> SampleTable:
+    """Tabelle aus Datensätzen mit SAMPLE_DTYPE; die Datensätze einer Abfrage teilen ihren Zeitstempel."""
+    timestamps = samples["timestamp"]
+    if len(samples) > 1 and (timestamps[1:] < timestamps[:-1]).any():
+        samples = samples[np.argsort(timestamps, kind="stable")]
+        timestamps = samples["timestamp"]
+    # Zusammenhängende Kopien statt der verschränkten Felder des strukturierten Arrays
+    timestamps = np.ascontiguousarray(timestamps)
+    registers = np.ascontiguousarray(samples["register"])
+    new_row = np.ones(len(samples), dtype=bool)
+    new_row[1:] = timestamps[1:] != timestamps[:-1]
+    row = np.cumsum(new_row) - 1
+    present = np.flatnonzero(np.bincount(registers))
+    column = np.zeros(int(present[-1]) + 1 if len(present) else 0, dtype=np.intp)
+    column[present] = np.arange(len(present))
+    # Spaltenweise im Speicher, damit jede Spalte ein zusammenhängendes Array ist
+    table = np.full((int(new_row.sum()), len(present)), np.nan, order="F")
+    table[row, column[registers]] = samples["value"]
+    columns = {register: table[:, index] for index, register in enumerate(present.tolist())}
+    return SampleTable(timestamps[new_row], columns)
+
+
+def capture_table(
+    path: str, registers: Iterable[Tuple[int, str]], since: Optional[float] = None
+) -> SampleTable:
+    """Tabelle aus einem Modbus-Mitschnitt, dekodiert mit REGISTER_FORMATS.
+
+    Ein Zyklus beginnt mit der ersten erfolgreichen Leseanfrage, deren
+    Adresse nicht über der vorigen liegt (der Read-Plan liest aufsteigend),
+    und trägt deren Zeitstempel. Nur das Zerlegen der Frames läuft pro
+    Frame, die Dekodierung über alle Frames eines Registers auf einmal.
+    """
+    frames = [
+        frame for frame in read_capture(path)
+        if frame.ok and frame.function_code in READ_FUNCTIONS and (since is None or frame.timestamp >= since)
+    ]
+    count = len(frames)
+    timestamps = np.fromiter((frame.timestamp for frame in frames), dtype=float, count=count)
+    addresses = np.fromiter((frame.address for frame in frames), dtype=np.int64, count=count)
+    lengths = np.fromiter((len(frame.words) for frame in frames), dtype=np.int64, count=count)
+    words = np.fromiter(
+        itertools.chain.from_iterable(frame.words for frame in frames), dtype=np.uint16, count=int(lengths.sum())
+    )
+    offsets = np.cumsum(lengths) - lengths
+
+    new_cycle = np.ones(count, dtype=bool)
+    new_cycle[1:] = addresses[1:] <= addresses[:-1]
+    cycle = np.cumsum(new_cycle) - 1
+    cycles = int(new_cycle.sum())
+    columns = {}
+    for register, data_type in dict.fromkeys(registers):
+        width = REGISTER_WIDTHS[data_type]
+        covering = (addresses <= register) & (register + width <= addresses + lengths)
+        index = offsets[covering] + (register - addresses[covering])
+        # Big-Endian-Wörter nebeneinander ergeben die Bytes des Werts
+        raw = np.stack([words[index + word] for word in range(width)], axis=1).astype(">u2")
+        values = raw.view(np.dtype(REGISTER_FORMATS[data_type].format)).ravel().astype(float)
+        column = np.full(cycles, np.nan)
+        column[cycle[covering]] = values
+        columns[register] = column
+    return SampleTable(timestamps[new_cycle], columns)
+
+
+def read_table(path: str, registers: Iterable[Tuple[int, str]], since: Optional[float] = None) -> SampleTable:
+    """Tabelle der Register (Adresse, Datentyp) aus einer Sample-Datei oder einem Mitschnitt.
+
+    Raises:
+        OSError, ValueError: Datei fehlt oder ist ungültig.
+    """
+    registers = tuple(registers)
+    with open(path, "rb") as file:
+        magic = file.read(len(CAPTURE_MAGIC))
+    if magic == CAPTURE_MAGIC:
+        return capture_table(path, registers, since)
+    return sample_table(read_samples(path, since, {register for register, _ in registers}))
+
+
+def interval_seconds(timestamps: np.ndarray, max_gap: float = MAX_INTEGRATION_GAP) -> np.ndarray:
+    """Dauer je Intervall zwischen zwei Zeilen; Lücken über max_gap zählen als 0."""
+    elapsed = np.diff(timestamps)
+    return np.where((elapsed > 0) & (elapsed <= max_gap), elapsed, 0.0)
+
+
+def interval_energy(seconds: np.ndarray, power: np.ndarray) -> np.ndarray:
+    """Energie in Wh je Intervall aus einer Leistung in W, wie EnergyAccumulator (Trapezregel)."""
+    power = np.maximum(power, 0.0)
+    energy = (power[:-1] + power[1:]) / 2 * seconds / 3600
+    return np.nan_to_num(energy, nan=0.0)
+
+
+@dataclass(frozen=True)
+class Episodes:
+    """Abschnitte, in denen ein Zustand aktiv war; eine Zeile pro Abschnitt."""
+    # Zeitstempel der ersten Abfrage im Zustand
+    start: np.ndarray
+    # Sekunden im Zustand, gezählt wie StateCounter
+    duration: np.ndarray
+    # Davor wurde ein anderer Zustand abgefragt; zählt wie bei StateCounter als Start
+    counted: np.ndarray
+    # Danach wurde ein anderer Zustand abgefragt; der Abschnitt ist vollständig erfasst
+    complete: np.ndarray
+    electrical_wh: np.ndarray
+    thermal_wh: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def cop(self) -> np.ndarray:
+        """Verhältnis von thermischer zu elektrischer Energie; NaN ohne Leistungsaufnahme."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.electrical_wh > 0, self.thermal_wh / self.electrical_wh, np.nan)
+
+    def select(self, mask: np.ndarray) -> Episodes:
+        return Episodes(
+            start=self.start[mask],
+            duration=self.duration[mask],
+            counted=self.counted[mask],
+            complete=self.complete[mask],
+            electrical_wh=self.electrical_wh[mask],
+            thermal_wh=self.thermal_wh[mask],
+        )
+
+
+def state_episodes(
+    timestamps: np.ndarray,
+    active: np.ndarray,
+    valid: np.ndarray,
+    seconds: np.ndarray,
+    electrical_wh: np.ndarray,
+    thermal_wh: np.ndarray,
+) -> Episodes:
+    """Zusammenhängende Zeilen mit aktivem Zustand.
+
+    Args:
+        active, valid: Je Zeile, ob der Zustand aktiv ist bzw. einen Wert hat.
+        seconds, electrical_wh, thermal_wh: Je Intervall (Zeile i bis i + 1);
+            ein Abschnitt umfasst die Intervalle ab jeder seiner Zeilen.
+    """
+    rows = len(active)
+    before = np.zeros(rows, dtype=bool)
+    before[1:] = active[:-1]
+    after = np.zeros(rows, dtype=bool)
+    after[:-1] = active[1:]
+    first = np.flatnonzero(active & ~before)
+    last = np.flatnonzero(active & ~after)
+    episode = np.cumsum(active & ~before) - 1
+
+    # Wie StateCounter: Zeit bis zur nächsten Abfrage mit Wert
+    counting = active[:-1] & valid[1:]
+    index = episode[:-1][counting]
+    episodes = len(first)
+    valid_before = np.zeros(rows, dtype=bool)
+    valid_before[1:] = valid[:-1]
+    valid_after = np.zeros(rows, dtype=bool)
+    valid_after[:-1] = valid[1:]
+    return Episodes(
+        start=timestamps[first],
+        duration=np.bincount(index, weights=seconds[counting], minlength=episodes),
+        counted=valid_before[first],
+        complete=valid_after[last],
+        electrical_wh=np.bincount(index, weights=electrical_wh[counting], minlength=episodes),
+        thermal_wh=np.bincount(index, weights=thermal_wh[counting], minlength=episodes),
+    )
+
+
+@dataclass(frozen=True)
+class HeatpumpSpecs:
+    """Eingangswerte der Auswertung einer Wärmepumpe, wie bei den Zählern ihrer Sensoren."""
+    electrical_power: InputSpec
+    thermal_power: InputSpec
+    # Rohwert des Wärmepumpenstatus mit den Zuständen "Verdichter läuft" bzw. "Abtauen"
+    state: ValueSpec
+    compressor_states: FrozenSet[int]
+    defrost_states: FrozenSet[int]
+    # Rohwert der Anforderungsart mit den Anforderungen der Warmwasserbereitung
+    request_type: ValueSpec
+    dhw_requests: FrozenSet[int]
+
+    @property
+    def registers(self) -> Tuple[Tuple[int, str], ...]:
+        specs = (self.electrical_power, self.thermal_power, self.state, self.request_type)
+        return tuple(dict.fromkeys(register for spec in specs for register in spec.registers))
+
+    def for_module(self, index: int) -> HeatpumpSpecs:
+        """Die Specs der ersten Wärmepumpe, verschoben auf Modul index (ab 1)."""
+        return replace(
+            self,
+            electrical_power=module_spec(self.electrical_power, index),
+            thermal_power=module_spec(self.thermal_power, index),
+            state=module_spec(self.state, index),
+            request_type=module_spec(self.request_type, index),
+        )
+
+
+@dataclass(frozen=True)
+class DailyStatistics:
+    """Kennzahlen je Tag; alle Arrays haben eine Zeile pro Tag."""
+    # Beginn des Tages (Mitternacht in der Zeitzone der Auswertung) als Unix-Zeitstempel
+    start: np.ndarray
+    # Von der Aufzeichnung abgedeckte Stunden
+    hours: np.ndarray
+    electrical_kwh: np.ndarray
+    thermal_kwh: np.ndarray
+    cop: np.ndarray
+    compressor_starts: np.ndarray
+    compressor_hours: np.ndarray
+    short_cycles: np.ndarray
+    defrosts: np.ndarray
+    defrost_hours: np.ndarray
+    dhw_cycles: np.ndarray
+    dhw_electrical_kwh: np.ndarray
+    dhw_thermal_kwh: np.ndarray
+    dhw_cop: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+@dataclass(frozen=True)
+class HeatpumpAnalysis:
+    """Ergebnis von analyze_heatpump."""
+    daily: DailyStatistics
+    compressor: Episodes
+    short_cycles: Episodes
+    defrosts: Episodes
+    # Vollständig erfasste Warmwasserbereitungen
+    dhw: Episodes
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def analyze_heatpump(
+    table: SampleTable,
+    specs: HeatpumpSpecs,
+    utc_offset: float = 0.0,
+    max_gap: float = MAX_INTEGRATION_GAP,
+    min_runtime: float = MIN_COMPRESSOR_RUNTIME,
+) -> HeatpumpAnalysis:
+    """Werte die Aufzeichnung einer Wärmepumpe aus.
+
+    Args:
+        utc_offset: Abstand der Tagesgrenzen zu UTC in Sekunden (z. B. 3600 für MEZ).
+        max_gap: Längere Lücken zwischen zwei Abfragen werden nicht gezählt.
+        min_runtime: Vollständig erfasste Verdichterläufe unter dieser Dauer
+            (Sekunden) gelten als Takten.
+    """
+    timestamps = table.timestamps
+    seconds = interval_seconds(timestamps, max_gap)
+    electrical = interval_energy(seconds, table.values(specs.electrical_power))
+    thermal = interval_energy(seconds, table.values(specs.thermal_power))
+
+    def episodes(spec: ValueSpec, states: FrozenSet[int]) -> Tuple[Episodes, np.ndarray]:
+        values = table.values(spec)
+        valid = ~np.isnan(values)
+        active = valid & np.isin(values, list(states))
+        active_seconds = np.where(active[:-1] & valid[1:], seconds, 0.0)
+        return state_episodes(timestamps, active, valid, seconds, electrical, thermal), active_seconds
+
+    compressor, compressor_seconds = episodes(specs.state, specs.compressor_states)
+    defrosts, defrost_seconds = episodes(specs.state, specs.defrost_states)
+    dhw, _ = episodes(specs.request_type, specs.dhw_requests)
+    dhw = dhw.select(dhw.counted & dhw.complete)
+    short_cycles = compressor.select(compressor.counted & compressor.complete & (compressor.duration < min_runtime))
+
+    if not len(timestamps):
+        first_day = days = 0
+    else:
+        first_day = int(np.floor((timestamps[0] + utc_offset) / DAY))
+        days = int(np.floor((timestamps[-1] + utc_offset) / DAY)) - first_day + 1
+
+    def day_of(start: np.ndarray) -> np.ndarray:
+        return np.floor((start + utc_offset) / DAY).astype(np.int64) - first_day
+
+    def per_day(start: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(day_of(start), weights=weights, minlength=days)
+
+    interval_start = timestamps[:-1]
+    electrical_kwh = per_day(interval_start, electrical) / 1000
+    thermal_kwh = per_day(interval_start, thermal) / 1000
+    dhw_electrical_kwh = per_day(dhw.start, dhw.electrical_wh) / 1000
+    dhw_thermal_kwh = per_day(dhw.start, dhw.thermal_wh) / 1000
+    daily = DailyStatistics(
+        start=(first_day + np.arange(days)) * float(DAY) - utc_offset,
+        hours=per_day(interval_start, seconds) / 3600,
+        electrical_kwh=electrical_kwh,
+        thermal_kwh=thermal_kwh,
+        cop=_ratio(thermal_kwh, electrical_kwh),
+        compressor_starts=per_day(compressor.start[compressor.counted]),
+        compressor_hours=per_day(interval_start, compressor_seconds) / 3600,
+        short_cycles=per_day(short_cycles.start),
+        defrosts=per_day(defrosts.start[defrosts.counted]),
+        defrost_hours=per_day(interval_start, defrost_seconds) / 3600,
+        dhw_cycles=per_day(dhw.start),
+        dhw_electrical_kwh=dhw_electrical_kwh,
+        dhw_thermal_kwh=dhw_thermal_kwh,
+        dhw_cop=_ratio(dhw_thermal_kwh, dhw_electrical_kwh),
+    )
+    return HeatpumpAnalysis(
+        daily=daily,
+        compressor=compressor,
+        short_cycles=short_cycles,
+        defrosts=defrosts,
+        dhw=dhw,
+    )
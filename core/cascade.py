@@ -0,0 +1,183 @@
+"""Anlagensummen über mehrere Wärmepumpen und Controller.
+
+Eine Kaskade aus mehreren Wärmepumpen-Modulen, ggf. an mehreren
+Controllern, wird über Summen wie Gesamtleistung und -energie ausgewertet.
+Statt wie ein Template-Sensor bei jeder Änderung eines Mitglieds alle
+Mitglieder neu zu summieren, schreibt RunningTotal die Summe mit der
+Differenz des geänderten Mitglieds fort; nur gelegentlich wird exakt neu
+summiert, damit sich keine Rundungsfehler ansammeln.
+
+Summen von Zählerständen (Energie) dürfen nicht fallen, sonst wertet Home
+Assistant das als Zurücksetzen des Zählers. Scheidet ein Mitglied aus,
+bleibt sein letzter Stand deshalb als fester Anteil in der Summe, bis es
+wieder beiträgt.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+from .accumulators import Accumulator, InputSpec
+from .derived import DerivedSpec
+from .registers import MODULE_SEGMENT_SIZE
+
+# Nach so vielen Änderungen wird die Summe exakt neu gebildet
+RESYNC_UPDATES = 1000
+
+
+class RunningTotal:
+    """Summe und Anzahl der Mitglieder mit Wert, fortgeschrieben per Differenz.
+
+    Mit cumulative=True behält die Summe den letzten Wert ausgeschiedener
+    Mitglieder, sie fällt also beim Entfernen eines Mitglieds nicht.
+    """
+
+    def __init__(self, cumulative: bool = False):
+        self.cumulative = cumulative
+        self._members: Dict[Hashable, float] = {}
+        # Letzte Werte ausgeschiedener Mitglieder (nur cumulative)
+        self._retired: Dict[Hashable, float] = {}
+        self.total = 0.0
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __bool__(self) -> bool:
+        # Auch nur mit festen Anteilen hat die Summe einen Wert
+        return bool(self._members or self._retired)
+
+    def members(self) -> List[Hashable]:
+        return list(self._members)
+
+    def set(self, member: Hashable, value: Optional[float]) -> bool:
+        """Setze den Wert eines Mitglieds (None entfernt es); True bei Änderung."""
+        if value is None:
+            return self.discard(member)
+        value = float(value)
+        previous = self._members.get(member)
+        if previous == value:
+            return False
+        if previous is None:
+            # Ein zurückkehrendes Mitglied ersetzt seinen festen Anteil
+            previous = self._retired.pop(member, None)
+        self._members[member] = value
+        self.total += value - (previous or 0.0)
+        self._updates += 1
+        if self._updates >= RESYNC_UPDATES:
+            self._resync()
+        return True
+
+    def discard(self, member: Hashable) -> bool:
+        previous = self._members.pop(member, None)
+        if previous is None:
+            return False
+        if self.cumulative:
+            self._retired[member] = previous
+        self._resync()
+        return True
+
+    def _resync(self) -> None:
+        self.total = math.fsum(self._members.values()) + math.fsum(self._retired.values())
+        self._updates = 0
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / len(self._members) if self._members else None
+
+
+class CascadeTotals:
+    """Laufende Summen je Größe (z. B. "electrical_power") über alle Mitglieder.
+
+    revision steigt bei jeder Änderung; Sensoren werden danach höchstens
+    einmal pro Abfrage benachrichtigt. sources sind die Quellen (Config
+    Entries), die mindestens einmal vollständig beigetragen haben.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, RunningTotal] = {}
+        self.sources: Set[Hashable] = set()
+        self.revision = 0
+
+    def set(self, quantity: str, member: Hashable, value: Optional[float], cumulative: bool = False) -> None:
+        """Setze den Beitrag eines Mitglieds; cumulative gilt ab dem ersten Beitrag zu quantity."""
+        total = self.totals.get(quantity)
+        if total is None:
+            total = self.totals[quantity] = RunningTotal(cumulative)
+        if total.set(member, value):
+            self.revision += 1
+
+    def discard(self, quantity: str, member: Hashable) -> None:
+        total = self.totals.get(quantity)
+        if total is not None and total.discard(member):
+            self.revision += 1
+
+    def discard_source(self, source: Hashable) -> None:
+        """Entferne alle Mitglieder (source, Modul) einer Quelle; Zählerstände bleiben in der Summe."""
+        self.sources.discard(source)
+        for quantity, total in self.totals.items():
+            for member in total.members():
+                if isinstance(member, tuple) and member[0] == source:
+                    self.discard(quantity, member)
+
+    def total(self, quantity: str) -> Optional[float]:
+        """Summe einer Größe oder None, solange kein Mitglied einen Wert hat."""
+        total = self.totals.get(quantity)
+        return total.total if total else None
+
+    def ratio(self, numerator: str, denominator: str, minimum: float = 0.0) -> Optional[float]:
+        """Verhältnis zweier Summen, z. B. COP; None, solange der Nenner nicht über minimum liegt."""
+        top = self.total(numerator)
+        bottom = self.total(denominator)
+        if top is None or bottom is None or bottom <= minimum:
+            return None
+        return top / bottom
+
+
+@dataclass(frozen=True)
+class CascadeInput:
+    """Beitrag eines Moduls zu einer Größe: ein vorberechneter Wert oder ein Zähler."""
+    quantity: str
+    module: int
+    spec: Optional[InputSpec] = None
+    # Key und Fabrik eines Zählers (siehe AccumulatorSet.register) samt Auslesefunktion
+    accumulator: Optional[str] = None
+    factory: Optional[Callable[[], Accumulator]] = None
+    value_fn: Optional[Callable[[Accumulator], Any]] = None
+
+
+def module_spec(spec: InputSpec, index: int) -> InputSpec:
+    """Die Spec eines Registers des ersten Moduls, verschoben auf Modul index (ab 1)."""
+    offset = (index - 1) * MODULE_SEGMENT_SIZE
+    if not offset:
+        return spec
+    if isinstance(spec, DerivedSpec):
+        return replace(spec, inputs=tuple((name, module_spec(item, index)) for name, item in spec.inputs))
+    return replace(spec, register=spec.register + offset)
+
+
+def module_input(template: CascadeInput, index: int, prefix: str = "heatpump") -> CascadeInput:
+    """Ein CascadeInput des ersten Moduls für Modul index: Register und Zähler-Key verschoben."""
+    if index == 1:
+        return template
+    if template.spec is not None:
+        return replace(template, module=index, spec=module_spec(template.spec, index))
+    return replace(
+        template,
+        module=index,
+        accumulator=template.accumulator.replace(f"{prefix}_1_", f"{prefix}_{index}_", 1),
+        factory=module_factory(template.factory, index),
+    )
+
+
+def module_factory(factory: Callable[[], Accumulator], index: int) -> Callable[[], Accumulator]:
+    """Die Factory eines Zählers des ersten Moduls für Modul index (ab 1)."""
+    if index == 1:
+        return factory
+
+    def create() -> Accumulator:
+        accumulator = factory()
+        return replace(accumulator, spec=module_spec(accumulator.spec, index))
+
+    return create
@@ -0,0 +1,872 @@
+"""Asynchroner Client für den Lambda-Controller ohne Abhängigkeit von Home Assistant.
+
+Der Client hält die Verbindung, den Read-Plan und das Registerabbild und
+liest pro async_poll() alle abonnierten Register einmal. Der blockierende
+ModbusTcpClient läuft in einem eigenen Thread; aufgerufen wird der Client
+aus einem beliebigen asyncio-Event-Loop, in Home Assistant über den
+LambdaHeatpumpCoordinator, außerhalb z. B. über ``python -m tools.cli``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from ..capture import (
+    READ_HOLDING_REGISTERS,
+    READ_INPUT_REGISTERS,
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_OK,
+    WRITE_MULTIPLE_REGISTERS,
+    CaptureWriter,
+)
+from ..instrumentation import (
+    EXCEPTION_RESPONSE_SIZE,
+    READ_REQUEST_SIZE,
+    CycleMetrics,
+    LatencyHistogram,
+    TransportCounters,
+    WriteStatistics,
+    read_response_size,
+)
+from ..logs import DECODE, TRANSPORT, DebugFlags
+from ..tracing import (
+    CAT_CYCLE,
+    CAT_DECODE,
+    CAT_EXECUTOR,
+    CAT_TRANSPORT,
+    TID_LOOP,
+    TID_MODBUS,
+    TraceRecorder,
+)
+from .derived import DerivedSpec, compile_derived
+from .history import RegisterHistory, history_capacity
+from .planner import ReadPlanner
+from .samples import SampleWriter, samples_capacity
+from .profile import RegisterProfile
+from .registers import REGISTER_WIDTHS, RegisterBlock, ValueSpec, build_converter, decode_block
+
+logging.getLogger("pymodbus.logging").setLevel(logging.ERROR)
+
+TRACE_STATUS = {STATUS_OK: "ok", STATUS_ERROR: "error", STATUS_FAILED: "failed"}
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anzahl der Verbindungsereignisse, die für die Diagnose aufbewahrt werden
+CONNECTION_HISTORY_SIZE = 50
+
+# Keine Antwort statt einer Exception-Antwort des Controllers: Jeder weitere
+# Block würde erneut auf den Timeout warten, der Zyklus bricht deshalb ab
+TRANSPORT_ERRORS = (ConnectionException, ModbusIOException)
+
+
+class LambdaClientError(Exception):
+    """Abfrage oder Schreibzugriff am Controller fehlgeschlagen."""
+
+
+@dataclass
+class ModbusConfig:
+    """Konfiguration für die Modbus-Verbindung."""
+    host: str
+    port: int
+    slave_id: int
+    connection_timeout: int = 5
+    retry_count: int = 3
+    retry_delay: float = 1.0
+    update_interval: timedelta = timedelta(seconds=10)
+    max_register_chunk_size: int = 50
+    # Verlauf der Registerwerte im Speicher in Stunden, 0 = kein Verlauf
+    history_hours: float = 0.0
+
+    def validate(self) -> None:
+        """Prüfe die Werte; wirft ValueError bei ungültiger Konfiguration."""
+        if not self.host:
+            raise ValueError("Host-Adresse darf nicht leer sein")
+
+        if not 1 <= self.port <= 65535:
+            raise ValueError(f"Ungültiger Port: {self.port}")
+
+        if not 1 <= self.slave_id <= 247:
+            raise ValueError(f"Ungültige Slave-ID: {self.slave_id}")
+
+        if self.connection_timeout < 1:
+            raise ValueError(f"Ungültiger Connection Timeout: {self.connection_timeout}")
+
+        if self.retry_count < 1:
+            raise ValueError(f"Ungültige Anzahl von Wiederholungsversuchen: {self.retry_count}")
+
+        if self.retry_delay < 0:
+            raise ValueError(f"Ungültige Verzögerung zwischen Wiederholungsversuchen: {self.retry_delay}")
+
+        if self.max_register_chunk_size < 1 or self.max_register_chunk_size > 125:
+            raise ValueError(f"Ungültige Chunk-Größe: {self.max_register_chunk_size}")
+
+        if self.history_hours < 0:
+            raise ValueError(f"Ungültige Verlaufsdauer: {self.history_hours}")
+
+@dataclass
+class ExecutorStatistics:
+    """Übergabe-Latenz zwischen Event-Loop und dem Modbus-Thread.
+
+    Die Übergabe-Latenz ist die Zeit, die ein Modbus-Aufruf insgesamt
+    außerhalb des eigentlichen Socket-Zugriffs verbringt: vom Einreichen im
+    Event-Loop bis zum Start im Modbus-Thread plus vom Ende im Modbus-Thread
+    bis zur Fortsetzung im Event-Loop. Sie ist damit direkt mit dem Overhead
+    eines vollständig asynchronen Transports vergleichbar.
+    """
+    calls: int = 0
+    handoff_total: float = 0.0
+    handoff_max: float = 0.0
+    handoff_last: float = 0.0
+    io_total: float = 0.0
+
+    def record(self, handoff: float, io_time: float) -> None:
+        """Erfasse einen abgeschlossenen Modbus-Aufruf."""
+        self.calls += 1
+        self.handoff_total += handoff
+        self.handoff_last = handoff
+        if handoff > self.handoff_max:
+            self.handoff_max = handoff
+        self.io_total += io_time
+
+    @property
+    def handoff_avg(self) -> float:
+        """Durchschnittliche Übergabe-Latenz in Sekunden."""
+        return self.handoff_total / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Gib die Statistik in Millisekunden zurück."""
+        return {
+            "calls": self.calls,
+            "handoff_avg_ms": round(self.handoff_avg * 1000, 3),
+            "handoff_max_ms": round(self.handoff_max * 1000, 3),
+            "handoff_last_ms": round(self.handoff_last * 1000, 3),
+            "io_total_s": round(self.io_total, 3),
+        }
+
+def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            last_exception = None
+            for attempt in range(max_retries):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    last_exception = e
+                    if attempt < max_retries - 1:
+                        wait_time = delay * (2 ** attempt)  # Exponential backoff
+                        _LOGGER.warning("Attempt %d failed: %s. Retrying in %s seconds...", attempt + 1, e, wait_time)
+                        await asyncio.sleep(wait_time)
+            raise last_exception
+        return wrapper
+    return decorator
+
+class LambdaClient:
+    """Modbus-Client für einen Lambda-Controller."""
+
+    def __init__(self, config: ModbusConfig, client_factory: Optional[Callable[[], Any]] = None):
+        """Initialisiere den Client; die Verbindung entsteht beim ersten Zugriff.
+
+        Args:
+            config: Modbus-Konfiguration
+            client_factory: Erzeugt den Modbus-Client (Standard: ModbusTcpClient),
+                z. B. capture.ReplayClient für die Wiedergabe eines Mitschnitts
+        """
+        config.validate()
+        self.config = config
+        self.planner = ReadPlanner(config.max_register_chunk_size)
+        self._value_refcount: Dict[ValueSpec, int] = {}
+        self._value_converters: Dict[ValueSpec, Callable[[Any], Any]] = {}
+        # Kompilierte abgeleitete Werte, ausgewertet nach den Registerwerten
+        self._derived: Dict[DerivedSpec, Callable[[Dict[int, Any]], Any]] = {}
+        # Dekodierte Rohwerte der letzten Abfrage (Register -> Wert)
+        self.decoded: Dict[int, Any] = {}
+        # Vorberechnete Werte der abonnierten ValueSpecs aus der letzten Abfrage
+        self.values: Dict[ValueSpec, Any] = {}
+        self._client: Optional[ModbusTcpClient] = None
+        self._client_factory = client_factory or self._create_tcp_client
+        # Aktiver Mitschnitt des Modbus-Verkehrs (wird im Modbus-Thread beschrieben)
+        self._capture: Optional[CaptureWriter] = None
+        # Aktive Zeitleiste (Event-Loop und Modbus-Thread schreiben hinein)
+        self._tracer: Optional[TraceRecorder] = None
+        self._connection_status: bool = False
+        # Rohwerte aller gelesenen Register (Adresse -> 16-Bit-Wort) samt Lesezeitpunkt
+        self._register_image: Dict[int, int] = {}
+        self._image_timestamps: Dict[int, float] = {}
+
+        # Eigener Thread pro Verbindung: der blockierende ModbusTcpClient
+        # konkurriert so nicht mit dem Standard-Executor des Event-Loops,
+        # und Socket-Zugriffe sind durch max_workers=1 automatisch serialisiert.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"lambda_modbus_{config.host}_{config.port}",
+        )
+        self.executor_stats = ExecutorStatistics()
+        # Messwerte des laufenden und des zuletzt abgeschlossenen Zyklus
+        self._cycle: Optional[CycleMetrics] = None
+        self.last_cycle: Optional[CycleMetrics] = None
+        # Pro Block (Startadresse): Latenz-Histogramm, zuletzt erfolgreicher
+        # Funktionscode und Fehlerzähler
+        self.block_histograms: Dict[int, LatencyHistogram] = {}
+        self._block_function_codes: Dict[int, int] = {}
+        self._block_failures: Dict[int, Dict[str, Any]] = {}
+        # (Zeitpunkt, Ereignis, Detail) für connect, reconnect, connect_failed, connection_error, closed
+        self.connection_history: deque = deque(maxlen=CONNECTION_HISTORY_SIZE)
+        self.write_statistics = WriteStatistics()
+        self.transport = TransportCounters()
+        # Debug-Schalter der Log-Kategorien, einmal pro Zyklus gelesen
+        self.debug = DebugFlags()
+        # Register ohne Wert in der letzten Abfrage (Warnung nur bei Änderung)
+        self._missing_registers: frozenset = frozenset()
+        # Verlauf der dekodierten Werte (None, solange history_hours 0 ist)
+        self.history: Optional[RegisterHistory] = None
+        self._configure_history()
+        # Aufzeichnung in eine Ringdatei (None = aus)
+        self._samples: Optional[SampleWriter] = None
+
+    def apply_config(self, config: ModbusConfig) -> None:
+        """Übernimm eine geänderte Konfiguration ohne Neuverbindung.
+
+        Gedacht für Intervall und Chunk-Größe; Host, Port und Slave-ID gelten
+        erst für die nächste Verbindung.
+        """
+        config.validate()
+        self.config = config
+        self.planner.set_chunk_size(config.max_register_chunk_size)
+        self._configure_history()
+
+    def _configure_history(self) -> None:
+        """Lege den Verlauf passend zu history_hours und Abfrageintervall an bzw. passe ihn an."""
+        config = self.config
+        if not config.history_hours:
+            self.history = None
+            return
+        capacity = history_capacity(config.history_hours, config.update_interval.total_seconds())
+        if self.history is None:
+            self.history = RegisterHistory(capacity)
+        else:
+            self.history.resize(capacity)
+
+    def apply_profile(self, profile: Optional[RegisterProfile]) -> None:
+        """Lies künftig nur vorhandene Register und mit dem Funktionscode laut Profil (None = ohne Profil)."""
+        self.planner.set_profile(profile)
+        if profile is not None:
+            _LOGGER.info("Using register profile: %s", profile.summary())
+
+    def add_register(self, register: int, register_type: str = 'int16') -> bool:
+        """Abonniere ein Register; True, wenn es neu in den Read-Plan kam."""
+        return self.planner.add_register(register, register_type)
+
+    def remove_register(self, register: int) -> bool:
+        """Gib ein Register frei; True, wenn es aus dem Read-Plan entfernt wurde."""
+        register_type = self.planner.registers.get(register)
+        if not self.planner.remove_register(register):
+            return False
+        self.decoded.pop(register, None)
+        for address in range(register, register + REGISTER_WIDTHS[register_type]):
+            self._register_image.pop(address, None)
+            self._image_timestamps.pop(address, None)
+        return True
+
+    def clear_registers(self) -> None:
+        self.planner.clear()
+
+    def subscribe_registers(self, registers: Iterable[Tuple[int, str]]) -> bool:
+        """Abonniere mehrere Register; True, wenn dabei neue in den Read-Plan kamen."""
+        added = False
+        for register, register_type in registers:
+            added |= self.add_register(register, register_type)
+        return added
+
+    def unsubscribe_registers(self, registers: Iterable[Tuple[int, str]]) -> None:
+        for register, _ in registers:
+            self.remove_register(register)
+
+    def subscribe_values(self, specs: Iterable[ValueSpec | DerivedSpec]) -> bool:
+        """Abonniere vorberechnete bzw. abgeleitete Werte samt der zugehörigen Register.
+
+        Returns:
+            True, wenn dabei neue Register in den Read-Plan kamen.
+
+        Raises:
+            ValueError: Der Ausdruck einer DerivedSpec ist ungültig.
+        """
+        registers = []
+        for spec in specs:
+            count = self._value_refcount.get(spec, 0)
+            if not count:
+                # Bereits gelesene Register sofort verfügbar machen
+                if isinstance(spec, DerivedSpec):
+                    evaluate = self._derived[spec] = compile_derived(spec)
+                    self.values[spec] = evaluate(self.decoded)
+                else:
+                    convert = self._value_converters[spec] = build_converter(spec)
+                    raw = self.decoded.get(spec.register)
+                    self.values[spec] = convert(raw) if raw is not None else None
+            self._value_refcount[spec] = count + 1
+            registers.extend(spec.registers)
+        return self.subscribe_registers(registers)
+
+    def unsubscribe_values(self, specs: Iterable[ValueSpec]) -> List[ValueSpec]:
+        """Gib vorberechnete Werte und ihre Register frei.
+
+        Returns:
+            Die Specs, die danach von niemandem mehr abonniert sind.
+        """
+        registers = []
+        released = []
+        for spec in specs:
+            count = self._value_refcount.get(spec, 0)
+            if not count:
+                continue
+            if count > 1:
+                self._value_refcount[spec] = count - 1
+            else:
+                del self._value_refcount[spec]
+                if isinstance(spec, DerivedSpec):
+                    del self._derived[spec]
+                else:
+                    del self._value_converters[spec]
+                self.values.pop(spec, None)
+                released.append(spec)
+            registers.extend(spec.registers)
+        self.unsubscribe_registers(registers)
+        return released
+
+    @property
+    def read_plan(self) -> List[RegisterBlock]:
+        """Der kompilierte Read-Plan."""
+        return self.planner.read_plan
+
+    def is_subscribed(self, address: int) -> bool:
+        """True, wenn address zu einem abonnierten Register gehört (auch als zweites Wort)."""
+        return self.planner.is_subscribed(address)
+
+    def read_image(self, address: int, count: int, max_age: float) -> Tuple[List[int], List[int]]:
+        """Lies count Wörter ab address aus dem Registerabbild.
+
+        Liefert die Wörter (0 für fehlende) und die Adressen, die fehlen oder
+        deren letzter Lesezeitpunkt länger als max_age Sekunden zurückliegt.
+        """
+        now = time.monotonic()
+        words: List[int] = []
+        unavailable: List[int] = []
+        for current in range(address, address + count):
+            word = self._register_image.get(current)
+            if word is None or now - self._image_timestamps[current] > max_age:
+                unavailable.append(current)
+            words.append(word or 0)
+        return words, unavailable
+
+    @property
+    def connected(self) -> bool:
+        """True, solange die Modbus-Verbindung besteht."""
+        return self._connection_status
+
+    def _compute_values(self, decoded: Dict[int, Any]) -> Dict[ValueSpec | DerivedSpec, Any]:
+        """Berechne alle abonnierten Werte in einem Durchlauf, danach die abgeleiteten."""
+        values = {}
+        for spec, convert in self._value_converters.items():
+            raw = decoded.get(spec.register)
+            values[spec] = convert(raw) if raw is not None else None
+        for spec, evaluate in self._derived.items():
+            values[spec] = evaluate(decoded)
+        return values
+
+    async def async_run_modbus(self, func, *args, **kwargs) -> Any:
+        """Führe einen blockierenden Modbus-Aufruf im Modbus-Thread aus.
+
+        Misst dabei die Übergabe-Latenz zwischen Event-Loop und Modbus-Thread.
+        """
+        timing = [0.0, 0.0]
+
+        def run():
+            timing[0] = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing[1] = time.perf_counter()
+
+        transport = self.transport
+        transport.queue_depth += 1
+        transport.queue_depth_max = max(transport.queue_depth_max, transport.queue_depth)
+        submitted = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+        finally:
+            transport.queue_depth -= 1
+            if timing[1]:
+                resumed = time.perf_counter()
+                self.executor_stats.record(
+                    (timing[0] - submitted) + (resumed - timing[1]),
+                    timing[1] - timing[0],
+                )
+                tracer = self._tracer
+                if tracer is not None:
+                    name = getattr(func, "__name__", type(func).__name__).lstrip("_")
+                    tracer.instant("enqueue", CAT_EXECUTOR, submitted, TID_LOOP, {"call": name})
+                    tracer.complete("queue_wait", CAT_EXECUTOR, submitted, timing[0], TID_MODBUS)
+                    tracer.complete(name, CAT_EXECUTOR, timing[0], timing[1], TID_MODBUS)
+                    tracer.complete("resume", CAT_EXECUTOR, timing[1], resumed, TID_LOOP)
+
+    @retry_on_failure(max_retries=3)
+    async def _ensure_client(self) -> None:
+        """Stelle sicher, dass ein aktiver Modbus-Client vorhanden ist."""
+        if not self._client or not self._client.is_socket_open():
+            _LOGGER.debug("Kein aktiver Client gefunden oder Socket nicht geöffnet. Erstelle neuen Client.")
+            reconnect = self._client is not None
+            self._client = self._client_factory()
+            if not await self.async_run_modbus(self._client.connect):
+                if self._cycle is not None:
+                    self._cycle.retries += 1
+                self._client = None
+                self._connection_status = False
+                self._record_connection_event("connect_failed")
+                raise LambdaClientError(f"Failed to connect to Modbus client {self.config.host}:{self.config.port}")
+            self._connection_status = True
+            self._record_connection_event("reconnect" if reconnect else "connect")
+
+    def _record_connection_event(self, event: str, detail: Optional[str] = None) -> None:
+        self.connection_history.append((time.time(), event, detail))
+        self.transport.count_connection_event(event)
+
+    def _create_tcp_client(self) -> ModbusTcpClient:
+        return ModbusTcpClient(
+            self.config.host,
+            port=self.config.port,
+            timeout=self.config.connection_timeout
+        )
+
+    @property
+    def capture(self) -> Optional[CaptureWriter]:
+        """Der aktive Mitschnitt oder None."""
+        return self._capture
+
+    async def async_start_capture(self, path: str) -> None:
+        """Schneide ab sofort jede Modbus-Anfrage samt Antwort in path mit."""
+        await self.async_stop_capture()
+        self._capture = await self.async_run_modbus(CaptureWriter, path)
+        _LOGGER.info("Modbus capture started: %s", path)
+
+    async def async_stop_capture(self) -> Optional[str]:
+        """Beende den Mitschnitt und liefere den Pfad der Datei."""
+        if self._capture is None:
+            return None
+        capture, self._capture = self._capture, None
+        # Im Modbus-Thread schließen, damit laufende Aufzeichnungen vorher fertig sind
+        await self.async_run_modbus(capture.close)
+        _LOGGER.info("Modbus capture stopped: %s (%d frames)", capture.path, capture.frames)
+        return capture.path
+
+    @property
+    def samples(self) -> Optional[SampleWriter]:
+        """Die laufende Aufzeichnung in eine Sample-Datei oder None."""
+        return self._samples
+
+    async def async_start_samples(self, path: str, size_bytes: int) -> None:
+        """Zeichne ab sofort die Werte jeder Abfrage in path auf (Ringdatei mit size_bytes)."""
+        await self.async_stop_samples()
+        self._samples = await asyncio.get_running_loop().run_in_executor(
+            None, SampleWriter, path, samples_capacity(size_bytes)
+        )
+        _LOGGER.info("Sample recording started: %s (%d records)", path, self._samples.capacity)
+
+    async def async_stop_samples(self) -> Optional[str]:
+        """Beende die Aufzeichnung und liefere den Pfad der Datei."""
+        if self._samples is None:
+            return None
+        samples, self._samples = self._samples, None
+        await asyncio.get_running_loop().run_in_executor(None, samples.close)
+        _LOGGER.info("Sample recording stopped: %s (%d records written)", samples.path, samples.written)
+        return samples.path
+
+    @property
+    def tracer(self) -> Optional[TraceRecorder]:
+        """Die aktive Zeitleiste oder None."""
+        return self._tracer
+
+    def start_trace(self) -> None:
+        """Zeichne ab sofort Trace-Ereignisse im Ringpuffer auf."""
+        if self._tracer is None:
+            self._tracer = TraceRecorder(f"lambda_heatpumps {self.config.host}:{self.config.port}")
+            _LOGGER.info("Trace recording started")
+
+    def stop_trace(self) -> None:
+        """Beende die Aufzeichnung und verwirf den Ringpuffer."""
+        if self._tracer is not None:
+            self._tracer = None
+            _LOGGER.info("Trace recording stopped")
+
+    async def async_dump_trace(self, path: str, seconds: Optional[float] = None) -> int:
+        """Schreibe die letzten seconds Sekunden als Chrome-Trace nach path."""
+        if self._tracer is None:
+            raise ValueError("Trace recording is not running")
+        events = await asyncio.get_running_loop().run_in_executor(None, self._tracer.dump, path, seconds)
+        _LOGGER.info("Trace with %d events written to %s", events, path)
+        return events
+
+    def _call_read(self, function_code: int, address: int, count: int) -> Any:
+        """Lesezugriff im Modbus-Thread, bei aktivem Mitschnitt mit Aufzeichnung."""
+        if function_code == READ_HOLDING_REGISTERS:
+            function = self._client.read_holding_registers
+        else:
+            function = self._client.read_input_registers
+        capture = self._capture
+        tracer = self._tracer
+        if capture is None and tracer is None:
+            return function(address=address, count=count, slave=self.config.slave_id)
+
+        started = time.perf_counter()
+        status = STATUS_FAILED
+        result = None
+        try:
+            result = function(address=address, count=count, slave=self.config.slave_id)
+            status = STATUS_ERROR if result.isError() else STATUS_OK
+            return result
+        finally:
+            finished = time.perf_counter()
+            if capture is not None:
+                words = result.registers if status == STATUS_OK else ()
+                capture.record(function_code, address, count, words, finished - started, status)
+            if tracer is not None:
+                self._trace_request(tracer, function_code, address, count, started, finished, status)
+
+    @staticmethod
+    def _trace_request(
+        tracer: TraceRecorder, function_code: int, address: int, count: int,
+        started: float, finished: float, status: int,
+    ) -> None:
+        """Anfrage im Modbus-Thread: Senden, Warten auf die Antwort, Empfang.
+
+        Der synchrone ModbusTcpClient sendet und empfängt innerhalb eines
+        Aufrufs; der Abschnitt reicht daher vom Senden bis zum Ende der Antwort.
+        """
+        args = {"function_code": function_code, "address": address, "count": count, "status": TRACE_STATUS[status]}
+        tracer.instant("send", CAT_TRANSPORT, started, TID_MODBUS)
+        tracer.complete(f"FC{function_code} {address}+{count}", CAT_TRANSPORT, started, finished, TID_MODBUS, args)
+        tracer.instant("receive", CAT_TRANSPORT, finished, TID_MODBUS)
+
+    async def async_poll(self) -> Dict[int, Any]:
+        """Lies alle abonnierten Register einmal und berechne die abonnierten Werte.
+
+        Returns:
+            Die dekodierten Rohwerte (Register -> Wert, None für fehlende).
+            Die Messwerte des Zyklus stehen danach in last_cycle.
+
+        Raises:
+            LambdaClientError: Verbindung oder Abfrage fehlgeschlagen.
+        """
+        cycle = self._cycle = CycleMetrics(started=time.time())
+        debug = self.debug = DebugFlags.current()
+        started = time.perf_counter()
+        decoded: Dict[int, Any] = {}
+        missing: List[int] = []
+        try:
+            await self._ensure_client()
+
+            for block in self.read_plan:
+                values = await self._read_block(block)
+                for register, _ in block.registers:
+                    value = values.get(register)
+                    if value is None:
+                        missing.append(register)
+                    decoded[register] = value
+
+            # Eine Meldung pro Zyklus statt pro Register; Warnung nur, wenn sich die Menge ändert
+            missing_registers = frozenset(missing)
+            if missing_registers != self._missing_registers:
+                if missing:
+                    _LOGGER.warning("%d registers returned no value: %s", len(missing), missing)
+                self._missing_registers = missing_registers
+            elif missing and debug.decode:
+                DECODE.debug("%d registers still without value: %s", len(missing), missing)
+
+            # Skalierte Werte direkt im Anschluss an die Dekodierung berechnen
+            decode_started = time.perf_counter()
+            self.decoded = decoded
+            self.values = self._compute_values(decoded)
+            if self.history is not None:
+                self.history.append(cycle.started, decoded)
+            if self._samples is not None:
+                self._samples.append(cycle.started, decoded)
+            decode_finished = time.perf_counter()
+            cycle.decode_time += decode_finished - decode_started
+            if self._tracer is not None:
+                self._tracer.complete("compute_values", CAT_DECODE, decode_started, decode_finished, TID_LOOP)
+
+            return decoded
+
+        except TRANSPORT_ERRORS as conn_err:
+            cycle.success = False
+            self._connection_status = False
+            self._record_connection_event("connection_error", str(conn_err))
+            _LOGGER.error("Connection error: %s", conn_err)
+            # Eine hängende oder halboffene Verbindung wird in der nächsten Abfrage neu aufgebaut
+            if self._client is not None:
+                await self.async_run_modbus(self._client.close)
+            raise LambdaClientError(f"Connection error: {conn_err}") from conn_err
+        except Exception as err:
+            cycle.success = False
+            _LOGGER.exception("Error fetching data: %s", err)
+            raise LambdaClientError(f"Error fetching data: {err}") from err
+        finally:
+            finished = time.perf_counter()
+            cycle.duration = finished - started
+            self._cycle = None
+            self.transport.bytes_sent += cycle.bytes_sent
+            self.transport.bytes_received += cycle.bytes_received
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Poll cycle %s in %.1f ms: %d blocks, %d requests (%d failed, %d retries), "
+                    "%d values (%d missing), %d bytes, handoff %.2f ms",
+                    "ok" if cycle.success else "failed", cycle.duration * 1000,
+                    len(cycle.block_latencies), cycle.requests, cycle.failed_requests, cycle.retries,
+                    len(decoded), len(missing), cycle.bytes_total, self.executor_stats.handoff_avg * 1000,
+                )
+            if self._tracer is not None:
+                self._tracer.complete(
+                    "poll_cycle", CAT_CYCLE, started, finished, TID_LOOP,
+                    {"success": cycle.success, "requests": cycle.requests, "failed_requests": cycle.failed_requests},
+                )
+            self.last_cycle = cycle
+
+    async def _read_block(self, block: RegisterBlock) -> Dict[int, Any]:
+        """Lese einen Block des Read-Plans und dekodiere seine Register."""
+        cycle = self._cycle if self._cycle is not None else CycleMetrics()
+        started = time.perf_counter()
+        try:
+            if self.debug.transport:
+                TRANSPORT.debug("Reading %d registers at %d", block.count, block.start)
+
+            if block.function_code is not None:
+                # Funktionscode laut Registerprofil, kein Rückfall nötig
+                function_code = block.function_code
+                cycle.requests += 1
+                self.transport.count_request(function_code)
+                cycle.bytes_sent += READ_REQUEST_SIZE
+                result = await self.async_run_modbus(self._call_read, function_code, block.start, block.count)
+            else:
+                # Versuche zuerst die Holding-Register zu lesen
+                try:
+                    function_code = READ_HOLDING_REGISTERS
+                    cycle.requests += 1
+                    self.transport.count_request(function_code)
+                    cycle.bytes_sent += READ_REQUEST_SIZE
+                    result = await self.async_run_modbus(
+                        self._call_read, READ_HOLDING_REGISTERS, block.start, block.count
+                    )
+                except TRANSPORT_ERRORS:
+                    # FC 4 über dieselbe Verbindung würde ebenso ins Leere laufen
+                    raise
+                except Exception as e:
+                    if self.debug.transport:
+                        TRANSPORT.debug("Holding registers at %d failed, trying input registers: %s", block.start, e)
+                    cycle.failed_requests += 1
+                    cycle.retries += 1
+                    self.transport.count_error(type(e).__name__)
+                    function_code = READ_INPUT_REGISTERS
+                    cycle.requests += 1
+                    self.transport.count_request(function_code)
+                    cycle.bytes_sent += READ_REQUEST_SIZE
+                    result = await self.async_run_modbus(
+                        self._call_read, READ_INPUT_REGISTERS, block.start, block.count
+                    )
+
+            if result.isError():
+                cycle.failed_requests += 1
+                cycle.bytes_received += EXCEPTION_RESPONSE_SIZE
+                self.transport.count_error(str(getattr(result, "exception_code", None) or type(result).__name__))
+                _LOGGER.error("Error reading registers starting at %d: %s", block.start, result)
+                self._record_block_failure(block, str(result))
+                return {}
+
+            cycle.bytes_received += read_response_size(len(result.registers))
+            if len(result.registers) < block.count:
+                _LOGGER.error(
+                    "Short response for address %d: %d of %d registers", block.start, len(result.registers), block.count
+                )
+                self._record_block_failure(block, f"short response: {len(result.registers)} of {block.count} registers")
+                return {}
+
+        except Exception as e:
+            cycle.failed_requests += 1
+            self.transport.count_error(type(e).__name__)
+            _LOGGER.error("Error processing block starting at %d: %s", block.start, e)
+            self._record_block_failure(block, str(e))
+            if isinstance(e, TRANSPORT_ERRORS):
+                raise
+            return {}
+        finally:
+            latency = time.perf_counter() - started
+            cycle.block_latencies.append(latency)
+            histogram = self.block_histograms.get(block.start)
+            if histogram is None:
+                histogram = self.block_histograms[block.start] = LatencyHistogram()
+            histogram.add(latency)
+
+        self._block_function_codes[block.start] = function_code
+        failures = self._block_failures.get(block.start)
+        if failures is not None:
+            failures["consecutive"] = 0
+
+        decode_started = time.perf_counter()
+        now = time.monotonic()
+        for offset, word in enumerate(result.registers[:block.count]):
+            self._register_image[block.start + offset] = word
+            self._image_timestamps[block.start + offset] = now
+
+        values = decode_block(block, result.registers)
+        decode_finished = time.perf_counter()
+        cycle.decode_time += decode_finished - decode_started
+        if self._tracer is not None:
+            self._tracer.complete(
+                "decode", CAT_DECODE, decode_started, decode_finished, TID_LOOP,
+                {"address": block.start, "count": block.count},
+            )
+        return values
+
+    async def async_read_registers(self, function_code: int, address: int, count: int) -> Any:
+        """Einzelner Lesezugriff außerhalb des Read-Plans, z. B. für den RegisterScanner.
+
+        Exception-Antworten werden unverändert zurückgegeben.
+
+        Raises:
+            LambdaClientError: Keine Verbindung zum Controller.
+        """
+        await self._ensure_client()
+        self.transport.count_request(function_code)
+        try:
+            return await self.async_run_modbus(self._call_read, function_code, address, count)
+        except Exception as err:
+            self.transport.count_error(type(err).__name__)
+            raise LambdaClientError(f"Error reading {count} registers at {address}: {err}") from err
+
+    def _record_block_failure(self, block: RegisterBlock, error: str) -> None:
+        failures = self._block_failures.setdefault(block.start, {"consecutive": 0, "total": 0})
+        failures["consecutive"] += 1
+        failures["total"] += 1
+        failures["last_error"] = error
+        failures["last_failure"] = time.time()
+
+    async def async_write_registers(self, register: int, values: List[int]) -> None:
+        """Schreibe aufeinanderfolgende Register ab register mit einer Anfrage.
+
+        Raises:
+            LambdaClientError: Der Controller hat den Schreibzugriff abgelehnt
+                oder nicht beantwortet.
+        """
+        count = len(values)
+        statistics = self.write_statistics
+        statistics.writes += 1
+        self.transport.count_request(WRITE_MULTIPLE_REGISTERS)
+        statistics.last_register = register
+        statistics.last_write = time.time()
+        started = time.perf_counter()
+        try:
+            await self._ensure_client()
+
+            def write_to_register():
+                started = time.perf_counter()
+                result = self._client.write_registers(
+                    address=register,
+                    values=values,
+                    slave=self.config.slave_id
+                )
+                finished = time.perf_counter()
+                status = STATUS_ERROR if result.isError() else STATUS_OK
+                if self._capture is not None:
+                    self._capture.record(
+                        WRITE_MULTIPLE_REGISTERS, register, count, [value & 0xFFFF for value in values],
+                        finished - started, status,
+                    )
+                if self._tracer is not None:
+                    self._trace_request(self._tracer, WRITE_MULTIPLE_REGISTERS, register, count, started, finished, status)
+                return result
+
+            result = await self.async_run_modbus(write_to_register)
+            statistics.total_time += time.perf_counter() - started
+
+            if result.isError():
+                raise LambdaClientError(f"Failed to write to register {register}: {result}")
+
+            _LOGGER.debug("Successfully wrote %s to register %s", values, register)
+
+        except Exception as err:
+            statistics.failures += 1
+            statistics.last_error = str(err)
+            _LOGGER.exception("Error writing to register %s: %s", register, err)
+            raise LambdaClientError(f"Error writing to register {register}: {err}") from err
+
+    def diagnostics(self) -> Dict[str, Any]:
+        """Zustand von Verbindung, Read-Plan und Registerabbild (ohne Host-Adresse)."""
+        now = time.monotonic()
+        plan = []
+        for block in self.read_plan:
+            used = {
+                register + offset
+                for register, register_type in block.registers
+                for offset in range(REGISTER_WIDTHS.get(register_type, 1))
+            }
+            plan.append({
+                "start": block.start,
+                "count": block.count,
+                "function_code": self._block_function_codes.get(block.start),
+                "registers": [list(register) for register in block.registers],
+                "gaps": [address for address in range(block.start, block.start + block.count) if address not in used],
+                "latency": self.block_histograms[block.start].as_dict() if block.start in self.block_histograms else None,
+            })
+        return {
+            "config": {
+                "port": self.config.port,
+                "slave_id": self.config.slave_id,
+                "connection_timeout": self.config.connection_timeout,
+                "retry_count": self.config.retry_count,
+                "update_interval": self.config.update_interval.total_seconds() if self.config.update_interval else None,
+                "max_register_chunk_size": self.config.max_register_chunk_size,
+            },
+            "read_plan": plan,
+            # consecutive > 0: der Block schlägt aktuell fehl
+            "block_failures": {start: dict(failures) for start, failures in self._block_failures.items()},
+            "executor": self.executor_stats.as_dict(),
+            "connection": {
+                "connected": self._connection_status,
+                "history": [
+                    {"time": timestamp, "event": event, "detail": detail}
+                    for timestamp, event, detail in self.connection_history
+                ],
+            },
+            "writes": self.write_statistics.as_dict(),
+            "capture": self._capture.path if self._capture else None,
+            "history": self.history.as_dict() if self.history is not None else None,
+            "samples": self._samples.as_dict() if self._samples is not None else None,
+            "register_profile": {
+                **self.planner.profile.summary(),
+                "excluded_registers": self.planner.excluded,
+            } if self.planner.profile is not None else None,
+            "register_image": {
+                address: {"word": word, "age": round(now - self._image_timestamps[address], 1)}
+                for address, word in sorted(self._register_image.items())
+            },
+        }
+
+    async def async_close(self) -> None:
+        """Beende Mitschnitt und Zeitleiste, schließe die Verbindung und den Modbus-Thread."""
+        await self.async_stop_capture()
+        await self.async_stop_samples()
+        self.stop_trace()
+        if self._client:
+            client, self._client = self._client, None
+            await self.async_run_modbus(client.close)
+            self._record_connection_event("closed")
+        self._executor.shutdown(wait=False)
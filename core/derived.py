@@ -0,0 +1,231 @@
+"""Abgeleitete Werte wie Spreizung, thermische Leistung und COP.
+
+Eine DerivedSpec beschreibt einen Ausdruck über benannte Eingangswerte
+(ValueSpecs). Der Ausdruck wird beim Abonnieren einmal geprüft und
+kompiliert; der Client wertet danach alle abgeleiteten Werte einer Abfrage
+in einem Durchlauf über die dekodierten Register aus. Abgeleitete Werte
+laufen damit durch denselben Signifikanzfilter wie Registerwerte und
+erzeugen keine zusätzlichen Zustandsänderungen wie Template-Sensoren.
+
+compile_derived_array wertet denselben Ausdruck über ganze Arrays aus,
+etwa für die Auswertung einer Aufzeichnung in core.analytics.
+"""
+from __future__ import annotations
+
+import ast
+import math
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .registers import ValueSpec, build_array_converter, build_converter
+
+# Spezifische Wärmekapazität von Wasser mal Dichte, umgerechnet auf W pro (m³/h · K)
+WATER_HEAT_CAPACITY = 4186 * 1000 / 3600
+
+# Im Ausdruck erlaubte Funktionen
+FUNCTIONS: Dict[str, Callable[..., Any]] = {"abs": abs, "min": min, "max": max, "round": round}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call,
+    ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd, ast.Not,
+    ast.And, ast.Or, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+
+@dataclass(frozen=True)
+class DerivedSpec:
+    """Ein aus anderen Werten berechneter Wert, z. B. COP = Wärmeleistung / Leistungsaufnahme.
+
+    Fehlt ein Eingangswert, ist auch der abgeleitete Wert None; ebenso,
+    wenn der Ausdruck None liefert (z. B. "q / p if p > 50 else None") oder
+    durch null teilt.
+    """
+    expression: str
+    # Eingangswerte als (Name im Ausdruck, ValueSpec)-Paare, damit die Spec hashbar bleibt
+    inputs: Tuple[Tuple[str, ValueSpec], ...]
+    digits: Optional[int] = None
+    precision: Optional[float] = None
+    deadband: float = 0.0
+    min_publish_interval: float = 0.0
+
+    @property
+    def registers(self) -> Tuple[Tuple[int, str], ...]:
+        """Die von den Eingangswerten benötigten Register."""
+        return tuple(dict.fromkeys(register for _, spec in self.inputs for register in spec.registers))
+
+
+def _parse(spec: DerivedSpec) -> ast.Expression:
+    """Parse den Ausdruck und prüfe ihn gegen die Whitelist.
+
+    Raises:
+        ValueError: Der Ausdruck ist ungültig oder nutzt unbekannte Namen.
+    """
+    try:
+        tree = ast.parse(spec.expression, mode="eval")
+    except SyntaxError as err:
+        raise ValueError(f"Invalid expression {spec.expression!r}: {err}") from err
+    names = {name for name, _ in spec.inputs}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported element {type(node).__name__} in {spec.expression!r}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise ValueError(f"Unsupported function call in {spec.expression!r}")
+        if isinstance(node, ast.Name) and node.id not in names and node.id not in FUNCTIONS:
+            raise ValueError(f"Unknown name {node.id!r} in {spec.expression!r}")
+    return tree
+
+
+def compile_derived(spec: DerivedSpec) -> Callable[[Mapping[int, Any]], Any]:
+    """Prüfe und kompiliere den Ausdruck; liefert die Auswertung dekodierte Register -> Wert.
+
+    Raises:
+        ValueError: Der Ausdruck ist ungültig oder nutzt unbekannte Namen.
+    """
+    tree = _parse(spec)
+    code = compile(tree, f"<derived {spec.expression}>", "eval")
+    namespace = {"__builtins__": {}, **FUNCTIONS}
+    inputs = [(name, input_spec.register, build_converter(input_spec)) for name, input_spec in spec.inputs]
+    finish = _rounding(spec)
+
+    def evaluate(decoded: Mapping[int, Any]) -> Any:
+        variables = {}
+        for name, register, convert in inputs:
+            raw = decoded.get(register)
+            if raw is None:
+                return None
+            variables[name] = convert(raw)
+        try:
+            value = eval(code, namespace, variables)  # noqa: S307 - Ausdruck oben gegen eine Whitelist geprüft
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+        if value is None or (isinstance(value, float) and not math.isfinite(value)):
+            return None
+        return finish(value)
+
+    return evaluate
+
+
+def _rounding(spec: DerivedSpec) -> Callable[[Any], Any]:
+    precision = spec.precision
+    digits = spec.digits
+    if precision:
+        step_digits = max(0, -math.floor(math.log10(precision)))
+        return lambda value: round(round(value / precision) * precision, step_digits)
+    if digits is not None:
+        return lambda value: round(value, digits)
+    return lambda value: value
+
+
+# Entsprechungen der Operatoren und Funktionen für Arrays
+_ARRAY_OPERATORS: Dict[type, Callable[..., Any]] = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.Pow: np.power, ast.Mod: np.mod, ast.USub: np.negative, ast.UAdd: np.positive,
+    ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+_ARRAY_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "min": lambda *args: reduce(np.minimum, args),
+    "max": lambda *args: reduce(np.maximum, args),
+    "round": lambda value, digits=0: np.round(value, int(digits)),
+}
+
+
+def _truth(value: Any) -> Any:
+    """Wahrheitswert wie in Python; NaN steht für None und ist falsch."""
+    value = np.asarray(value)
+    if value.dtype == bool:
+        return value
+    return (value != 0) & ~np.isnan(value)
+
+
+def _array_node(node: ast.AST) -> Callable[[Mapping[str, np.ndarray]], Any]:
+    """Übersetze einen geprüften Ausdrucksknoten in eine Funktion über Arrays."""
+    if isinstance(node, ast.Expression):
+        return _array_node(node.body)
+    if isinstance(node, ast.Constant):
+        value = np.nan if node.value is None else node.value
+        return lambda variables: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda variables: variables[name]
+    if isinstance(node, ast.BinOp):
+        function = _ARRAY_OPERATORS[type(node.op)]
+        left, right = _array_node(node.left), _array_node(node.right)
+        return lambda variables: function(left(variables), right(variables))
+    if isinstance(node, ast.UnaryOp):
+        operand = _array_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda variables: ~_truth(operand(variables))
+        function = _ARRAY_OPERATORS[type(node.op)]
+        return lambda variables: function(operand(variables))
+    if isinstance(node, ast.Compare):
+        # a < b < c entspricht (a < b) and (b < c)
+        operands = [_array_node(item) for item in (node.left, *node.comparators)]
+        functions = [_ARRAY_OPERATORS[type(op)] for op in node.ops]
+
+        def compare(variables):
+            values = [operand(variables) for operand in operands]
+            results = (function(a, b) for function, a, b in zip(functions, values, values[1:]))
+            return reduce(np.logical_and, results)
+
+        return compare
+    if isinstance(node, ast.BoolOp):
+        # Wie in Python liefert "and"/"or" einen der Operanden, nicht nur True/False
+        values = [_array_node(item) for item in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda variables: reduce(
+                lambda a, b: np.where(_truth(a), b, a), (value(variables) for value in values)
+            )
+        return lambda variables: reduce(
+            lambda a, b: np.where(_truth(a), a, b), (value(variables) for value in values)
+        )
+    if isinstance(node, ast.IfExp):
+        test, body, orelse = _array_node(node.test), _array_node(node.body), _array_node(node.orelse)
+        return lambda variables: np.where(_truth(test(variables)), body(variables), orelse(variables))
+    if isinstance(node, ast.Call):
+        function = _ARRAY_FUNCTIONS[node.func.id]
+        args = [_array_node(item) for item in node.args]
+        return lambda variables: function(*(arg(variables) for arg in args))
+    raise ValueError(f"Unsupported element {type(node).__name__}")
+
+
+def _array_rounding(spec: DerivedSpec) -> Callable[[np.ndarray], np.ndarray]:
+    precision = spec.precision
+    digits = spec.digits
+    if precision:
+        step_digits = max(0, -math.floor(math.log10(precision)))
+        return lambda value: np.round(np.round(value / precision) * precision, step_digits)
+    if digits is not None:
+        return lambda value: np.round(value, digits)
+    return lambda value: value
+
+
+def compile_derived_array(spec: DerivedSpec) -> Callable[[Mapping[int, np.ndarray]], np.ndarray]:
+    """Wie compile_derived, aber über Arrays: Register -> Rohwerte je Zeile (NaN = fehlt).
+
+    Beide Zweige eines bedingten Ausdrucks werden für alle Zeilen
+    berechnet; Division durch null und ähnliche Fehler ergeben NaN statt
+    None, wie fehlende Eingangswerte.
+
+    Raises:
+        ValueError: Der Ausdruck ist ungültig oder nutzt unbekannte Namen.
+    """
+    evaluate_tree = _array_node(_parse(spec))
+    inputs = [(name, input_spec.register, build_array_converter(input_spec)) for name, input_spec in spec.inputs]
+    finish = _array_rounding(spec)
+
+    def evaluate(columns: Mapping[int, np.ndarray]) -> np.ndarray:
+        variables = {name: convert(np.asarray(columns[register], dtype=float)) for name, register, convert in inputs}
+        missing = reduce(np.logical_or, (np.isnan(value) for value in variables.values()))
+        with np.errstate(all="ignore"):
+            value = np.asarray(evaluate_tree(variables), dtype=float)
+            value = np.broadcast_to(value, missing.shape)
+            value = np.where(missing | ~np.isfinite(value), np.nan, value)
+            return finish(value)
+
+    return evaluate
@@ -0,0 +1,171 @@
+"""Verlauf der dekodierten Registerwerte als spaltenorientierter Ringpuffer.
+
+Pro Abfrage wird eine Zeile geschrieben: der Zeitstempel und je Register
+der dekodierte Rohwert (vor Faktor bzw. Zustandstabelle, NaN für fehlende
+Werte). Jede Spalte ist ein NumPy-Array doppelter Länge, in das jede Zeile
+zweimal geschrieben wird (Index i und i + capacity). Die letzten n Zeilen
+liegen damit immer zusammenhängend im Speicher, und Abfragen liefern
+Views statt Kopien, auch über den Umlauf des Puffers hinweg.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from .registers import ValueSpec
+
+
+@dataclass(frozen=True)
+class HistoryWindow:
+    """Ein Zeitfenster des Verlaufs; alle Arrays sind schreibgeschützte Views."""
+    timestamps: np.ndarray
+    columns: Dict[int, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def scaled(self, spec: ValueSpec) -> np.ndarray:
+        """Werte einer ValueSpec mit Faktor (neues Array; NaN, wo das Register fehlt)."""
+        column = self.columns.get(spec.register)
+        if column is None:
+            return np.full(len(self.timestamps), np.nan)
+        if spec.integer or spec.states or spec.factor == 1:
+            return column.copy()
+        return column * spec.factor
+
+
+class RegisterHistory:
+    """Ringpuffer der letzten capacity Abfragen, eine Spalte pro Register."""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Invalid history capacity: {capacity}")
+        self.capacity = capacity
+        self._timestamps = np.full(2 * capacity, np.nan)
+        self._columns: Dict[int, np.ndarray] = {}
+        # Zeilennummer, in der ein Register zuletzt einen Wert hatte
+        self._last_seen: Dict[int, int] = {}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return min(self._rows, self.capacity)
+
+    @property
+    def registers(self) -> List[int]:
+        return sorted(self._columns)
+
+    @property
+    def latest_timestamp(self) -> Optional[float]:
+        if not self._rows:
+            return None
+        return float(self._timestamps[(self._rows - 1) % self.capacity])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self),
+            "capacity": self.capacity,
+            "registers": len(self._columns),
+            "bytes": self.nbytes(),
+            "latest": self.latest_timestamp,
+        }
+
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    def append(self, timestamp: float, decoded: Mapping[int, Any]) -> None:
+        """Schreibe eine Abfrage; Register ohne Wert erhalten NaN.
+
+        Spalten von Registern, die einen vollen Umlauf lang keinen Wert mehr
+        hatten (z. B. nach dem Entfernen eines Moduls), werden verworfen.
+        """
+        row = self._rows
+        index = row % self.capacity
+        mirror = index + self.capacity
+        self._timestamps[index] = self._timestamps[mirror] = timestamp
+        for register, value in decoded.items():
+            if value is None:
+                continue
+            column = self._columns.get(register)
+            if column is None:
+                column = self._columns[register] = np.full(2 * self.capacity, np.nan)
+            column[index] = column[mirror] = value
+            self._last_seen[register] = row
+
+        stale = []
+        for register, column in self._columns.items():
+            last_seen = self._last_seen[register]
+            if last_seen != row:
+                if row - last_seen >= self.capacity:
+                    stale.append(register)
+                column[index] = column[mirror] = np.nan
+        for register in stale:
+            del self._columns[register]
+            del self._last_seen[register]
+        self._rows = row + 1
+
+    def window(self, seconds: Optional[float] = None, registers: Optional[Iterable[int]] = None) -> HistoryWindow:
+        """Die Zeilen der letzten seconds Sekunden (None = alle) als Views.
+
+        Args:
+            seconds: Länge des Fensters, gezählt ab der letzten Zeile.
+            registers: Nur diese Spalten; Register ohne Verlauf fehlen im Ergebnis.
+        """
+        stop = self._stop
+        start = stop - len(self)
+        timestamps = self._timestamps[start:stop]
+        if seconds is not None and len(timestamps):
+            start += int(np.searchsorted(timestamps, timestamps[-1] - seconds, side="left"))
+            timestamps = self._timestamps[start:stop]
+        selected = self._columns if registers is None else {
+            register: self._columns[register] for register in registers if register in self._columns
+        }
+        return HistoryWindow(
+            timestamps=_readonly(timestamps),
+            columns={register: _readonly(column[start:stop]) for register, column in selected.items()},
+        )
+
+    def resize(self, capacity: int) -> None:
+        """Ändere die Zeilenanzahl; die neuesten Zeilen bleiben erhalten."""
+        if capacity < 1:
+            raise ValueError(f"Invalid history capacity: {capacity}")
+        if capacity == self.capacity:
+            return
+        kept = min(len(self), capacity)
+        stop = self._stop
+        timestamps = np.full(2 * capacity, np.nan)
+        timestamps[:kept] = timestamps[capacity:capacity + kept] = self._timestamps[stop - kept:stop]
+        for register, column in self._columns.items():
+            resized = np.full(2 * capacity, np.nan)
+            resized[:kept] = resized[capacity:capacity + kept] = column[stop - kept:stop]
+            self._columns[register] = resized
+        self._last_seen = {register: kept - 1 - (self._rows - 1 - row) for register, row in self._last_seen.items()}
+        self._timestamps = timestamps
+        self.capacity = capacity
+        self._rows = kept
+
+    def clear(self) -> None:
+        self._timestamps.fill(np.nan)
+        self._columns.clear()
+        self._last_seen.clear()
+        self._rows = 0
+
+    @property
+    def _stop(self) -> int:
+        """Ende (exklusive) der neuesten Zeile in der gespiegelten Hälfte."""
+        if not self._rows:
+            return self.capacity
+        return (self._rows - 1) % self.capacity + self.capacity + 1
+
+
+def history_capacity(hours: float, interval_seconds: float) -> int:
+    """Zeilen für hours Stunden bei einer Abfrage alle interval_seconds Sekunden."""
+    return max(1, math.ceil(hours * 3600 / interval_seconds))
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
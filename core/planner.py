@@ -0,0 +1,206 @@
+"""Referenzgezählte Register-Abonnements und der daraus kompilierte Read-Plan."""
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..logs import PLAN
+from .profile import RegisterProfile
+from .registers import MAX_REGISTER_GAP, MODULE_SEGMENT_SIZE, REGISTER_WIDTHS, RegisterBlock
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReadPlanner:
+    """Verwaltet die abonnierten Register und fasst sie zu Leseblöcken zusammen."""
+
+    def __init__(self, max_register_chunk_size: int):
+        self.max_register_chunk_size = max_register_chunk_size
+        # Abonnierte Register (Adresse -> Datentyp)
+        self.registers: Dict[int, str] = {}
+        self._refcount: Dict[int, int] = {}
+        self._plan_segments: Dict[int, List[RegisterBlock]] = {}
+        self._dirty_segments: Set[int] = set()
+        self._read_plan: Optional[List[RegisterBlock]] = None
+        self.profile: Optional[RegisterProfile] = None
+        # Register, die laut Profil nicht vorhanden sind (Segment -> Adressen)
+        self._excluded: Dict[int, Set[int]] = {}
+
+    def add_register(self, register: int, register_type: str = 'int16') -> bool:
+        """Abonniere ein Register für die zyklische Abfrage.
+
+        Die Abonnements sind referenzgezählt: mehrere Entitäten können dasselbe
+        Register abonnieren, gelesen wird es trotzdem nur einmal.
+
+        Args:
+            register: Die Register-Adresse
+            register_type: Der Typ des Registers (int16, uint16, int32, float32)
+
+        Returns:
+            True, wenn das Register neu in den Read-Plan aufgenommen wurde.
+        """
+        if register_type not in REGISTER_WIDTHS:
+            _LOGGER.warning("Unsupported register type: %s. Using default type 'int16'", register_type)
+            register_type = 'int16'
+
+        count = self._refcount.get(register, 0)
+        self._refcount[register] = count + 1
+        if count:
+            if self.registers[register] != register_type:
+                _LOGGER.warning(
+                    "Register %s is already subscribed as %s, ignoring type %s",
+                    register, self.registers[register], register_type
+                )
+            return False
+
+        self.registers[register] = register_type
+        self._mark_segment_dirty(register)
+        PLAN.debug("Added register %s (%s) to read plan", register, register_type)
+        return True
+
+    def remove_register(self, register: int) -> bool:
+        """Gib ein Register-Abonnement wieder frei.
+
+        Returns:
+            True, wenn das Register aus dem Read-Plan entfernt wurde.
+        """
+        count = self._refcount.get(register, 0)
+        if count > 1:
+            self._refcount[register] = count - 1
+            return False
+        if not count:
+            return False
+
+        del self._refcount[register]
+        del self.registers[register]
+        self._mark_segment_dirty(register)
+        PLAN.debug("Removed register %s from read plan", register)
+        return True
+
+    def clear(self) -> None:
+        self.registers.clear()
+        self._refcount.clear()
+        self._plan_segments.clear()
+        self._dirty_segments.clear()
+        self._excluded.clear()
+        self._read_plan = None
+
+    def set_chunk_size(self, max_register_chunk_size: int) -> None:
+        """Ändere die maximale Blockgröße; der Read-Plan wird vollständig neu berechnet."""
+        if max_register_chunk_size == self.max_register_chunk_size:
+            return
+        self.max_register_chunk_size = max_register_chunk_size
+        self._dirty_segments.update(register // MODULE_SEGMENT_SIZE for register in self.registers)
+        self._read_plan = None
+
+    def set_profile(self, profile: Optional[RegisterProfile]) -> None:
+        """Setze das Registerprofil (None = ohne Profil); der Read-Plan wird vollständig neu berechnet."""
+        self.profile = profile
+        self._dirty_segments.update(register // MODULE_SEGMENT_SIZE for register in self.registers)
+        self._dirty_segments.update(self._excluded)
+        self._read_plan = None
+
+    @property
+    def excluded(self) -> List[int]:
+        """Abonnierte Register, die laut Profil nicht gelesen werden können."""
+        return sorted(register for registers in self._excluded.values() for register in registers)
+
+    def is_subscribed(self, address: int) -> bool:
+        """True, wenn address zu einem abonnierten Register gehört (auch als zweites Wort)."""
+        if address in self.registers:
+            return True
+        previous = self.registers.get(address - 1)
+        return previous is not None and REGISTER_WIDTHS[previous] == 2
+
+    def _mark_segment_dirty(self, register: int) -> None:
+        """Markiere das Modul-Segment eines Registers zur Neuberechnung."""
+        self._dirty_segments.add(register // MODULE_SEGMENT_SIZE)
+        self._read_plan = None
+
+    @property
+    def read_plan(self) -> List[RegisterBlock]:
+        """Der kompilierte Read-Plan.
+
+        Nur die seit der letzten Abfrage geänderten Modul-Segmente werden neu
+        berechnet, alle anderen Blöcke werden unverändert übernommen.
+        """
+        if self._read_plan is None:
+            if self._dirty_segments:
+                by_segment: Dict[int, List[int]] = {segment: [] for segment in self._dirty_segments}
+                for register in self.registers:
+                    segment = register // MODULE_SEGMENT_SIZE
+                    if segment in by_segment:
+                        by_segment[segment].append(register)
+                for segment, registers in by_segment.items():
+                    blocks = self._compile_segment(segment, sorted(registers))
+                    if blocks:
+                        self._plan_segments[segment] = blocks
+                    else:
+                        self._plan_segments.pop(segment, None)
+                self._dirty_segments.clear()
+            self._read_plan = [
+                block
+                for segment in sorted(self._plan_segments)
+                for block in self._plan_segments[segment]
+            ]
+            if PLAN.isEnabledFor(logging.DEBUG):
+                PLAN.debug(
+                    "Read plan: %d registers in %d blocks, %d words",
+                    len(self.registers), len(self._read_plan),
+                    sum(block.count for block in self._read_plan),
+                )
+        return self._read_plan
+
+    def _compile_segment(self, segment: int, registers: List[int]) -> List[RegisterBlock]:
+        """Fasse die sortierten Register eines Segments zu Leseblöcken zusammen.
+
+        Ein Block endet, wenn er die maximale Chunk-Größe überschreiten würde
+        oder die Lücke zum nächsten Register größer als MAX_REGISTER_GAP ist.
+        Mit Registerprofil werden nicht vorhandene Register ausgelassen, und
+        ein Block endet zusätzlich beim Wechsel des Funktionscodes oder wenn
+        die Lücke Adressen enthält, die der Controller nicht liefert.
+        """
+        max_size = self.max_register_chunk_size
+        profile = self.profile
+        blocks: List[RegisterBlock] = []
+        members: List[Tuple[int, str]] = []
+        start = end = 0
+        function_code: Optional[int] = None
+        previous_excluded = self._excluded.pop(segment, set())
+        excluded: Set[int] = set()
+
+        for register in registers:
+            register_type = self.registers[register]
+            width = REGISTER_WIDTHS[register_type]
+            register_end = register + width
+            register_function = None
+            if profile is not None and profile.is_scanned(register, width):
+                register_function = profile.function_code(register, width)
+                if register_function is None:
+                    excluded.add(register)
+                    continue
+            if members and (
+                register - end > MAX_REGISTER_GAP
+                or register_end - start > max_size
+                or register_function != function_code
+                or (
+                    register > end and function_code is not None
+                    and profile.function_code(end, register - end) != function_code
+                )
+            ):
+                blocks.append(RegisterBlock(start, end - start, tuple(members), function_code))
+                members = []
+            if not members:
+                start, end = register, register_end
+                function_code = register_function
+            else:
+                end = max(end, register_end)
+            members.append((register, register_type))
+
+        if members:
+            blocks.append(RegisterBlock(start, end - start, tuple(members), function_code))
+        if excluded:
+            self._excluded[segment] = excluded
+            for register in sorted(excluded - previous_excluded):
+                _LOGGER.warning("Register %s is not served by the controller (register profile), skipping", register)
+        return blocks
@@ -0,0 +1,126 @@
+"""Registerprofil eines Controllers: welche Adressen es gibt und mit welchem Funktionscode.
+
+Das Profil entsteht mit dem RegisterScanner und wird als JSON gespeichert.
+Der ReadPlanner nimmt damit nur vorhandene Adressen in Leseblöcke auf und
+liest jeden Block direkt mit dem passenden Funktionscode.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..capture import READ_FUNCTIONS
+
+PROFILE_VERSION = 1
+PROFILE_SUFFIX = ".json"
+
+# Adressbereich als (Start, Ende exklusive)
+AddressRange = Tuple[int, int]
+
+
+def merge_ranges(ranges: Iterable[AddressRange]) -> List[AddressRange]:
+    """Sortiere Bereiche und fasse überlappende und angrenzende zusammen."""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _covers(ranges: List[AddressRange], starts: List[int], address: int, count: int) -> bool:
+    index = bisect.bisect_right(starts, address) - 1
+    return index >= 0 and ranges[index][1] >= address + count
+
+
+@dataclass
+class RegisterProfile:
+    """Ergebnis eines Scans."""
+    # Gescannte Bereiche; für Adressen außerhalb macht das Profil keine Aussage
+    scanned: List[AddressRange]
+    # Vorhandene Bereiche je Funktionscode
+    ranges: Dict[int, List[AddressRange]]
+    created: float = 0.0
+    requests: int = 0
+    duration: float = 0.0
+    _starts: Dict[Any, List[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.scanned = merge_ranges(self.scanned)
+        self.ranges = {function_code: merge_ranges(ranges) for function_code, ranges in self.ranges.items()}
+        self._starts = {key: [start for start, _ in ranges] for key, ranges in self.ranges.items()}
+        self._starts["scanned"] = [start for start, _ in self.scanned]
+
+    def is_scanned(self, address: int, count: int = 1) -> bool:
+        """True, wenn alle count Adressen ab address gescannt wurden."""
+        return _covers(self.scanned, self._starts["scanned"], address, count)
+
+    def function_code(self, address: int, count: int = 1) -> Optional[int]:
+        """Funktionscode, mit dem alle count Adressen ab address lesbar sind, sonst None."""
+        # Holding-Register haben Vorrang, wie beim Lesen ohne Profil
+        for function_code in READ_FUNCTIONS:
+            ranges = self.ranges.get(function_code)
+            if ranges and _covers(ranges, self._starts[function_code], address, count):
+                return function_code
+        return None
+
+    def served_addresses(self, function_code: int) -> int:
+        return sum(end - start for start, end in self.ranges.get(function_code, ()))
+
+    def summary(self) -> Dict[str, Any]:
+        """Kurzfassung für Diagnose und Protokoll."""
+        return {
+            "created": self.created,
+            "scanned_addresses": sum(end - start for start, end in self.scanned),
+            "served_addresses": {
+                function_code: self.served_addresses(function_code) for function_code in sorted(self.ranges)
+            },
+            "requests": self.requests,
+            "duration_s": round(self.duration, 3),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "version": PROFILE_VERSION,
+            "created": self.created,
+            "requests": self.requests,
+            "duration": self.duration,
+            "scanned": [list(item) for item in self.scanned],
+            "function_codes": {
+                str(function_code): [list(item) for item in ranges]
+                for function_code, ranges in sorted(self.ranges.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RegisterProfile":
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported register profile version: {data.get('version')}")
+        return cls(
+            scanned=[tuple(item) for item in data["scanned"]],
+            ranges={
+                int(function_code): [tuple(item) for item in ranges]
+                for function_code, ranges in data["function_codes"].items()
+            },
+            created=data.get("created", 0.0),
+            requests=data.get("requests", 0),
+            duration=data.get("duration", 0.0),
+        )
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "RegisterProfile":
+        """Lies ein Profil; wirft OSError bzw. ValueError bei fehlender oder ungültiger Datei."""
+        with open(path, encoding="utf-8") as file:
+            try:
+                return cls.from_dict(json.load(file))
+            except (KeyError, TypeError) as err:
+                raise ValueError(f"Invalid register profile {path}: {err}") from err
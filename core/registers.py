@@ -0,0 +1,189 @@
+"""Registerformate, Read-Plan-Blöcke und Umrechnung der Rohwerte."""
+from __future__ import annotations
+
+import logging
+import math
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .. import const
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anzahl der Modbus-Register (16 Bit) je Datentyp
+REGISTER_WIDTHS = {'int16': 1, 'uint16': 1, 'int32': 2, 'float32': 2}
+
+# Struct-Formate für die Dekodierung (Big-Endian Byte- und Wortreihenfolge)
+REGISTER_FORMATS = {
+    'int16': struct.Struct(">h"),
+    'uint16': struct.Struct(">H"),
+    'int32': struct.Struct(">i"),
+    'float32': struct.Struct(">f"),
+}
+
+# Jedes Modul (Wärmepumpe 1, Boiler 2, ...) belegt ein eigenes 100er-Adressfenster.
+# Leseblöcke überschreiten diese Grenze nie, und der Read-Plan wird pro Fenster
+# neu berechnet.
+MODULE_SEGMENT_SIZE = 100
+
+# Größte Lücke (in Registern), die innerhalb eines Blocks mitgelesen wird,
+# statt einen neuen Lesezugriff zu beginnen
+MAX_REGISTER_GAP = 4
+
+# Ein Wert innerhalb des Totbands wird spätestens nach dieser Zeit (Sekunden)
+# trotzdem veröffentlicht, damit kleine, stetige Drift nicht unsichtbar bleibt
+PUBLISH_HEARTBEAT = 15 * 60
+
+@dataclass(frozen=True)
+class RegisterBlock:
+    """Ein zusammenhängender Lesezugriff des Read-Plans."""
+    start: int
+    count: int
+    registers: Tuple[Tuple[int, str], ...]
+    # Funktionscode laut Registerprofil; None = FC 3 mit Rückfall auf FC 4
+    function_code: Optional[int] = None
+
+@dataclass(frozen=True)
+class ValueSpec:
+    """Beschreibt, wie ein dekodierter Registerwert für Entitäten aufbereitet wird.
+
+    Der Client berechnet pro Abfrage für jede abonnierte ValueSpec einmalig
+    den fertig skalierten, typisierten bzw. auf einen Zustand abgebildeten
+    Wert. Entitäten lesen nur noch ihren vorberechneten Eintrag aus
+    LambdaHeatpumpCoordinator.values.
+    """
+    register: int
+    data_type: str = 'int16'
+    factor: float = 1.0
+    # Zustandstabelle als (Rohwert, Zustand)-Paare, damit die Spec hashbar bleibt
+    states: Optional[Tuple[Tuple[int, str], ...]] = None
+    # Rohwert als Ganzzahl ohne Faktor liefern (z. B. Fehlernummern)
+    integer: bool = False
+    # Nachkommastellen, auf die der skalierte Wert gerundet wird
+    digits: Optional[int] = None
+    # Rundungsschritt des skalierten Werts (z. B. 0.1), filtert Rauschen der letzten Stelle
+    precision: Optional[float] = None
+    # Änderungen kleiner als das Totband lösen keinen neuen Zustand aus
+    deadband: float = 0.0
+    # Mindestabstand (Sekunden) zwischen zwei veröffentlichten Änderungen
+    min_publish_interval: float = 0.0
+
+    @property
+    def registers(self) -> Tuple[Tuple[int, str], ...]:
+        """Die von dieser Spec benötigten Register."""
+        return ((self.register, self.data_type),)
+
+@dataclass(frozen=True)
+class RegisterDefinition:
+    """Ein Wert der Register-Map mit Namen, z. B. heatpump_2_flow_line_temperature."""
+    name: str
+    spec: ValueSpec
+    unit: Optional[str] = None
+
+def register_map(module_counts: Optional[Mapping[str, int]] = None) -> List[RegisterDefinition]:
+    """Expandiere const.SENSOR_CONFIG auf die Module einer Anlage.
+
+    Args:
+        module_counts: Anzahl je Modultyp aus const.MODULE_TYPES; fehlende
+            Typen erhalten ihre Standardanzahl.
+    """
+    counts = {module_type: default for module_type, (_, default) in const.MODULE_TYPES.items()}
+    counts.update(module_counts or {})
+
+    definitions = []
+    seen = set()
+    for entry in const.SENSOR_CONFIG:
+        area = entry["bereich"]
+        # "heatpump_1" steht für alle Wärmepumpen, "general_ambient" gibt es einmal
+        module = const.get_module_of_key(area)
+        module_type = module[0] if module else area
+        states_function = entry.get("states_function")
+        states = getattr(const, states_function)() if states_function else None
+        for index in range(counts[module_type] if module else 1):
+            address = entry["register"] + index * MODULE_SEGMENT_SIZE
+            # SENSOR_CONFIG führt manche Register mehrfach, der erste Eintrag gilt
+            if address in seen:
+                continue
+            seen.add(address)
+            name = entry["name"] if area == module_type else f"{module_type}_{index + 1}{entry['name'][len(area):]}"
+            definitions.append(RegisterDefinition(
+                name=name,
+                spec=ValueSpec(
+                    register=address,
+                    data_type=entry.get("data_format", "int16"),
+                    factor=entry.get("factor", 1) or 1,
+                    states=tuple(states.items()) if states else None,
+                    integer="error_number" in name,
+                ),
+                unit=entry.get("unit_of_measurement"),
+            ))
+    return definitions
+
+def build_converter(spec: ValueSpec) -> Callable[[Any], Any]:
+    """Erzeuge die Umrechnung Rohwert -> Entitätswert für eine ValueSpec."""
+    if spec.integer:
+        return int
+    if spec.states:
+        states = dict(spec.states)
+        return lambda raw: states.get(raw, "Unknown")
+    factor = spec.factor
+    digits = spec.digits
+    precision = spec.precision
+    if precision:
+        step_digits = max(0, -math.floor(math.log10(precision)))
+        return lambda raw: round(round(raw * factor / precision) * precision, step_digits)
+    if digits is not None:
+        return lambda raw: round(raw * factor, digits)
+    if factor == 1:
+        return lambda raw: raw
+    return lambda raw: raw * factor
+
+def build_array_converter(spec: ValueSpec) -> Callable[[np.ndarray], np.ndarray]:
+    """Wie build_converter, aber für ein Array von Rohwerten (NaN = fehlt).
+
+    Zustände werden nicht auf ihre Namen abgebildet; das Ergebnis sind dann
+    die Rohwerte, die sich direkt mit den Zustandsnummern vergleichen lassen.
+    """
+    if spec.integer or spec.states:
+        return lambda raw: raw
+    factor = spec.factor
+    digits = spec.digits
+    precision = spec.precision
+    if precision:
+        step_digits = max(0, -math.floor(math.log10(precision)))
+        return lambda raw: np.round(np.round(raw * factor / precision) * precision, step_digits)
+    if digits is not None:
+        return lambda raw: np.round(raw * factor, digits)
+    if factor == 1:
+        return lambda raw: raw
+    return lambda raw: raw * factor
+
+def is_significant(spec: ValueSpec, value: Any, published: Tuple[Any, float], now: float) -> bool:
+    """Entscheide, ob ein Wert gegenüber dem zuletzt veröffentlichten signifikant ist."""
+    last_value, last_time = published
+    if value == last_value:
+        return False
+    age = now - last_time
+    if age >= PUBLISH_HEARTBEAT or value is None or last_value is None:
+        return True
+    if age < spec.min_publish_interval:
+        return False
+    if spec.deadband and isinstance(value, (int, float)) and isinstance(last_value, (int, float)):
+        # Toleranz gegen Rundungsfehler, z. B. 20.2 - 20.0 = 0.19999999999999929
+        return abs(value - last_value) >= spec.deadband - 1e-9
+    return True
+
+def decode_block(block: RegisterBlock, words: List[int]) -> Dict[int, Any]:
+    """Dekodiere alle Register eines Blocks aus den gelesenen Rohwerten."""
+    raw = struct.pack(f">{block.count}H", *words[:block.count])
+    values = {}
+    for register, register_type in block.registers:
+        try:
+            values[register] = REGISTER_FORMATS[register_type].unpack_from(raw, (register - block.start) * 2)[0]
+        except (KeyError, struct.error) as e:
+            _LOGGER.error("Error decoding register %s: %s", register, e)
+            values[register] = None
+    return values
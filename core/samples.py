@@ -0,0 +1,194 @@
+"""Hochfrequente Aufzeichnung der Registerwerte in eine Datei fester Größe.
+
+Für Inbetriebnahme oder Abtau-Analysen mit kurzem Abfrageintervall, ohne
+den Recorder von Home Assistant. Die Datei wird beim Start in voller Größe
+angelegt und per NumPy-memmap beschrieben: ein Kopf (SAMPLES_MAGIC,
+Version, Kapazität, Anzahl geschriebener Datensätze) gefolgt von
+Datensätzen fester Länge (Zeitstempel, Register, dekodierter Rohwert).
+Ist die Datei voll, überschreibt die Aufzeichnung die ältesten Datensätze.
+
+Das Anhängen ist ein reiner Speicherzugriff und läuft deshalb direkt im
+Event-Loop; nur Anlegen, Flush und Schließen gehören in einen Executor.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import os
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+SAMPLES_MAGIC = b"LMBS"
+SAMPLES_VERSION = 1
+SAMPLES_SUFFIX = ".lmbs"
+DEFAULT_SAMPLES_SIZE_MB = 64
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u1"),
+    ("reserved", "V3"),
+    ("capacity", "<u8"),
+    ("written", "<u8"),
+    ("padding", "V40"),
+])
+# Zeitstempel (Unix), Register-Adresse, dekodierter Wert vor Faktor
+SAMPLE_DTYPE = np.dtype([("timestamp", "<f8"), ("register", "<u2"), ("value", "<f8")])
+
+EXPORT_FORMATS = ("csv", "npy")
+
+
+def samples_capacity(size_bytes: int) -> int:
+    """Anzahl Datensätze, die in eine Datei von size_bytes passen."""
+    return max(1, (size_bytes - HEADER_DTYPE.itemsize) // SAMPLE_DTYPE.itemsize)
+
+
+def _read_header(path: str) -> np.void:
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) < 1 or header[0]["magic"] != SAMPLES_MAGIC or header[0]["version"] != SAMPLES_VERSION:
+        raise ValueError(f"{path} is not a Lambda sample file (version {SAMPLES_VERSION})")
+    return header[0]
+
+
+class SampleWriter:
+    """Hängt die Werte jeder Abfrage an eine vorab angelegte Ringdatei an.
+
+    Das Anlegen blockiert und muss im Executor erfolgen. Existiert bereits
+    eine Datei gleicher Kapazität, wird sie fortgesetzt.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Invalid sample capacity: {capacity}")
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_DTYPE.itemsize + capacity * SAMPLE_DTYPE.itemsize
+        try:
+            resume = _read_header(path)["capacity"] == capacity and os.path.getsize(path) == size
+        except (OSError, ValueError):
+            resume = False
+        if not resume:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "wb") as file:
+                # Platz gleich reservieren, damit die Aufzeichnung nicht an voller Platte scheitert
+                if hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(file.fileno(), 0, size)
+                else:
+                    file.truncate(size)
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        self._records = np.memmap(
+            path, dtype=SAMPLE_DTYPE, mode="r+", offset=HEADER_DTYPE.itemsize, shape=(capacity,)
+        )
+        if not resume:
+            self._header["magic"] = SAMPLES_MAGIC
+            self._header["version"] = SAMPLES_VERSION
+            self._header["capacity"] = capacity
+            self._header["written"] = 0
+        self.written = int(self._header[0]["written"])
+
+    def append(self, timestamp: float, decoded: Mapping[int, Any]) -> int:
+        """Schreibe die Werte einer Abfrage (ohne fehlende); liefert die Anzahl Datensätze."""
+        if self._records is None:
+            return 0
+        items = [(register, value) for register, value in decoded.items() if value is not None]
+        if not items:
+            return 0
+        items = items[-self.capacity:]
+        batch = np.empty(len(items), dtype=SAMPLE_DTYPE)
+        batch["timestamp"] = timestamp
+        batch["register"], batch["value"] = zip(*items)
+
+        head = self.written % self.capacity
+        first = min(len(batch), self.capacity - head)
+        self._records[head:head + first] = batch[:first]
+        if first < len(batch):
+            self._records[:len(batch) - first] = batch[first:]
+        self.written += len(batch)
+        self._header["written"] = self.written
+        return len(batch)
+
+    def flush(self) -> None:
+        if self._records is not None:
+            self._records.flush()
+            self._header.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._records = None
+        self._header = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "capacity": self.capacity,
+            "written": self.written,
+            "wrapped": self.written > self.capacity,
+        }
+
+
+def read_samples(
+    path: str, since: Optional[float] = None, registers: Optional[Iterable[int]] = None
+) -> np.ndarray:
+    """Lies die Datensätze einer Sample-Datei, ältester zuerst.
+
+    Args:
+        since: Nur Datensätze ab diesem Unix-Zeitstempel.
+        registers: Nur diese Register.
+
+    Returns:
+        Strukturiertes Array mit SAMPLE_DTYPE (Kopie, unabhängig von der Datei).
+    """
+    header = _read_header(path)
+    capacity = int(header["capacity"])
+    written = int(header["written"])
+    records = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(capacity,))
+    if written <= capacity:
+        samples = np.array(records[:written])
+    else:
+        head = written % capacity
+        samples = np.concatenate((records[head:], records[:head]))
+    del records
+    if since is not None:
+        samples = samples[samples["timestamp"] >= since]
+    if registers is not None:
+        samples = samples[np.isin(samples["register"], np.fromiter(registers, dtype="<u2"))]
+    return samples
+
+
+def pivot_samples(samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Forme Datensätze in eine Tabelle um: (Zeitstempel, Register, Werte[Zeile, Spalte]).
+
+    Fehlende Werte sind NaN.
+    """
+    timestamps, rows = np.unique(samples["timestamp"], return_inverse=True)
+    registers, columns = np.unique(samples["register"], return_inverse=True)
+    table = np.full((len(timestamps), len(registers)), np.nan)
+    table[rows, columns] = samples["value"]
+    return timestamps, registers, table
+
+
+def export_samples(
+    path: str, output: str, export_format: str = "csv", since: Optional[float] = None
+) -> int:
+    """Exportiere eine Sample-Datei; liefert die Anzahl exportierter Datensätze.
+
+    csv schreibt eine Zeile pro Abfrage und eine Spalte pro Register, npy
+    das strukturierte Array mit SAMPLE_DTYPE (np.load).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    samples = read_samples(path, since)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if export_format == "npy":
+        np.save(output, samples)
+    else:
+        timestamps, registers, table = pivot_samples(samples)
+        with open(output, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["timestamp", *(str(register) for register in registers)])
+            for timestamp, row in zip(timestamps, table):
+                writer.writerow([f"{timestamp:.3f}", *("" if np.isnan(value) else repr(float(value)) for value in row)])
+    _LOGGER.info("Exported %d samples from %s to %s", len(samples), path, output)
+    return len(samples)
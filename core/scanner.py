@@ -0,0 +1,150 @@
+"""Schneller Scan des Adressraums eines Lambda-Controllers.
+
+Statt jede Adresse einzeln abzufragen, liest der Scanner große Blöcke
+(bis 125 Register). Antwortet der Controller mit einer Exception, wird der
+Block halbiert, bis die fehlende Adresse isoliert ist; nach einem
+erfolgreichen Block wächst die Blockgröße wieder auf das Maximum. Eine
+zusammenhängende Registerreihe kostet damit eine Anfrage, jede fehlende
+Adresse etwa eine.
+
+Gescannt wird pro 100er-Modulfenster. Liefert die erste Adresse eines
+Fensters (Fehlernummer bzw. Fehlerstatus des Moduls) mit keinem
+Funktionscode eine Antwort, gilt das Modul als nicht vorhanden und das
+Fenster wird übersprungen. Adressen ohne Antwort auf FC 3 werden
+anschließend mit FC 4 geprüft.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .. import const
+from ..capture import READ_FUNCTIONS
+from .client import LambdaClient, LambdaClientError
+from .profile import AddressRange, RegisterProfile, merge_ranges
+from .registers import MODULE_SEGMENT_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_SCAN_BLOCK = 125
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+# Exception-Codes, die "hier nicht vorhanden" bedeuten; alle anderen brechen den Scan ab
+NOT_SERVED_CODES = (ILLEGAL_FUNCTION, ILLEGAL_DATA_ADDRESS, ILLEGAL_DATA_VALUE)
+
+
+def default_scan_windows() -> List[AddressRange]:
+    """Alle Modulfenster bis zur höchsten Modulanzahl je Typ."""
+    return [
+        (base + index * MODULE_SEGMENT_SIZE, base + (index + 1) * MODULE_SEGMENT_SIZE)
+        for base, count in const.MODULE_ADDRESS_SPACE.values()
+        for index in range(count)
+    ]
+
+
+def parse_ranges(text: str) -> List[AddressRange]:
+    """Lies "0-199,1000-1099" (Ende inklusive) in Bereiche (Start, Ende exklusive)."""
+    ranges = []
+    for item in filter(None, text.split(",")):
+        start, _, end = item.partition("-")
+        first = int(start)
+        last = int(end) if end else first
+        if not 0 <= first <= last <= 0xFFFF:
+            raise ValueError(f"Invalid address range: {item}")
+        ranges.append((first, last + 1))
+    return ranges
+
+
+class RegisterScanner:
+    """Ermittelt mit einem LambdaClient, welche Adressen der Controller bedient."""
+
+    def __init__(self, client: LambdaClient, max_block: int = MAX_SCAN_BLOCK, skip_absent_modules: bool = True):
+        if not 1 <= max_block <= MAX_SCAN_BLOCK:
+            raise ValueError(f"Invalid scan block size: {max_block}")
+        self.client = client
+        self.max_block = max_block
+        self.skip_absent_modules = skip_absent_modules
+        self.requests = 0
+        # Funktionscodes, die der Controller mit ILLEGAL_FUNCTION ablehnt
+        self._unsupported: Set[int] = set()
+
+    async def async_scan(self, windows: Optional[Sequence[AddressRange]] = None) -> RegisterProfile:
+        """Scanne die Bereiche (Standard: alle Modulfenster) und liefere das Profil.
+
+        Raises:
+            LambdaClientError: Verbindung verloren oder unerwartete Antwort.
+        """
+        windows = list(windows) if windows is not None else default_scan_windows()
+        started = time.monotonic()
+        served: Dict[int, List[AddressRange]] = {function_code: [] for function_code in READ_FUNCTIONS}
+        for start, end in windows:
+            if self.skip_absent_modules and not await self._window_present(start):
+                _LOGGER.debug("No response at %d, skipping %d-%d", start, start, end - 1)
+                continue
+            missing = [(start, end)]
+            for function_code in READ_FUNCTIONS:
+                remaining: List[AddressRange] = []
+                for first, last in missing:
+                    found, unserved = await self._walk(function_code, first, last)
+                    served[function_code].extend(found)
+                    remaining.extend(unserved)
+                missing = remaining
+                if not missing:
+                    break
+
+        profile = RegisterProfile(
+            scanned=windows,
+            ranges={function_code: ranges for function_code, ranges in served.items() if ranges},
+            created=time.time(),
+            requests=self.requests,
+            duration=time.monotonic() - started,
+        )
+        _LOGGER.info("Register scan finished: %s", profile.summary())
+        return profile
+
+    async def _window_present(self, address: int) -> bool:
+        for function_code in READ_FUNCTIONS:
+            if await self._probe(function_code, address, 1):
+                return True
+        return False
+
+    async def _walk(self, function_code: int, start: int, end: int) -> Tuple[List[AddressRange], List[AddressRange]]:
+        """Vorhandene und fehlende Bereiche zwischen start und end für einen Funktionscode."""
+        served: List[AddressRange] = []
+        missing: List[AddressRange] = []
+        address = start
+        size = self.max_block
+        while address < end:
+            count = min(size, end - address)
+            if await self._probe(function_code, address, count):
+                served.append((address, address + count))
+                address += count
+                size = min(size * 2, self.max_block)
+            elif function_code in self._unsupported:
+                missing.append((address, end))
+                break
+            elif count > 1:
+                size = count // 2
+            else:
+                missing.append((address, address + 1))
+                address += 1
+        return merge_ranges(served), merge_ranges(missing)
+
+    async def _probe(self, function_code: int, address: int, count: int) -> bool:
+        """True, wenn der Controller alle count Register ab address liefert."""
+        if function_code in self._unsupported:
+            return False
+        self.requests += 1
+        result = await self.client.async_read_registers(function_code, address, count)
+        if not result.isError():
+            return len(result.registers) >= count
+        code = getattr(result, "exception_code", None)
+        if code not in NOT_SERVED_CODES:
+            raise LambdaClientError(f"Scan aborted at FC{function_code} {address}+{count}: {result}")
+        if code == ILLEGAL_FUNCTION:
+            _LOGGER.debug("Function code %d is not supported by the controller", function_code)
+            self._unsupported.add(function_code)
+        return False
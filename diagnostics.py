@@ -0,0 +1,28 @@
+"""Diagnose-Download für die Lambda Heatpump Integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_MODBUS_HOST, DOMAIN
+from .modbus_server import DATA_MODBUS_SERVERS
+
+TO_REDACT = {CONF_MODBUS_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Diagnosedaten eines Config Entries: Read-Plan, Latenzen, Verbindungshistorie, Registerabbild."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    server = hass.data.get(DATA_MODBUS_SERVERS, {}).get(entry.entry_id)
+    return {
+        "entry": {
+            "title": entry.title,
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "coordinator": coordinator.async_get_diagnostics() if coordinator is not None else None,
+        "modbus_server": server.as_dict() if server is not None else None,
+    }
@@ -0,0 +1,34 @@
+"""Gemeinsame Basisklasse der Lambda Heatpump Entitäten."""
+from __future__ import annotations
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import LambdaHeatpumpCoordinator, ValueSpec
+
+
+class LambdaHeatpumpEntity(CoordinatorEntity[LambdaHeatpumpCoordinator]):
+    """Entität, deren Modbus-Register nur abgefragt werden, solange sie aktiv ist.
+
+    Die Werte (und damit die Register) werden erst in async_added_to_hass
+    abonniert und in async_will_remove_from_hass wieder freigegeben. Im
+    Entity Registry deaktivierte Entitäten werden nie hinzugefügt und
+    verursachen daher keinen Busverkehr.
+    """
+
+    # Vorberechnete Werte, die diese Entität vom Koordinator benötigt
+    _value_specs: tuple[ValueSpec, ...] = ()
+    # Weitere Einträge des Koordinator-Kontexts, z. B. Zähler
+    _context_keys: tuple = ()
+
+    async def async_added_to_hass(self) -> None:
+        """Abonniere die Werte, sobald die Entität aktiv ist."""
+        # Über den Kontext entscheidet der Koordinator, ob sich ein Wert dieser
+        # Entität signifikant geändert hat und sie benachrichtigt werden muss
+        self.coordinator_context = frozenset((*self._value_specs, *self._context_keys))
+        await super().async_added_to_hass()
+        self.coordinator.subscribe_values(self._value_specs)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Gib die Werte frei, wenn die Entität entfernt oder deaktiviert wird."""
+        self.coordinator.unsubscribe_values(self._value_specs)
+        await super().async_will_remove_from_hass()
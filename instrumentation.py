@@ -0,0 +1,244 @@
+"""Messwerte pro Abfragezyklus und gleitende Perzentile."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional
+
+# Anzahl der Zyklen, über die die Perzentile gebildet werden
+# (bei 10 s Abfrageintervall eine Stunde)
+STATISTICS_WINDOW = 360
+# Typische Anzahl Leseblöcke pro Zyklus für das Fenster der Blocklatenzen
+BLOCKS_PER_CYCLE = 16
+
+# Obergrenzen der Latenz-Histogramme in Sekunden (plus Überlauf-Bucket)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Modbus-TCP-Rahmen: MBAP-Header (7 Byte) plus PDU; TCP/IP-Header nicht enthalten
+MBAP_HEADER_SIZE = 7
+READ_REQUEST_SIZE = MBAP_HEADER_SIZE + 5
+EXCEPTION_RESPONSE_SIZE = MBAP_HEADER_SIZE + 2
+
+
+def read_response_size(count: int) -> int:
+    """Größe der Antwort auf eine Leseanfrage über count Register."""
+    return MBAP_HEADER_SIZE + 2 + 2 * count
+
+
+def write_request_size(count: int) -> int:
+    """Größe einer Anfrage "Write Multiple Registers" über count Register."""
+    return MBAP_HEADER_SIZE + 6 + 2 * count
+
+
+WRITE_RESPONSE_SIZE = MBAP_HEADER_SIZE + 5
+
+
+@dataclass
+class CycleMetrics:
+    """Messwerte eines Abfragezyklus (Zeiten in Sekunden)."""
+    started: float = 0.0
+    duration: float = 0.0
+    requests: int = 0
+    failed_requests: int = 0
+    # Wiederholungen: fehlgeschlagene Verbindungsversuche und Ausweichen auf Input-Register
+    retries: int = 0
+    block_latencies: List[float] = field(default_factory=list)
+    decode_time: float = 0.0
+    fanout_time: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    success: bool = True
+
+    @property
+    def bytes_total(self) -> int:
+        return self.bytes_sent + self.bytes_received
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Perzentil einer sortierten Liste nach dem Nearest-Rank-Verfahren."""
+    if not ordered:
+        return math.nan
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class RollingStatistic:
+    """Gleitendes Fenster über die letzten window Messwerte."""
+
+    def __init__(self, window: int = STATISTICS_WINDOW):
+        self._values: Deque[float] = deque(maxlen=window)
+        self._ordered: Optional[List[float]] = None
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+        self._ordered = None
+
+    def extend(self, values: Iterable[float]) -> None:
+        self._values.extend(values)
+        self._ordered = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._values[-1] if self._values else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return sum(self._values) / len(self._values) if self._values else None
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._values:
+            return None
+        if self._ordered is None:
+            self._ordered = sorted(self._values)
+        return percentile(self._ordered, fraction)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "last": self.last,
+            "mean": self.mean,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class PollStatistics:
+    """Gleitende Statistik über die letzten Abfragezyklen eines Koordinators."""
+
+    METRICS = ("duration", "block_latency", "decode_time", "fanout_time", "requests", "retries", "bytes")
+
+    def __init__(self, window: int = STATISTICS_WINDOW):
+        self.window = window
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.last: Optional[CycleMetrics] = None
+        self.series: Dict[str, RollingStatistic] = {name: RollingStatistic(window) for name in self.METRICS}
+        # Mehrere Blöcke pro Zyklus, daher ein entsprechend größeres Fenster
+        self.series["block_latency"] = RollingStatistic(window * BLOCKS_PER_CYCLE)
+
+    def record(self, metrics: CycleMetrics) -> None:
+        """Übernimm die Messwerte eines abgeschlossenen Zyklus."""
+        self.cycles += 1
+        self.last = metrics
+        if not metrics.success:
+            self.failed_cycles += 1
+        self.series["duration"].add(metrics.duration)
+        self.series["block_latency"].extend(metrics.block_latencies)
+        self.series["decode_time"].add(metrics.decode_time)
+        self.series["requests"].add(metrics.requests)
+        self.series["retries"].add(metrics.retries)
+        self.series["bytes"].add(metrics.bytes_total)
+
+    def record_fanout(self, metrics: CycleMetrics, fanout_time: float) -> None:
+        """Übernimm die Dauer der Listener-Benachrichtigung.
+
+        Die Benachrichtigung folgt erst nach record(), damit Diagnose-Sensoren
+        bereits die Werte des aktuellen Zyklus anzeigen; ihre Dauer geht
+        deshalb erst ab dem nächsten Zyklus in die Sensoren ein. Nach
+        wiederholten Fehlern benachrichtigt Home Assistant keine Listener,
+        für diese Zyklen fehlt dann nur die Dauer.
+        """
+        metrics.fanout_time = fanout_time
+        self.series["fanout_time"].add(fanout_time)
+
+    def percentile(self, metric: str, fraction: float) -> Optional[float]:
+        return self.series[metric].percentile(fraction)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            **{name: series.summary() for name, series in self.series.items()},
+        }
+
+
+class LatencyHistogram:
+    """Histogramm über Latenzen mit festen Bucket-Grenzen (kumulativ wie bei Prometheus)."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[int]:
+        """Anzahl der Werte <= der jeweiligen Bucket-Grenze, zuletzt inklusive Überlauf."""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def as_dict(self) -> Dict[str, object]:
+        labels = [f"le_{bound * 1000:g}ms" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": dict(zip(labels, self.cumulative())),
+        }
+
+
+@dataclass
+class WriteStatistics:
+    """Zähler für Schreibzugriffe auf Register."""
+    writes: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    last_register: Optional[int] = None
+    last_write: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "writes": self.writes,
+            "failures": self.failures,
+            "avg_ms": round(self.total_time / self.writes * 1000, 3) if self.writes else None,
+            "last_register": self.last_register,
+            "last_write": self.last_write,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class TransportCounters:
+    """Monoton steigende Zähler des Modbus-Transports für den Prometheus-Export.
+
+    Sie werden ausschließlich im Event-Loop erhöht und kommen daher ohne
+    Sperre aus; der Text entsteht erst beim Abruf.
+    """
+    # Funktionscode -> Anzahl Anfragen
+    requests: Dict[int, int] = field(default_factory=dict)
+    # Modbus-Exception-Code bzw. Name der Python-Exception -> Anzahl
+    errors: Dict[str, int] = field(default_factory=dict)
+    # connect, reconnect, connect_failed, connection_error, closed -> Anzahl
+    connection_events: Dict[str, int] = field(default_factory=dict)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # Durch den Signifikanzfilter eingesparte Zustandsänderungen
+    state_writes_suppressed: int = 0
+    # An den Modbus-Thread übergebene, noch nicht beendete Aufrufe
+    queue_depth: int = 0
+    queue_depth_max: int = 0
+
+    def count_request(self, function_code: int) -> None:
+        self.requests[function_code] = self.requests.get(function_code, 0) + 1
+
+    def count_error(self, code: str) -> None:
+        self.errors[code] = self.errors.get(code, 0) + 1
+
+    def count_connection_event(self, event: str) -> None:
+        self.connection_events[event] = self.connection_events.get(event, 0) + 1
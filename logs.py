@@ -0,0 +1,48 @@
+"""Debug-Logger nach Kategorie für den Abfragepfad.
+
+Jede Kategorie ist ein eigener Kind-Logger und lässt sich in der
+Home-Assistant-Konfiguration einzeln einschalten::
+
+    logger:
+      logs:
+        custom_components.lambda_heatpumps.transport: debug
+
+- plan: Abonnements und Aufbau des Read-Plans
+- transport: Modbus-Anfragen pro Block, Ausweichen auf Input-Register
+- decode: fehlende Werte pro Zyklus
+- entities: Benachrichtigung und Aktualisierung der Entitäten
+
+Die Abfrageschleife fragt die Schalter einmal pro Zyklus über
+DebugFlags.current() ab; bei ausgeschaltetem Debug-Level kostet eine
+Protokollstelle danach nur noch eine Attributprüfung, Argumente werden
+weder berechnet noch formatiert.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+_PACKAGE = __name__.rpartition(".")[0] or __name__
+
+PLAN = logging.getLogger(f"{_PACKAGE}.plan")
+TRANSPORT = logging.getLogger(f"{_PACKAGE}.transport")
+DECODE = logging.getLogger(f"{_PACKAGE}.decode")
+ENTITIES = logging.getLogger(f"{_PACKAGE}.entities")
+
+
+@dataclass(frozen=True)
+class DebugFlags:
+    """Debug-Schalter der Kategorien zu Beginn eines Zyklus."""
+    plan: bool = False
+    transport: bool = False
+    decode: bool = False
+    entities: bool = False
+
+    @classmethod
+    def current(cls) -> "DebugFlags":
+        return cls(
+            plan=PLAN.isEnabledFor(logging.DEBUG),
+            transport=TRANSPORT.isEnabledFor(logging.DEBUG),
+            decode=DECODE.isEnabledFor(logging.DEBUG),
+            entities=ENTITIES.isEnabledFor(logging.DEBUG),
+        )
@@ -0,0 +1,182 @@
+"""Prometheus-Export der Transport-Zähler aller Lambda Config Entries.
+
+Der Endpunkt /api/lambda_heatpumps/metrics verlangt wie die übrige HA-API
+einen Long-Lived Access Token und liefert nur Config Entries, in deren
+Optionen der Export aktiviert ist::
+
+    scrape_configs:
+      - job_name: lambda
+        metrics_path: /api/lambda_heatpumps/metrics
+        bearer_token: "<Long-Lived Access Token>"
+        static_configs:
+          - targets: ["homeassistant.local:8123"]
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_PROMETHEUS_METRICS, DOMAIN, get_entry_option
+from .instrumentation import LatencyHistogram
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = DOMAIN
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"
+
+Labels = Tuple[Tuple[str, Any], ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsBuilder:
+    """Sammelt Samples nach Metrik-Familie und erzeugt das Textformat 0.0.4."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> List[str]:
+        if name not in self._families:
+            self._families[name] = (kind, help_text, [])
+        return self._families[name][2]
+
+    @staticmethod
+    def _sample(name: str, labels: Labels, value: float) -> str:
+        if labels:
+            text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+            return f"{name}{{{text}}} {_format_value(value)}"
+        return f"{name} {_format_value(value)}"
+
+    def add(self, name: str, kind: str, help_text: str, labels: Labels, value: Optional[float]) -> None:
+        if value is None:
+            return
+        name = f"{PREFIX}_{name}"
+        self._family(name, kind, help_text).append(self._sample(name, labels, value))
+
+    def add_histogram(self, name: str, help_text: str, labels: Labels, histogram: LatencyHistogram) -> None:
+        name = f"{PREFIX}_{name}"
+        samples = self._family(name, "histogram", help_text)
+        bounds: Iterable[float] = (*histogram.buckets, float("inf"))
+        for bound, count in zip(bounds, histogram.cumulative()):
+            samples.append(self._sample(f"{name}_bucket", (*labels, ("le", _format_value(bound))), count))
+        samples.append(self._sample(f"{name}_sum", labels, histogram.sum))
+        samples.append(self._sample(f"{name}_count", labels, histogram.count))
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text, samples) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+        merged.count += histogram.count
+        merged.sum += histogram.sum
+        merged.max = max(merged.max, histogram.max)
+    return merged
+
+
+def render_metrics(coordinators: Mapping[str, Any]) -> str:
+    """Textformat für alle übergebenen Koordinatoren (entry_id -> Koordinator)."""
+    builder = MetricsBuilder()
+    for entry_id, coordinator in coordinators.items():
+        entry: Labels = (("entry_id", entry_id),)
+        transport = coordinator.transport
+        statistics = coordinator.poll_statistics
+        writes = coordinator.write_statistics
+
+        builder.add("polls_total", "counter", "Poll cycles run.", entry, statistics.cycles)
+        builder.add("poll_failures_total", "counter", "Poll cycles that failed.", entry, statistics.failed_cycles)
+        builder.add("connected", "gauge", "1 while the Modbus connection is up.", entry, int(coordinator.connected))
+        for function_code, count in sorted(transport.requests.items()):
+            builder.add(
+                "requests_total", "counter", "Modbus requests by function code.",
+                (*entry, ("function_code", function_code)), count,
+            )
+        for code, count in sorted(transport.errors.items()):
+            builder.add(
+                "request_errors_total", "counter",
+                "Failed requests by Modbus exception code or Python exception type.",
+                (*entry, ("code", code)), count,
+            )
+        for event, count in sorted(transport.connection_events.items()):
+            builder.add(
+                "connection_events_total", "counter",
+                "Connection events (connect, reconnect, connect_failed, connection_error, closed).",
+                (*entry, ("event", event)), count,
+            )
+        builder.add("bytes_sent_total", "counter", "Modbus TCP bytes sent by read requests.", entry, transport.bytes_sent)
+        builder.add(
+            "bytes_received_total", "counter", "Modbus TCP bytes received for read requests.",
+            entry, transport.bytes_received,
+        )
+        builder.add("queue_depth", "gauge", "Calls handed to the Modbus thread and not yet finished.", entry, transport.queue_depth)
+        builder.add(
+            "queue_depth_max", "gauge", "Highest queue depth since start.", entry, transport.queue_depth_max,
+        )
+        builder.add("writes_total", "counter", "Register writes.", entry, writes.writes)
+        builder.add("write_failures_total", "counter", "Register writes that failed.", entry, writes.failures)
+        builder.add(
+            "state_writes_suppressed_total", "counter",
+            "Entity state writes saved by the significance filter.", entry, transport.state_writes_suppressed,
+        )
+
+        histograms = dict(coordinator.block_histograms)
+        builder.add_histogram(
+            "request_latency_seconds", "Latency of a read plan block including retries.",
+            entry, _merge_histograms(histograms.values()),
+        )
+        for start, histogram in sorted(histograms.items()):
+            builder.add_histogram(
+                "block_latency_seconds", "Latency per read plan block (start address).",
+                (*entry, ("block", start)), histogram,
+            )
+    return builder.render()
+
+
+class LambdaMetricsView(HomeAssistantView):
+    """Prometheus-Endpunkt; Authentifizierung über die HA-API."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        coordinators = {
+            entry.entry_id: self.hass.data[DOMAIN][entry.entry_id]
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id in self.hass.data.get(DOMAIN, {})
+            and get_entry_option(entry, CONF_PROMETHEUS_METRICS, False)
+        }
+        if not coordinators:
+            return web.Response(status=404, text="Prometheus metrics are not enabled for any Lambda entry\n")
+        return web.Response(body=render_metrics(coordinators).encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+@callback
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Registriere den Endpunkt einmalig; er bleibt bis zum Neustart bestehen."""
+    if hass.data.get(DATA_METRICS_VIEW):
+        return
+    hass.http.register_view(LambdaMetricsView(hass))
+    hass.data[DATA_METRICS_VIEW] = True
@@ -0,0 +1,347 @@
+"""Lokaler Modbus-TCP-Server, der das Registerabbild des Koordinators weitergibt.
+
+Weitere Verbraucher (evcc, Gebäudeleittechnik) lesen über diesen Server statt
+direkt vom Lambda-Controller; zum Controller besteht damit unabhängig von der
+Anzahl der Verbraucher genau eine Verbindung.
+
+- Lesen (FC 3/4) wird aus dem Registerabbild beantwortet. Ist ein Wort älter
+  als MAX_AGE_INTERVALS Abfrageintervalle oder noch nie gelesen worden,
+  antwortet der Server mit "Gateway Target Device Failed to Respond" (0x0B).
+  Noch nicht abonnierte Register werden dabei abonniert und sind ab der
+  nächsten Abfrage verfügbar, aber nur Adressen aus der Register-Map oder
+  dem Registerprofil und höchstens MAX_SERVER_SUBSCRIPTIONS Register; andere
+  Adressen erhalten "Illegal Data Address" (0x02). Liest kein Client ein
+  solches Register SUBSCRIPTION_IDLE_POLLS Abfragen lang, wird es wieder
+  freigegeben.
+- Schreiben (FC 6/16) wird nur für die Register der Number- und
+  Climate-Entitäten über den Koordinator an den Controller weitergeleitet
+  und erst nach dessen Antwort bestätigt.
+
+Der Server lauscht ohne Authentifizierung, standardmäßig nur auf localhost.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .climate import _module_descriptions as climate_descriptions
+from .const import (
+    CONF_MODBUS_SERVER,
+    CONF_MODBUS_SERVER_HOST,
+    CONF_MODBUS_SERVER_PORT,
+    DEFAULT_MODBUS_SERVER_HOST,
+    DEFAULT_MODBUS_SERVER_PORT,
+    DOMAIN,
+    get_entry_option,
+    get_module_counts,
+)
+from .coordinator import LambdaHeatpumpCoordinator
+from .core import REGISTER_WIDTHS, register_map
+from .number import _module_descriptions as number_descriptions
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MODBUS_SERVERS = f"{DOMAIN}_modbus_servers"
+# Ältere Werte gelten als veraltet (Vielfache des Abfrageintervalls)
+MAX_AGE_INTERVALS = 3
+MAX_READ_COUNT = 125
+MAX_WRITE_COUNT = 123
+# Höchstzahl der Register, die nur der Server abonniert
+MAX_SERVER_SUBSCRIPTIONS = 64
+# Nach so vielen Abfragen ohne Lesezugriff eines Clients wird ein solches Register freigegeben
+SUBSCRIPTION_IDLE_POLLS = 10
+
+READ_HOLDING_REGISTERS = 3
+READ_INPUT_REGISTERS = 4
+WRITE_SINGLE_REGISTER = 6
+WRITE_MULTIPLE_REGISTERS = 16
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+GATEWAY_TARGET_FAILED = 0x0B
+
+
+@dataclass
+class ServerStatistics:
+    """Zähler des Servers für die Diagnose."""
+    connections: int = 0
+    active_connections: int = 0
+    reads: int = 0
+    unavailable_reads: int = 0
+    rejected_reads: int = 0
+    refused_subscriptions: int = 0
+    writes: int = 0
+    failed_writes: int = 0
+    rejected_writes: int = 0
+    exceptions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def writable_registers(module_counts: Mapping[str, int]) -> FrozenSet[int]:
+    """Die Register, die die Number- und Climate-Entitäten der Integration schreiben."""
+    registers = {description.register for description in number_descriptions(module_counts)}
+    for description in climate_descriptions(module_counts):
+        registers.add(description.register_setpoint)
+        if description.register_mode is not None:
+            registers.add(description.register_mode)
+    return frozenset(registers)
+
+
+class RegisterImageServer:
+    """Modbus-TCP-Server im Event-Loop von Home Assistant."""
+
+    def __init__(
+        self,
+        coordinator: LambdaHeatpumpCoordinator,
+        host: str = DEFAULT_MODBUS_SERVER_HOST,
+        port: int = DEFAULT_MODBUS_SERVER_PORT,
+        module_counts: Optional[Mapping[str, int]] = None,
+    ):
+        self.coordinator = coordinator
+        self.host = host
+        self.port = port
+        self.stats = ServerStatistics()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._remove_listener: Optional[Callable[[], None]] = None
+        # Wortadresse -> (Register, Typ) der Register-Map
+        self._known: Dict[int, Tuple[int, str]] = {}
+        self._writable: FrozenSet[int] = frozenset()
+        self.set_module_counts(module_counts or {})
+        # Vom Server abonnierte Register -> (Typ, Abfrage des letzten Lesezugriffs)
+        self._subscribed: Dict[int, Tuple[str, int]] = {}
+        self._polls = 0
+
+    def set_module_counts(self, module_counts: Mapping[str, int]) -> None:
+        """Leite die lesbaren und beschreibbaren Adressen aus den Modulanzahlen ab."""
+        known: Dict[int, Tuple[int, str]] = {}
+        for definition in register_map(module_counts):
+            spec = definition.spec
+            for address in range(spec.register, spec.register + REGISTER_WIDTHS[spec.data_type]):
+                known.setdefault(address, (spec.register, spec.data_type))
+        self._known = known
+        self._writable = writable_registers(module_counts)
+
+    @property
+    def max_age(self) -> float:
+        """Höchstes Alter eines ausgelieferten Werts in Sekunden."""
+        return MAX_AGE_INTERVALS * self.coordinator.update_interval.total_seconds()
+
+    async def start(self) -> None:
+        """Starte den Server; bei port=0 wird ein freier Port gewählt."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._remove_listener = self.coordinator.async_add_listener(self._handle_poll)
+        _LOGGER.info("Modbus re-export server listening on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        self._server.close()
+        for task in self._connections.values():
+            task.cancel()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self._subscribed:
+            self._unsubscribe(list(self._subscribed))
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "max_age": self.max_age,
+            "subscribed_registers": sorted(self._subscribed),
+            "writable_registers": sorted(self._writable),
+            **self.stats.as_dict(),
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        self.stats.active_connections += 1
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction_id, protocol_id, length, unit_id = struct.unpack(">HHHB", header)
+                if protocol_id != 0 or length < 2:
+                    break
+                pdu = await reader.readexactly(length - 1)
+                response = await self.handle_pdu(pdu)
+                writer.write(struct.pack(">HHHB", transaction_id, 0, len(response) + 1, unit_id) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Auch beim Abbruch durch stop(); CancelledError wird danach weitergereicht
+            self.stats.active_connections -= 1
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def handle_pdu(self, pdu: bytes) -> bytes:
+        """Beantworte eine Modbus-PDU (ohne MBAP-Header)."""
+        function_code = pdu[0]
+        try:
+            if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+                address, count = struct.unpack_from(">HH", pdu, 1)
+                return self._read(function_code, address, count)
+            if function_code == WRITE_SINGLE_REGISTER:
+                address, value = struct.unpack_from(">HH", pdu, 1)
+                error = await self._write(address, [value])
+                return self._exception(function_code, error) if error else pdu[:5]
+            if function_code == WRITE_MULTIPLE_REGISTERS:
+                address, count, byte_count = struct.unpack_from(">HHB", pdu, 1)
+                if not 1 <= count <= MAX_WRITE_COUNT or byte_count != 2 * count or len(pdu) < 6 + byte_count:
+                    return self._exception(function_code, ILLEGAL_DATA_VALUE)
+                error = await self._write(address, list(struct.unpack_from(f">{count}H", pdu, 6)))
+                return self._exception(function_code, error) if error else struct.pack(">BHH", function_code, address, count)
+        except struct.error:
+            return self._exception(function_code, ILLEGAL_DATA_VALUE)
+        return self._exception(function_code, ILLEGAL_FUNCTION)
+
+    def _read(self, function_code: int, address: int, count: int) -> bytes:
+        if not 1 <= count <= MAX_READ_COUNT:
+            return self._exception(function_code, ILLEGAL_DATA_VALUE)
+        self.stats.reads += 1
+        self._touch(address, count)
+        words, unavailable = self.coordinator.read_image(address, count, self.max_age)
+        if unavailable:
+            registers = self._resolve(unavailable)
+            if registers is None:
+                self.stats.rejected_reads += 1
+                return self._exception(function_code, ILLEGAL_DATA_ADDRESS)
+            self.stats.unavailable_reads += 1
+            self._subscribe(registers)
+            return self._exception(function_code, GATEWAY_TARGET_FAILED)
+        return struct.pack(f">BB{count}H", function_code, count * 2, *words)
+
+    def _resolve(self, addresses: List[int]) -> Optional[List[Tuple[int, str]]]:
+        """Die Register zu fehlenden Adressen; None, wenn eine Adresse nicht vorhanden ist.
+
+        Vorhanden sind Adressen der Register-Map und die laut Registerprofil
+        lesbaren Adressen; was das Profil als fehlend kennt, ist es nie.
+        """
+        profile = self.coordinator.register_profile
+        registers: Dict[int, str] = {}
+        for address in addresses:
+            if profile is not None and profile.is_scanned(address) and profile.function_code(address) is None:
+                return None
+            known = self._known.get(address)
+            if known is not None:
+                registers[known[0]] = known[1]
+            elif profile is not None and profile.function_code(address) is not None:
+                registers.setdefault(address, "uint16")
+            else:
+                return None
+        return list(registers.items())
+
+    def _subscribe(self, registers: List[Tuple[int, str]]) -> None:
+        """Abonniere Register, die bisher keine Entität liest, bis MAX_SERVER_SUBSCRIPTIONS."""
+        new = [
+            (register, register_type) for register, register_type in registers
+            if register not in self._subscribed and not self.coordinator.is_subscribed(register)
+        ]
+        room = max(MAX_SERVER_SUBSCRIPTIONS - len(self._subscribed), 0)
+        if len(new) > room:
+            if not self.stats.refused_subscriptions:
+                _LOGGER.warning(
+                    "Modbus clients requested more than %d registers that no entity reads, ignoring further ones",
+                    MAX_SERVER_SUBSCRIPTIONS,
+                )
+            self.stats.refused_subscriptions += len(new) - room
+            new = new[:room]
+        if new:
+            _LOGGER.debug("Subscribing %d registers requested by Modbus clients: %s", len(new), new)
+            for register, register_type in new:
+                self._subscribed[register] = (register_type, self._polls)
+            self.coordinator.subscribe_registers(new)
+
+    def _unsubscribe(self, registers: Iterable[int]) -> None:
+        released = [(register, self._subscribed.pop(register)[0]) for register in registers]
+        _LOGGER.debug("Releasing %d registers no Modbus client reads anymore: %s", len(released), released)
+        self.coordinator.unsubscribe_registers(released)
+
+    def _touch(self, address: int, count: int) -> None:
+        """Merke den Lesezugriff auf vom Server abonnierte Register im Bereich."""
+        end = address + count
+        for register, (register_type, _) in self._subscribed.items():
+            if register < end and register + REGISTER_WIDTHS[register_type] > address:
+                self._subscribed[register] = (register_type, self._polls)
+
+    @callback
+    def _handle_poll(self) -> None:
+        """Nach jeder Abfrage: gib Register frei, die lange kein Client gelesen hat."""
+        self._polls += 1
+        idle = [
+            register for register, (_, last_read) in self._subscribed.items()
+            if self._polls - last_read > SUBSCRIPTION_IDLE_POLLS
+        ]
+        if idle:
+            self._unsubscribe(idle)
+
+    async def _write(self, address: int, values: List[int]) -> Optional[int]:
+        """Leite einen Schreibzugriff weiter; liefert bei Fehlern den Exception-Code."""
+        if not self._writable.issuperset(range(address, address + len(values))):
+            self.stats.rejected_writes += 1
+            _LOGGER.warning(
+                "Rejected write to %d registers at %d: not writable through the integration", len(values), address
+            )
+            return ILLEGAL_DATA_ADDRESS
+        self.stats.writes += 1
+        try:
+            await self.coordinator.async_write_registers(address, values)
+        except Exception as err:
+            self.stats.failed_writes += 1
+            _LOGGER.warning("Forwarded write to register %d failed: %s", address, err)
+            return GATEWAY_TARGET_FAILED
+        return None
+
+    def _exception(self, function_code: int, code: int) -> bytes:
+        self.stats.exceptions += 1
+        return struct.pack(">BB", (function_code | 0x80) & 0xFF, code)
+
+
+async def async_update_modbus_server(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: LambdaHeatpumpCoordinator
+) -> None:
+    """Starte, stoppe oder verlege den Server entsprechend den Optionen des Config Entries."""
+    servers: Dict[str, RegisterImageServer] = hass.data.setdefault(DATA_MODBUS_SERVERS, {})
+    enabled = get_entry_option(entry, CONF_MODBUS_SERVER, False)
+    host = get_entry_option(entry, CONF_MODBUS_SERVER_HOST, DEFAULT_MODBUS_SERVER_HOST)
+    port = get_entry_option(entry, CONF_MODBUS_SERVER_PORT, DEFAULT_MODBUS_SERVER_PORT)
+    module_counts = get_module_counts(entry)
+
+    server = servers.get(entry.entry_id)
+    if server is not None and (not enabled or (server.host, server.port) != (host, port)):
+        await async_stop_modbus_server(hass, entry.entry_id)
+        server = None
+    if server is not None:
+        server.set_module_counts(module_counts)
+    if not enabled or server is not None:
+        return
+
+    server = RegisterImageServer(coordinator, host=host, port=port, module_counts=module_counts)
+    try:
+        await server.start()
+    except OSError as err:
+        _LOGGER.error("Cannot start Modbus re-export server on %s:%d: %s", host, port, err)
+        return
+    servers[entry.entry_id] = server
+
+
+async def async_stop_modbus_server(hass: HomeAssistant, entry_id: str) -> None:
+    server = hass.data.get(DATA_MODBUS_SERVERS, {}).pop(entry_id, None)
+    if server is not None:
+        await server.stop()
@@ -1,24 +1,19 @@
 from __future__ import annotations
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Final
 from homeassistant.components.number import NumberEntity, NumberEntityDescription
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import UnitOfTemperature
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, MANUFACTURER
-
-_LOGGER = logging.getLogger(__name__)
-
-
-
-
-from .const import DOMAIN, MANUFACTURER
-from .coordinator import LambdaHeatpumpCoordinator
+from .const import DOMAIN, MANUFACTURER, SIGNAL_MODULES_CHANGED, get_module_counts, get_module_of_key, module_key
+from .coordinator import LambdaHeatpumpCoordinator, ValueSpec
+from .core import MODULE_SEGMENT_SIZE
+from .entity import LambdaHeatpumpEntity
 
 @dataclass(kw_only=True)
 class LambdaNumberEntityDescription(NumberEntityDescription):
@@ -80,7 +75,7 @@ NUMBER_DESCRIPTIONS: Final[tuple[LambdaNumberEntityDescription, ...]] = (
 
 
 
-class LambdaHeatpumpNumber(CoordinatorEntity, NumberEntity):
+class LambdaHeatpumpNumber(LambdaHeatpumpEntity, NumberEntity):
     def __init__(
         self,
         coordinator: LambdaHeatpumpCoordinator,
@@ -91,20 +86,21 @@ class LambdaHeatpumpNumber(CoordinatorEntity, NumberEntity):
         super().__init__(coordinator)
         self.entity_description = description
         self._register = description.register
+        self._value_spec = ValueSpec(
+            register=description.register,
+            data_type=description.data_type,
+            factor=description.factor,
+        )
+        self._value_specs = (self._value_spec,)
 
         self._attr_name = description.name
         self._attr_translation_key = description.key
         self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
         self._attr_device_info = device_info
 
-        self.coordinator.add_register(self._register, description.data_type)
-
     @property
     def native_value(self):
-        value = self.coordinator.data.get(str(self._register))
-        if value is not None:
-            return value * self.entity_description.factor
-        return None
+        return self.coordinator.values.get(self._value_spec)
 
     async def async_set_native_value(self, value: float) -> None:
         scaled_value = int(value / self.entity_description.factor)
@@ -113,55 +109,66 @@ class LambdaHeatpumpNumber(CoordinatorEntity, NumberEntity):
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-
-    num_boilers = config_entry.data.get("amount_of_boilers", 0)
-    num_buffers = config_entry.data.get("amount_of_buffers", 0)
-    num_solar = config_entry.data.get("amount_of_solar", 0)
     model = config_entry.data.get("model", "Unknown Model")
-
-    device_infos = {
-        "boiler_1": DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_boiler_1")},
-            name="Lambda Boiler 1",
-            manufacturer=MANUFACTURER,
-            model=model,
-        ),
-        "buffer_1": DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_buffer_1")},
-            name="Lambda Buffer 1",
-            manufacturer=MANUFACTURER,
-            model=model,
-        ),
-        "solar_1": DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_solar_1")},
-            name="Lambda Solar 1",
-            manufacturer=MANUFACTURER,
-            model=model,
-        ),
-    }
-
-    numbers = []
-    for description in NUMBER_DESCRIPTIONS:
-        if "boiler_" in description.key and int(description.key.split('_')[1]) > num_boilers:
-            continue
-        if "buffer_" in description.key and int(description.key.split('_')[1]) > num_buffers:
-            continue
-        if "solar_" in description.key and int(description.key.split('_')[1]) > num_solar:
-            continue
-
-        category = description.key.split('_')[0]
-        device_info = device_infos.get(f"{category}_{description.key.split('_')[1]}", None)
-
-        if device_info:
-            number = LambdaHeatpumpNumber(
-                coordinator=coordinator,
-                config_entry=config_entry,
-                description=description,
-                device_info=device_info,
+    created: set[str] = set()
+
+    @callback
+    def async_add_module_numbers() -> None:
+        """Lege Number-Entitäten für konfigurierte, noch nicht angelegte Module an."""
+        counts = get_module_counts(config_entry)
+        descriptions = list(_module_descriptions(counts))
+        # Modul entfernt: die Entität wird über das Entity Registry gelöscht
+        created.intersection_update(description.key for description in descriptions)
+        numbers = []
+        for description in descriptions:
+            module = get_module_of_key(description.key)
+            if description.key in created:
+                continue
+
+            module_type, index = module
+            device_info = DeviceInfo(
+                identifiers={(DOMAIN, f"{config_entry.entry_id}_{module_type}_{index}")},
+                name=f"Lambda {module_type.capitalize()} {index}",
+                manufacturer=MANUFACTURER,
+                model=model,
             )
-            numbers.append(number)
+            numbers.append(
+                LambdaHeatpumpNumber(
+                    coordinator=coordinator,
+                    config_entry=config_entry,
+                    description=description,
+                    device_info=device_info,
+                )
+            )
+            created.add(description.key)
+
+        if numbers:
+            async_add_entities(numbers)
 
-    async_add_entities(numbers)
+    async_add_module_numbers()
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_MODULES_CHANGED.format(config_entry.entry_id), async_add_module_numbers
+        )
+    )
+
+
+def _module_descriptions(counts: dict[str, int]):
+    """Die Number-Beschreibungen je konfiguriertem Modul."""
+    for description in NUMBER_DESCRIPTIONS:
+        for index in range(1, counts[get_module_of_key(description.key)[0]] + 1):
+            yield _module_description(description, index)
+
+
+def _module_description(description: LambdaNumberEntityDescription, index: int) -> LambdaNumberEntityDescription:
+    """Beschreibung eines Number des ersten Moduls für Modul index (ab 1)."""
+    if index == 1:
+        return description
+    return replace(
+        description,
+        key=module_key(description.key, index),
+        register=description.register + (index - 1) * MODULE_SEGMENT_SIZE,
+    )
 
 # class LambdaWritableNumberEntity(CoordinatorEntity, NumberEntity):
 #     def __init__(self, coordinator, name, register, model, min_value, max_value, step, factor=1, config_entry_id=None):
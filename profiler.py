@@ -0,0 +1,101 @@
+"""cProfile über eine feste Anzahl Abfragezyklen des Koordinators."""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+from typing import Optional, Tuple
+
+DEFAULT_PROFILE_CYCLES = 5
+DEFAULT_PROFILE_TOP = 30
+
+# Ab Python 3.12 erfasst ein cProfile alle Threads, und es darf nur eines aktiv sein
+SHARED_PROFILE = sys.version_info >= (3, 12)
+
+
+class PollProfiler:
+    """Profiliert die nächsten cycles Abfragezyklen.
+
+    Bis Python 3.11 arbeitet cProfile pro Thread; es laufen daher zwei
+    Profile, eines im Event-Loop (Planung, Dekodierung, Benachrichtigung der
+    Entitäten) und eines im Modbus-Thread (Socket-Zugriffe von pymodbus).
+    write() führt beide in einer .prof-Datei zusammen. Ab Python 3.12 ist ein
+    Profil prozessweit und erfasst beide Threads; ein zweites aktives Profil
+    (auch eines anderen Koordinators) lässt enable() mit ValueError
+    scheitern. Die Profile laufen nur während der Zyklen, nicht dazwischen.
+    Ohne aktiven Profiler entsteht im Koordinator kein Aufwand außer einer
+    None-Prüfung pro Zyklus.
+    """
+
+    def __init__(self, cycles: int, path: str, top: int = DEFAULT_PROFILE_TOP):
+        if cycles < 1:
+            raise ValueError(f"Invalid number of cycles: {cycles}")
+        self.cycles = cycles
+        self.remaining = cycles
+        # Pfad ohne Endung; es entstehen <path>.prof und <path>.txt
+        self.path = path
+        self.top = top
+        # Mindestens ein Zyklus wurde aufgezeichnet
+        self.active = False
+        self.loop_profile = cProfile.Profile()
+        self.modbus_profile: Optional[cProfile.Profile] = None if SHARED_PROFILE else cProfile.Profile()
+        self._loop_enabled = False
+        self._modbus_enabled = False
+
+    def enable_loop(self) -> None:
+        """Starte die Aufzeichnung im Event-Loop (ab 3.12 prozessweit).
+
+        Raises:
+            ValueError: Ein anderes Profiling-Werkzeug ist aktiv (ab Python 3.12).
+        """
+        if not self._loop_enabled:
+            self.loop_profile.enable()
+            self._loop_enabled = True
+            self.active = True
+
+    def disable_loop(self) -> bool:
+        """Halte die Aufzeichnung im Event-Loop an; True, wenn sie lief."""
+        if not self._loop_enabled:
+            return False
+        self.loop_profile.disable()
+        self._loop_enabled = False
+        return True
+
+    def enable_modbus(self) -> None:
+        """Starte die Aufzeichnung im Modbus-Thread; nur dort aufrufen."""
+        if self.modbus_profile is not None and not self._modbus_enabled:
+            self.modbus_profile.enable()
+            self._modbus_enabled = True
+
+    def disable_modbus(self) -> None:
+        """Halte die Aufzeichnung im Modbus-Thread an; nur dort aufrufen."""
+        if self._modbus_enabled:
+            self.modbus_profile.disable()
+            self._modbus_enabled = False
+
+    def cycle_finished(self) -> bool:
+        """Zähle einen abgeschlossenen Zyklus; True, wenn die Messung beendet ist."""
+        self.remaining -= 1
+        return self.remaining <= 0
+
+    def write(self) -> Tuple[str, str]:
+        """Schreibe die .prof-Datei und eine Zusammenfassung der teuersten Funktionen."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        prof_path = f"{self.path}.prof"
+        text_path = f"{self.path}.txt"
+
+        stats = pstats.Stats(self.loop_profile)
+        if self.modbus_profile is not None:
+            stats.add(self.modbus_profile)
+        stats.dump_stats(prof_path)
+
+        summary = io.StringIO()
+        summary.write(f"Lambda Heatpump poll profile over {self.cycles} cycles\n\n")
+        for sort in ("cumulative", "tottime"):
+            report = pstats.Stats(prof_path, stream=summary)
+            report.strip_dirs().sort_stats(sort).print_stats(self.top)
+        with open(text_path, "w", encoding="utf-8") as file:
+            file.write(summary.getvalue())
+        return prof_path, text_path
@@ -1,18 +1,50 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field
-from typing import Final, Optional, Dict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Final, Optional, Dict
 
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription, SensorDeviceClass, SensorStateClass
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
-from .coordinator import LambdaHeatpumpCoordinator
+from .const import (
+    CONF_PLANT_TOTALS,
+    DOMAIN,
+    HP_STATE_DEFROSTING,
+    HP_STATES_COMPRESSOR_RUNNING,
+    MANUFACTURER,
+    SIGNAL_MODULES_CHANGED,
+    get_entry_option,
+    get_module_counts,
+    get_module_of_key,
+    module_key,
+)
+from .coordinator import LambdaHeatpumpCoordinator, ValueSpec
+from .core import (
+    MODULE_SEGMENT_SIZE,
+    WATER_HEAT_CAPACITY,
+    Accumulator,
+    CascadeTotals,
+    DerivedSpec,
+    EnergyAccumulator,
+    StateCounter,
+    module_factory,
+    module_spec,
+)
+from .entity import LambdaHeatpumpEntity
 
 @dataclass(kw_only=True)
 class LambdaSensorEntityDescription(SensorEntityDescription):
@@ -25,11 +57,62 @@ class LambdaSensorEntityDescription(SensorEntityDescription):
     max_value: float | None = None
     states: Optional[Dict[int, str]] = field(default_factory=dict)
     state_class: SensorStateClass | None = None
+    # Rundungsschritt des Werts, z. B. 0.1 für Register mit Faktor 0.01
     precision: float | None = None
+    # Änderungen kleiner als das Totband werden nicht veröffentlicht
+    deadband: float | None = None
+    # Mindestabstand in Sekunden zwischen zwei veröffentlichten Änderungen
+    min_publish_interval: float | None = None
+
+
+@dataclass(kw_only=True)
+class LambdaDerivedSensorEntityDescription(SensorEntityDescription):
+    """Beschreibung eines aus anderen Sensorwerten berechneten Sensors."""
+    # Ausdruck über die Namen aus inputs, z. B. "flow - ret"
+    expression: str
+    # Name im Ausdruck -> Key des Sensors, dessen Wert (mit Faktor) eingesetzt wird
+    inputs: Dict[str, str]
+    # Modul, auf das die Register der Eingangswerte (Keys des ersten Moduls) verschoben werden
+    module: int = 1
+    precision: float | None = None
+    deadband: float | None = None
+    min_publish_interval: float | None = None
+
+
+@dataclass(kw_only=True)
+class LambdaAccumulatorSensorEntityDescription(SensorEntityDescription):
+    """Beschreibung eines Zählers, den der Koordinator pro Abfrage fortschreibt."""
+    # Key des Zählers; Sensoren mit gleichem Key teilen sich einen Zähler
+    accumulator: str
+    # Erzeugt den Zähler, falls er noch nicht registriert ist
+    factory: Callable[[], Accumulator]
+    value_fn: Callable[[Accumulator], Any]
+
+
+@dataclass(kw_only=True)
+class LambdaCascadeSensorEntityDescription(SensorEntityDescription):
+    """Beschreibung einer Summe über alle Wärmepumpen (optional aller Controller)."""
+    value_fn: Callable[[CascadeTotals], Any]
+
+
+@dataclass(kw_only=True)
+class LambdaDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Beschreibung eines Diagnose-Sensors für die Abfragestatistik des Koordinators."""
+    value_fn: Callable[[LambdaHeatpumpCoordinator], Any]
 
 
 _LOGGER = logging.getLogger(__name__)
 
+# Gerätenamen je Geräte-Key bzw. Modultyp
+DEVICE_NAMES: Final[dict[str, str]] = {
+    "general_ambient": "Lambda General Ambient",
+    "e_manager": "Lambda E-Manager",
+    "heatpump": "Heatpump",
+    "boiler": "Boiler",
+    "buffer": "Buffer",
+    "solar": "Solar",
+    "heatingcircuit": "Heating Circuit",
+}
 
 SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
     # General Ambient
@@ -218,7 +301,9 @@ SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
         data_type="int16",
         factor=0.01,
         unit_of_measurement="°C",
-        device_class=SensorDeviceClass.TEMPERATURE
+        device_class=SensorDeviceClass.TEMPERATURE,
+        precision=0.1,
+        deadband=0.2
     ),
     LambdaSensorEntityDescription(
         key="heatpump_1_flow_heat_sink",
@@ -227,7 +312,9 @@ SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
         data_type="int16",
         factor=0.01,
         unit_of_measurement="m³/h",
-        device_class=SensorDeviceClass.VOLUME_FLOW_RATE
+        device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
+        precision=0.05,
+        deadband=0.1
     ),
     LambdaSensorEntityDescription(
         key="heatpump_1_energy_source_inlet_temperature",
@@ -254,7 +341,9 @@ SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
         data_type="int16",
         factor=0.01,
         unit_of_measurement="m³/h",
-        device_class=SensorDeviceClass.VOLUME_FLOW_RATE
+        device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
+        precision=0.05,
+        deadband=0.1
     ),
     LambdaSensorEntityDescription(
         key="heatpump_1_compressor_unit_rating",
@@ -612,7 +701,9 @@ SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
         data_type="int16",
         factor=0.01,
         unit_of_measurement="°C",
-        device_class=SensorDeviceClass.TEMPERATURE
+        device_class=SensorDeviceClass.TEMPERATURE,
+        precision=0.1,
+        deadband=0.2
     ),
     LambdaSensorEntityDescription(
         key="heatingcircuit_1_actual_temperature_room_device_sensor",
@@ -688,9 +779,263 @@ SENSOR_DESCRIPTIONS: Final[tuple[LambdaSensorEntityDescription, ...]] = (
 
 )
 
+SENSOR_DESCRIPTIONS_BY_KEY: Final[dict[str, LambdaSensorEntityDescription]] = {
+    description.key: description for description in SENSOR_DESCRIPTIONS
+}
+
+
+# Thermische Leistung der Wärmepumpe aus Volumenstrom (m³/h) und Spreizung (K) in W
+_THERMAL_POWER = f"flow_rate * (flow - ret) * {WATER_HEAT_CAPACITY:.1f}"
+
+# Ersatz für Template-Sensoren: berechnet im Koordinator, einmal pro Abfrage
+DERIVED_SENSOR_DESCRIPTIONS: Final[tuple[LambdaDerivedSensorEntityDescription, ...]] = (
+    LambdaDerivedSensorEntityDescription(
+        key="heatpump_1_flow_return_temperature_difference",
+        name="Flow/Return Temperature Difference",
+        expression="flow - ret",
+        inputs={"flow": "heatpump_1_flowline_temp", "ret": "heatpump_1_returnline_temp"},
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
+        state_class=SensorStateClass.MEASUREMENT,
+        precision=0.1,
+        deadband=0.2,
+    ),
+    LambdaDerivedSensorEntityDescription(
+        key="heatpump_1_thermal_power",
+        name="Thermal Power",
+        expression=_THERMAL_POWER,
+        inputs={
+            "flow_rate": "heatpump_1_flow_heat_sink",
+            "flow": "heatpump_1_flowline_temp",
+            "ret": "heatpump_1_returnline_temp",
+        },
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        precision=10,
+        deadband=50,
+    ),
+    LambdaDerivedSensorEntityDescription(
+        key="heatpump_1_calculated_cop",
+        name="Calculated COP",
+        # Im Stillstand bzw. Standby ist das Verhältnis bedeutungslos
+        expression=f"{_THERMAL_POWER} / power if power > 100 else None",
+        inputs={
+            "flow_rate": "heatpump_1_flow_heat_sink",
+            "flow": "heatpump_1_flowline_temp",
+            "ret": "heatpump_1_returnline_temp",
+            "power": "heatpump_1_frequency_inverter_actual_power_consumption",
+        },
+        state_class=SensorStateClass.MEASUREMENT,
+        precision=0.05,
+        deadband=0.1,
+    ),
+)
+
+DERIVED_SENSOR_DESCRIPTIONS_BY_KEY: Final[dict[str, LambdaDerivedSensorEntityDescription]] = {
+    description.key: description for description in DERIVED_SENSOR_DESCRIPTIONS
+}
+
+
+def _state_counter(states: frozenset[int]) -> Callable[[], Accumulator]:
+    # Rohwert des Wärmepumpenstatus statt des Zustandsnamens des Status-Sensors
+    return lambda: StateCounter(ValueSpec(register=1002, data_type="uint16", integer=True), states)
+
+
+# Zähler für die Energie- und Laufzeitauswertung, integriert über die
+# Zeitpunkte der Abfragen statt über Zustandsänderungen
+ACCUMULATOR_SENSOR_DESCRIPTIONS: Final[tuple[LambdaAccumulatorSensorEntityDescription, ...]] = (
+    LambdaAccumulatorSensorEntityDescription(
+        key="heatpump_1_electrical_energy",
+        name="Electrical Energy",
+        accumulator="heatpump_1_electrical_energy",
+        factory=lambda: EnergyAccumulator(
+            _unrounded(_value_spec(SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_frequency_inverter_actual_power_consumption"]))
+        ),
+        value_fn=lambda accumulator: round(accumulator.total_wh / 1000, 3),
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaAccumulatorSensorEntityDescription(
+        key="heatpump_1_thermal_energy",
+        name="Thermal Energy",
+        accumulator="heatpump_1_thermal_energy",
+        # Negative Leistung beim Abtauen zählt nicht, der Zähler steigt nur
+        factory=lambda: EnergyAccumulator(
+            _unrounded(_derived_spec(DERIVED_SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_thermal_power"]))
+        ),
+        value_fn=lambda accumulator: round(accumulator.total_wh / 1000, 3),
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaAccumulatorSensorEntityDescription(
+        key="heatpump_1_compressor_starts",
+        name="Compressor Starts",
+        accumulator="heatpump_1_compressor",
+        factory=_state_counter(HP_STATES_COMPRESSOR_RUNNING),
+        value_fn=lambda accumulator: accumulator.count,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaAccumulatorSensorEntityDescription(
+        key="heatpump_1_compressor_runtime",
+        name="Compressor Runtime",
+        accumulator="heatpump_1_compressor",
+        factory=_state_counter(HP_STATES_COMPRESSOR_RUNNING),
+        value_fn=lambda accumulator: round(accumulator.seconds / 3600, 2),
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaAccumulatorSensorEntityDescription(
+        key="heatpump_1_defrost_cycles",
+        name="Defrost Cycles",
+        accumulator="heatpump_1_defrost",
+        factory=_state_counter(frozenset({HP_STATE_DEFROSTING})),
+        value_fn=lambda accumulator: accumulator.count,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY: Final[dict[str, LambdaAccumulatorSensorEntityDescription]] = {
+    description.key: description for description in ACCUMULATOR_SENSOR_DESCRIPTIONS
+}
+
+
+def _rounded(value: float | None, digits: int) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+# Summen der Kaskade am Controller-Gerät; die Beiträge je Wärmepumpe legt
+# cascade.cascade_inputs fest
+CASCADE_SENSOR_DESCRIPTIONS: Final[tuple[LambdaCascadeSensorEntityDescription, ...]] = (
+    LambdaCascadeSensorEntityDescription(
+        key="plant_electrical_power",
+        name="Plant Electrical Power",
+        value_fn=lambda totals: _rounded(totals.total("electrical_power"), 0),
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LambdaCascadeSensorEntityDescription(
+        key="plant_thermal_power",
+        name="Plant Thermal Power",
+        value_fn=lambda totals: _rounded(totals.total("thermal_power"), 0),
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LambdaCascadeSensorEntityDescription(
+        key="plant_electrical_energy",
+        name="Plant Electrical Energy",
+        value_fn=lambda totals: _rounded(totals.total("electrical_energy"), 3),
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaCascadeSensorEntityDescription(
+        key="plant_thermal_energy",
+        name="Plant Thermal Energy",
+        value_fn=lambda totals: _rounded(totals.total("thermal_energy"), 3),
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    LambdaCascadeSensorEntityDescription(
+        key="plant_cop",
+        name="Plant COP",
+        # Verhältnis der Summen statt Mittel der einzelnen COPs
+        value_fn=lambda totals: _rounded(totals.ratio("thermal_power", "electrical_power", 100), 2),
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    LambdaCascadeSensorEntityDescription(
+        key="plant_average_cop",
+        name="Plant Average COP",
+        value_fn=lambda totals: _rounded(totals.ratio("thermal_energy", "electrical_energy", 0.1), 2),
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+
+def _percentile_ms(metric: str, fraction: float) -> Callable[[LambdaHeatpumpCoordinator], Any]:
+    def value(coordinator: LambdaHeatpumpCoordinator) -> float | None:
+        seconds = coordinator.poll_statistics.percentile(metric, fraction)
+        return round(seconds * 1000, 2) if seconds is not None else None
+    return value
+
+
+def _last_cycle(attribute: str) -> Callable[[LambdaHeatpumpCoordinator], Any]:
+    def value(coordinator: LambdaHeatpumpCoordinator) -> int | None:
+        cycle = coordinator.poll_statistics.last
+        return getattr(cycle, attribute) if cycle is not None else None
+    return value
 
 
-class LambdaHeatpumpSensor(CoordinatorEntity, SensorEntity):
+# Abfragestatistik des Koordinators als Diagnose-Sensoren am Controller-Gerät
+# (standardmäßig deaktiviert)
+DIAGNOSTIC_SENSOR_DESCRIPTIONS: Final[tuple[LambdaDiagnosticSensorEntityDescription, ...]] = (
+    *(
+        LambdaDiagnosticSensorEntityDescription(
+            key=f"poll_{metric}_p{round(fraction * 100)}",
+            name=f"{label} p{round(fraction * 100)}",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=_percentile_ms(metric, fraction),
+        )
+        for metric, label in (
+            ("duration", "Poll Duration"),
+            ("block_latency", "Modbus Block Latency"),
+            ("decode_time", "Decode Time"),
+            ("fanout_time", "Listener Fan-out Time"),
+        )
+        for fraction in (0.50, 0.95, 0.99)
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="poll_requests",
+        name="Modbus Requests per Poll",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_cycle("requests"),
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="poll_retries",
+        name="Modbus Retries per Poll",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_cycle("retries"),
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="poll_bytes",
+        name="Modbus Bytes per Poll",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_cycle("bytes_total"),
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="poll_failed_cycles",
+        name="Failed Polls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.poll_statistics.failed_cycles,
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="modbus_handoff_avg",
+        name="Modbus Thread Handoff",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: round(coordinator.executor_stats.handoff_avg * 1000, 3),
+    ),
+    LambdaDiagnosticSensorEntityDescription(
+        key="suppressed_writes_per_hour",
+        name="Suppressed State Writes per Hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.suppressed_writes_per_hour,
+    ),
+)
+
+
+class LambdaHeatpumpSensor(LambdaHeatpumpEntity, SensorEntity):
     def __init__(
         self,
         coordinator: LambdaHeatpumpCoordinator,
@@ -701,6 +1046,10 @@ class LambdaHeatpumpSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self.entity_description = description
         self._register = description.register
+        # Skalierung, Zustandsabbildung und Typ werden einmal pro Abfrage im
+        # Koordinator berechnet, native_value liest nur den fertigen Wert
+        self._value_spec = _value_spec(description)
+        self._value_specs = (self._value_spec,)
 
         # Setze den Namen
         self._attr_name = description.name
@@ -723,21 +1072,9 @@ class LambdaHeatpumpSensor(CoordinatorEntity, SensorEntity):
         _LOGGER.debug("Description: %s", description)
         _LOGGER.debug("Übersetzung: %s", self.entity_description.key)
 
-        self.coordinator.add_register(self._register, description.data_type)
-
     @property
     def native_value(self):
-        value = self.coordinator.data.get(str(self._register))
-        if value is not None:
-            # Wenn der Sensor ein Fehlernummer-Sensor ist, geben wir den Wert als Integer zurück
-            if "error_number" in self.entity_description.key:
-                return int(value)
-            # Wenn der Sensor Zustände hat, geben wir den Zustand zurück
-            if self.entity_description.states:
-                return self.entity_description.states.get(value, "Unknown")
-            value = value * self.entity_description.factor
-            return value
-        return None
+        return self.coordinator.values.get(self._value_spec)
     
     @property
     def native_unit_of_measurement(self):
@@ -751,99 +1088,276 @@ class LambdaHeatpumpSensor(CoordinatorEntity, SensorEntity):
     def translation_key(self):
         return self.entity_description.key
 
+class LambdaDerivedSensor(LambdaHeatpumpEntity, SensorEntity):
+    """Berechneter Sensor; nutzt denselben Signifikanzfilter wie die Register-Sensoren."""
+
+    def __init__(
+        self,
+        coordinator: LambdaHeatpumpCoordinator,
+        config_entry: ConfigEntry,
+        description: LambdaDerivedSensorEntityDescription,
+        device_info: DeviceInfo,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._value_spec = _derived_spec(description)
+        self._value_specs = (self._value_spec,)
+        self._attr_name = description.name
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.values.get(self._value_spec)
+
+
+class LambdaAccumulatorSensor(LambdaHeatpumpEntity, SensorEntity):
+    """Zähler für Energie, Laufzeit oder Starts; der Stand übersteht Neustarts."""
+
+    def __init__(
+        self,
+        coordinator: LambdaHeatpumpCoordinator,
+        config_entry: ConfigEntry,
+        description: LambdaAccumulatorSensorEntityDescription,
+        device_info: DeviceInfo,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._accumulator: Accumulator | None = None
+        self._attr_name = description.name
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Registriere den Zähler; er abonniert seine Eingangswerte selbst."""
+        description = self.entity_description
+        self._accumulator = self.coordinator.register_accumulator(description.accumulator, description.factory)
+        # Benachrichtigt wird, wenn sich der angezeigte Zählerstand ändert
+        self._context_keys = (self._accumulator,)
+        await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.coordinator.unregister_accumulator(self.entity_description.accumulator)
+        await super().async_will_remove_from_hass()
+
+    @property
+    def native_value(self):
+        if self._accumulator is None:
+            return None
+        return self.entity_description.value_fn(self._accumulator)
+
+
+class LambdaCascadeSensor(LambdaHeatpumpEntity, SensorEntity):
+    """Summe über die Wärmepumpen am Controller-Gerät, höchstens einmal pro Abfrage aktualisiert.
+
+    Mit der Option "Anlagensummen" summiert der Sensor über die Wärmepumpen
+    aller Lambda-Controller.
+    """
+
+    def __init__(
+        self,
+        coordinator: LambdaHeatpumpCoordinator,
+        config_entry: ConfigEntry,
+        description: LambdaCascadeSensorEntityDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._config_entry = config_entry
+        self._attr_name = description.name
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, config_entry.entry_id)})
+        # Mit einer Wärmepumpe wiederholen die Summen nur deren eigene Sensoren
+        self._attr_entity_registry_enabled_default = (
+            get_module_counts(config_entry)["heatpump"] > 1 or self._plant_totals
+        )
+        self._context_keys = (coordinator.cascade,)
+
+    @property
+    def _plant_totals(self) -> bool:
+        return self.coordinator.plant is not None and get_entry_option(self._config_entry, CONF_PLANT_TOTALS, False)
+
+    @property
+    def available(self) -> bool:
+        if not super().available:
+            return False
+        if not self._plant_totals:
+            return True
+        # Erst wenn jeder Controller beigetragen hat; sonst springen die Energiesummen beim Start
+        return all(
+            entry.entry_id in self.coordinator.plant.sources
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.disabled_by is None
+        )
+
+    @property
+    def native_value(self):
+        totals = self.coordinator.plant if self._plant_totals else self.coordinator.cascade
+        return self.entity_description.value_fn(totals)
+
+
+class LambdaDiagnosticSensor(CoordinatorEntity[LambdaHeatpumpCoordinator], SensorEntity):
+    """Diagnose-Sensor für die Abfragestatistik, wird nach jedem Zyklus aktualisiert."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: LambdaHeatpumpCoordinator,
+        config_entry: ConfigEntry,
+        description: LambdaDiagnosticSensorEntityDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = description.name
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        # Das Controller-Gerät wird in async_setup_entry der Integration angelegt
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, config_entry.entry_id)})
+
+    @property
+    def available(self) -> bool:
+        # Gerade bei Verbindungsproblemen soll die Statistik sichtbar bleiben
+        return True
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator)
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     """Richtet die Sensorplattform für einen Konfigurations-Eintrag ein."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-
-    # Hole die Konfigurationswerte aus config_flow
-    num_heatpumps = config_entry.data.get("amount_of_heatpumps", 1)
-    num_boilers = config_entry.data.get("amount_of_boilers", 0)
-    num_buffers = config_entry.data.get("amount_of_buffers", 0)
-    num_solar = config_entry.data.get("amount_of_solar", 0)
-    num_heatingcircuits = config_entry.data.get("amount_of_heat_circuits", 1)
     model = config_entry.data.get("model", "Unknown Model")  # Hole das Modell aus der Konfiguration
+    created: set[str] = set()
 
-    device_infos = {
-        "general_ambient": DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_general_ambient")},
-            name="Lambda General Ambient",
-            manufacturer=MANUFACTURER,
-            model=model,
-        ),
-        "e_manager": DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_e_manager")},
-            name="Lambda E-Manager",
-            manufacturer=MANUFACTURER,
-            model=model,
-        ),
-    }
-
-    # Erstelle Geräteinformationen für mehrere Geräte pro Kategorie
-    for i in range(1, num_heatpumps + 1):
-        device_infos[f"heatpump_{i}"] = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_heatpump_{i}")},
-            name=f"Lambda Heatpump {i}",
-            manufacturer=MANUFACTURER,
-            model=model,
-        )
+    @callback
+    def async_add_module_sensors() -> None:
+        """Lege Sensoren für alle konfigurierten, noch nicht angelegten Module an."""
+        counts = get_module_counts(config_entry)
+        descriptions = list(_module_descriptions(
+            (*SENSOR_DESCRIPTIONS, *DERIVED_SENSOR_DESCRIPTIONS, *ACCUMULATOR_SENSOR_DESCRIPTIONS), counts
+        ))
+        # Modul entfernt: die Entitäten werden über das Entity Registry gelöscht
+        created.intersection_update(description.key for description in descriptions)
+        sensors = []
+        for description in descriptions:
+            module = get_module_of_key(description.key)
+            if description.key in created:
+                continue
 
-    for i in range(1, num_boilers + 1):
-        device_infos[f"boiler_{i}"] = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_boiler_{i}")},
-            name=f"Lambda Boiler {i}",
-            manufacturer=MANUFACTURER,
-            model=model,
-        )
+            device_key = f"{module[0]}_{module[1]}" if module else "_".join(description.key.split('_')[:2])
+            device_info = DeviceInfo(
+                identifiers={(DOMAIN, f"{config_entry.entry_id}_{device_key}")},
+                name=_get_device_name(device_key),
+                manufacturer=MANUFACTURER,
+                model=model,
+            )
 
-    for i in range(1, num_buffers + 1):
-        device_infos[f"buffer_{i}"] = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_buffer_{i}")},
-            name=f"Lambda Buffer {i}",
-            manufacturer=MANUFACTURER,
-            model=model,
-        )
+            _LOGGER.debug("Creating sensor: %s with device_info: %s", description.key, device_info)
 
-    for i in range(1, num_solar + 1):
-        device_infos[f"solar_{i}"] = DeviceInfo(
-            identifiers={(DOMAIN, f"{config_entry.entry_id}_solar_{i}")},
-            name=f"Lambda Solar {i}",
-            manufacturer=MANUFACTURER,
-            model=model,
+            if isinstance(description, LambdaDerivedSensorEntityDescription):
+                sensor_class = LambdaDerivedSensor
+            elif isinstance(description, LambdaAccumulatorSensorEntityDescription):
+                sensor_class = LambdaAccumulatorSensor
+            else:
+                sensor_class = LambdaHeatpumpSensor
+            sensors.append(
+                sensor_class(
+                    coordinator=coordinator,
+                    config_entry=config_entry,
+                    description=description,
+                    device_info=device_info,
+                )
+            )
+            created.add(description.key)
+
+        if sensors:
+            async_add_entities(sensors)
+
+    async_add_entities(
+        LambdaDiagnosticSensor(coordinator, config_entry, description)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
+    )
+    async_add_entities(
+        LambdaCascadeSensor(coordinator, config_entry, description)
+        for description in CASCADE_SENSOR_DESCRIPTIONS
+    )
+    async_add_module_sensors()
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_MODULES_CHANGED.format(config_entry.entry_id), async_add_module_sensors
         )
+    )
 
-    for i in range(1, num_heatingcircuits + 1):
-       device_infos[f"heatingcircuit_{i}"] = DeviceInfo(
-           identifiers={(DOMAIN, f"{config_entry.entry_id}_heatingcircuit_{i}")},
-           name=f"Lambda Heating Circuit {i}",
-           manufacturer=MANUFACTURER,
-           model=model,
-       )
-    sensors = []
-    for description in SENSOR_DESCRIPTIONS:
-        if "heatpump_" in description.key and int(description.key.split('_')[1]) > num_heatpumps:
-            continue
-        if "boiler_" in description.key and int(description.key.split('_')[1]) > num_boilers:
-            continue
-        if "buffer_" in description.key and int(description.key.split('_')[1]) > num_buffers:
-            continue
-        if "solar_" in description.key and int(description.key.split('_')[1]) > num_solar:
-            continue
-        if "heatingcircuit_" in description.key and int(description.key.split('_')[1]) > num_heatingcircuits:
+
+def _module_descriptions(descriptions, counts: dict[str, int]):
+    """Die Beschreibungen je konfiguriertem Modul; die Tabellen beschreiben nur das erste Modul."""
+    for description in descriptions:
+        module = get_module_of_key(description.key)
+        if module is None:
+            yield description
             continue
+        for index in range(1, counts[module[0]] + 1):
+            yield _module_description(description, index)
+
 
-        category = description.key.split('_')[0]
-        # device_info = device_infos.get(description.key.split('_')[0], device_infos.get(f"{category}_{description.key.split('_')[1]}", None))
-        device_info = device_infos.get(f"{category}_{description.key.split('_')[1]}", device_infos.get(category, None))
-
-        _LOGGER.debug("Creating sensor: %s with device_info: %s", description.key, device_info)
-        
-        sensor = LambdaHeatpumpSensor(
-            coordinator=coordinator,
-            config_entry=config_entry,
-            description=description,
-            device_info=device_info, 
+def _module_description(description, index: int):
+    """Beschreibung eines Sensors des ersten Moduls für Modul index (ab 1)."""
+    if index == 1:
+        return description
+    if isinstance(description, LambdaDerivedSensorEntityDescription):
+        return replace(description, key=module_key(description.key, index), module=index)
+    if isinstance(description, LambdaAccumulatorSensorEntityDescription):
+        # Gleicher Zähler-Key wie in cascade.cascade_inputs, der Zähler wird geteilt
+        return replace(
+            description,
+            key=module_key(description.key, index),
+            accumulator=module_key(description.accumulator, index),
+            factory=module_factory(description.factory, index),
         )
-        sensors.append(sensor)
+    return replace(
+        description,
+        key=module_key(description.key, index),
+        register=description.register + (index - 1) * MODULE_SEGMENT_SIZE,
+    )
+
+
+def _value_spec(description: LambdaSensorEntityDescription) -> ValueSpec:
+    """Die ValueSpec, über die ein Register-Sensor seinen Wert vom Koordinator bezieht."""
+    return ValueSpec(
+        register=description.register,
+        data_type=description.data_type,
+        factor=description.factor,
+        states=tuple(description.states.items()) if description.states else None,
+        integer="error_number" in description.key,
+        precision=description.precision,
+        deadband=description.deadband or 0.0,
+        min_publish_interval=description.min_publish_interval or 0.0,
+    )
+
+
+def _unrounded(spec):
+    """Die Spec ohne Rundung, Totband und Mindestabstand, als Eingang einer Berechnung."""
+    return replace(spec, digits=None, precision=None, deadband=0.0, min_publish_interval=0.0)
+
+
+def _derived_spec(description: LambdaDerivedSensorEntityDescription) -> DerivedSpec:
+    """Die DerivedSpec eines berechneten Sensors; gerundet wird nur das Ergebnis."""
+    spec = DerivedSpec(
+        expression=description.expression,
+        inputs=tuple(
+            (name, _unrounded(_value_spec(SENSOR_DESCRIPTIONS_BY_KEY[key])))
+            for name, key in description.inputs.items()
+        ),
+        precision=description.precision,
+        deadband=description.deadband or 0.0,
+        min_publish_interval=description.min_publish_interval or 0.0,
+    )
+    return module_spec(spec, description.module)
 
-    async_add_entities(sensors)
 
+def _get_device_name(device_key: str) -> str:
+    """Gerätename wie "Lambda Heatpump 2" für einen Geräte-Key wie "heatpump_2"."""
+    if device_key in DEVICE_NAMES:
+        return DEVICE_NAMES[device_key]
+    module_type, index = device_key.rsplit('_', 1)
+    return f"Lambda {DEVICE_NAMES[module_type]} {index}"
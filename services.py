@@ -0,0 +1,262 @@
+"""Services der Lambda Heatpump Integration."""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import datetime
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .backfill import async_import_sample_statistics
+from .capture import CAPTURE_SUFFIX
+from .const import (
+    ATTR_CYCLES,
+    ATTR_ENTRY_ID,
+    ATTR_FILENAME,
+    ATTR_FORMAT,
+    ATTR_SECONDS,
+    ATTR_SIZE_MB,
+    ATTR_TOP,
+    DOMAIN,
+    SERVICE_DUMP_TRACE,
+    SERVICE_EXPORT_SAMPLES,
+    SERVICE_IMPORT_STATISTICS,
+    SERVICE_PROFILE,
+    SERVICE_SCAN_REGISTERS,
+    SERVICE_START_CAPTURE,
+    SERVICE_START_SAMPLES,
+    SERVICE_START_TRACE,
+    SERVICE_STOP_CAPTURE,
+    SERVICE_STOP_SAMPLES,
+    SERVICE_STOP_TRACE,
+)
+from .coordinator import LambdaHeatpumpCoordinator
+from .core import DEFAULT_SAMPLES_SIZE_MB, EXPORT_FORMATS, PROFILE_SUFFIX, SAMPLES_SUFFIX
+from .profiler import DEFAULT_PROFILE_CYCLES, DEFAULT_PROFILE_TOP, PollProfiler
+from .tracing import DEFAULT_TRACE_SECONDS, TRACE_SUFFIX
+
+_LOGGER = logging.getLogger(__name__)
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+STOP_CAPTURE_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+TRACE_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+SCAN_REGISTERS_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+START_SAMPLES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SIZE_MB, default=DEFAULT_SAMPLES_SIZE_MB): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=4096)
+        ),
+    }
+)
+STOP_SAMPLES_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+EXPORT_SAMPLES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMATS[0]): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_SECONDS): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+IMPORT_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SECONDS): vol.All(vol.Coerce(float), vol.Range(min=1)),
+    }
+)
+DUMP_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SECONDS, default=DEFAULT_TRACE_SECONDS): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+        vol.Optional(ATTR_TOP, default=DEFAULT_PROFILE_TOP): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+    }
+)
+
+
+def _get_coordinators(hass: HomeAssistant, call: ServiceCall) -> dict[str, LambdaHeatpumpCoordinator]:
+    """Koordinatoren, auf die sich ein Service-Aufruf bezieht (alle ohne entry_id)."""
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    if entry_id is None:
+        return dict(coordinators)
+    if entry_id not in coordinators:
+        raise HomeAssistantError(f"Unknown Lambda config entry: {entry_id}")
+    return {entry_id: coordinators[entry_id]}
+
+
+def output_path(hass: HomeAssistant, filename: str) -> str:
+    """Pfad im Verzeichnis <config>/lambda_heatpumps; Verzeichnisanteile werden verworfen."""
+    return hass.config.path(DOMAIN, os.path.basename(filename))
+
+
+def register_profile_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Registerprofil eines Config Entries, beim Setup automatisch geladen."""
+    return output_path(hass, f"register_profile_{entry_id}{PROFILE_SUFFIX}")
+
+
+def samples_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Ringdatei der Sample-Aufzeichnung eines Config Entries."""
+    return output_path(hass, f"samples_{entry_id}{SAMPLES_SUFFIX}")
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Registriere die Services einmalig für alle Config Entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_START_CAPTURE):
+        return
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        coordinators = _get_coordinators(hass, call)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for entry_id, coordinator in coordinators.items():
+            filename = call.data.get(ATTR_FILENAME)
+            if filename is None:
+                filename = f"capture_{entry_id}_{timestamp}"
+            elif len(coordinators) > 1:
+                filename = f"{os.path.splitext(filename)[0]}_{entry_id}"
+            if not filename.endswith(CAPTURE_SUFFIX):
+                filename += CAPTURE_SUFFIX
+            await coordinator.async_start_capture(output_path(hass, filename))
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call).values():
+            await coordinator.async_stop_capture()
+
+    async def async_profile(call: ServiceCall) -> None:
+        coordinators = _get_coordinators(hass, call)
+        # Erst alle prüfen, damit ein Fehler keine halb gestarteten Messungen hinterlässt
+        for entry_id, coordinator in coordinators.items():
+            if coordinator.profiling:
+                raise HomeAssistantError(f"Profiling is already running for {entry_id}")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for entry_id, coordinator in coordinators.items():
+            coordinator.async_start_profile(
+                PollProfiler(
+                    call.data[ATTR_CYCLES],
+                    output_path(hass, f"profile_{entry_id}_{timestamp}"),
+                    call.data[ATTR_TOP],
+                )
+            )
+
+    async def async_start_trace(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call).values():
+            coordinator.async_start_trace()
+
+    async def async_stop_trace(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call).values():
+            coordinator.async_stop_trace()
+
+    async def async_dump_trace(call: ServiceCall) -> None:
+        coordinators = _get_coordinators(hass, call)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for entry_id, coordinator in coordinators.items():
+            if coordinator.tracer is None:
+                raise HomeAssistantError(f"Trace recording is not running for {entry_id}")
+            filename = call.data.get(ATTR_FILENAME)
+            if filename is None:
+                filename = f"trace_{entry_id}_{timestamp}"
+            elif len(coordinators) > 1:
+                filename = f"{os.path.splitext(filename)[0]}_{entry_id}"
+            if not filename.endswith(TRACE_SUFFIX):
+                filename += TRACE_SUFFIX
+            await coordinator.async_dump_trace(output_path(hass, filename), call.data[ATTR_SECONDS])
+
+    async def async_scan_registers(call: ServiceCall) -> None:
+        for entry_id, coordinator in _get_coordinators(hass, call).items():
+            try:
+                profile = await coordinator.async_scan_registers(register_profile_path(hass, entry_id))
+            except UpdateFailed as err:
+                raise HomeAssistantError(f"Register scan failed for {entry_id}: {err}") from err
+            _LOGGER.info("Register profile for %s: %s", entry_id, profile.summary())
+
+    async def async_start_samples(call: ServiceCall) -> None:
+        for entry_id, coordinator in _get_coordinators(hass, call).items():
+            await coordinator.async_start_samples(
+                samples_path(hass, entry_id), call.data[ATTR_SIZE_MB] * 1024 * 1024
+            )
+
+    async def async_stop_samples(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call).values():
+            await coordinator.async_stop_samples()
+
+    async def async_export_samples(call: ServiceCall) -> None:
+        coordinators = _get_coordinators(hass, call)
+        export_format = call.data[ATTR_FORMAT]
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        since = now.timestamp() - call.data[ATTR_SECONDS] if ATTR_SECONDS in call.data else None
+        for entry_id, coordinator in coordinators.items():
+            filename = call.data.get(ATTR_FILENAME)
+            if filename is None:
+                filename = f"samples_{entry_id}_{timestamp}"
+            elif len(coordinators) > 1:
+                filename = f"{os.path.splitext(filename)[0]}_{entry_id}"
+            if not filename.endswith(f".{export_format}"):
+                filename += f".{export_format}"
+            try:
+                await coordinator.async_export_samples(
+                    samples_path(hass, entry_id), output_path(hass, filename), export_format, since
+                )
+            except (OSError, ValueError) as err:
+                raise HomeAssistantError(f"Sample export failed for {entry_id}: {err}") from err
+
+    async def async_import_statistics(call: ServiceCall) -> None:
+        since = time.time() - call.data[ATTR_SECONDS] if ATTR_SECONDS in call.data else None
+        for entry_id, coordinator in _get_coordinators(hass, call).items():
+            try:
+                await async_import_sample_statistics(hass, coordinator, entry_id, samples_path(hass, entry_id), since)
+            except (OSError, ValueError) as err:
+                raise HomeAssistantError(f"Statistics import failed for {entry_id}: {err}") from err
+
+    hass.services.async_register(DOMAIN, SERVICE_START_CAPTURE, async_start_capture, schema=START_CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture, schema=STOP_CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_START_TRACE, async_start_trace, schema=TRACE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_TRACE, async_stop_trace, schema=TRACE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_DUMP_TRACE, async_dump_trace, schema=DUMP_TRACE_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_SCAN_REGISTERS, async_scan_registers, schema=SCAN_REGISTERS_SCHEMA
+    )
+    hass.services.async_register(DOMAIN, SERVICE_START_SAMPLES, async_start_samples, schema=START_SAMPLES_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_SAMPLES, async_stop_samples, schema=STOP_SAMPLES_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT_SAMPLES, async_export_samples, schema=EXPORT_SAMPLES_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_IMPORT_STATISTICS, async_import_statistics, schema=IMPORT_STATISTICS_SCHEMA
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Entferne die Services, sobald kein Config Entry mehr geladen ist."""
+    if hass.data.get(DOMAIN):
+        return
+    for service in (
+        SERVICE_START_CAPTURE,
+        SERVICE_STOP_CAPTURE,
+        SERVICE_PROFILE,
+        SERVICE_START_TRACE,
+        SERVICE_STOP_TRACE,
+        SERVICE_DUMP_TRACE,
+        SERVICE_SCAN_REGISTERS,
+        SERVICE_START_SAMPLES,
+        SERVICE_STOP_SAMPLES,
+        SERVICE_EXPORT_SAMPLES,
+        SERVICE_IMPORT_STATISTICS,
+    ):
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,16 @@
+"""Gemeinsame Einrichtung der Tests.
+
+Die Module der Integration werden wie in tools/ über
+import_integration_module als lambda_heatpumps.<name> importiert, ohne das
+Setup für Home Assistant auszuführen. Die Fixture lambda_simulator stammt
+aus tools.pytest_plugin.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Repository-Verzeichnis, damit tools importierbar ist
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest_plugins = ["tools.pytest_plugin"]
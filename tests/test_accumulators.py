@@ -0,0 +1,98 @@
+"""Tests für die Energie- und Laufzeitzähler."""
+from __future__ import annotations
+
+import pytest
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+accumulators = import_integration_module("core.accumulators")
+sensor = import_integration_module("sensor")
+
+POWER = core.ValueSpec(register=1012)
+STATE = core.ValueSpec(register=1002, data_type="uint16", integer=True)
+
+
+def _energy():
+    return accumulators.EnergyAccumulator(POWER)
+
+
+def test_energy_is_integrated_with_the_trapezoidal_rule():
+    accumulator = _energy()
+
+    accumulator.update(0.0, {POWER: 1000}, max_gap=3600)
+    accumulator.update(1800.0, {POWER: 3000}, max_gap=3600)
+    # Abtauen: negative Leistung zählt als 0
+    accumulator.update(3600.0, {POWER: -500}, max_gap=3600)
+
+    assert accumulator.total_wh == pytest.approx(1000 + 750)
+
+
+def test_gaps_and_missing_values_are_not_integrated():
+    accumulator = _energy()
+
+    accumulator.update(0.0, {POWER: 1000})
+    accumulator.update(1000.0, {POWER: 1000}, max_gap=300)
+    accumulator.update(1100.0, {})
+    accumulator.update(1200.0, {POWER: 1000})
+
+    assert accumulator.total_wh == 0
+
+
+def test_state_counter_counts_entries_and_time():
+    counter = accumulators.StateCounter(STATE, frozenset({5}))
+
+    for timestamp, state in ((0, 1), (10, 5), (70, 5), (100, 1), (160, 5)):
+        counter.update(float(timestamp), {STATE: state})
+
+    assert counter.count == 2
+    assert counter.seconds == 90
+
+
+def test_state_survives_unregister_and_restart():
+    accumulator_set = accumulators.AccumulatorSet()
+    accumulator, added = accumulator_set.register("energy", _energy)
+    accumulator_set.register("energy", _energy)
+    assert added
+    accumulator_set.update(0.0, {POWER: 3600})
+    accumulator_set.update(10.0, {POWER: 3600})
+
+    # Der zweite Nutzer hält den Zähler noch
+    assert accumulator_set.unregister("energy") is None
+    assert accumulator_set.unregister("energy") is accumulator
+    assert list(accumulator_set.keys()) == []
+
+    restarted = accumulators.AccumulatorSet(accumulator_set.as_dict())
+    restored, added = restarted.register("energy", _energy)
+    assert added
+    assert restored.total_wh == pytest.approx(10)
+    # Nach dem Neustart wird ab der ersten Abfrage weitergezählt, nicht über die Pause
+    restarted.update(1000.0, {POWER: 3600})
+    restarted.update(1010.0, {POWER: 3600})
+    assert restored.total_wh == pytest.approx(20)
+
+
+def test_update_reports_changed_display_values():
+    accumulator_set = accumulators.AccumulatorSet()
+    accumulator, _ = accumulator_set.register("energy", _energy)
+
+    assert accumulator_set.update(0.0, {POWER: 100}) == set()
+    assert accumulator_set.update(1.0, {POWER: 100}) == set()
+    assert accumulator_set.update(3600.0, {POWER: 100}, max_gap=3600) == {accumulator}
+
+
+def test_invalid_stored_state_is_ignored():
+    accumulator_set = accumulators.AccumulatorSet({"energy": {"total_wh": "broken"}})
+
+    accumulator, _ = accumulator_set.register("energy", _energy)
+
+    assert accumulator.total_wh == 0
+
+
+def test_energy_sensors_integrate_unrounded_values():
+    for key in ("heatpump_1_electrical_energy", "heatpump_1_thermal_energy"):
+        spec = sensor.ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY[key].factory().spec
+        assert spec.precision is None
+        assert spec.deadband == 0
+        for _, input_spec in getattr(spec, "inputs", ()):
+            assert input_spec.precision is None
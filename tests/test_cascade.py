@@ -0,0 +1,118 @@
+"""Tests für die Kaskadensummen über mehrere Wärmepumpen."""
+from __future__ import annotations
+
+import pytest
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+cascade = import_integration_module("core.cascade")
+accumulators = import_integration_module("core.accumulators")
+
+
+def test_running_total_follows_member_changes():
+    total = core.RunningTotal()
+
+    total.set("hp1", 1000)
+    total.set("hp2", 500)
+    total.set("hp1", 1200)
+    assert total.total == 1700
+    assert total.mean == 850
+
+    assert total.set("hp2", None)
+    assert total.total == 1200
+    assert len(total) == 1
+
+
+def test_retired_member_keeps_its_last_count():
+    total = core.RunningTotal(cumulative=True)
+    total.set("hp1", 100.0)
+    total.set("hp2", 50.0)
+
+    total.discard("hp2")
+
+    # Die Summe eines Zählerstands fällt nicht, wenn ein Mitglied ausscheidet
+    assert total.total == 150.0
+    assert total.members() == ["hp1"]
+    total.set("hp1", 110.0)
+    assert total.total == 160.0
+
+    # Kehrt es zurück, ersetzt sein Wert den festen Anteil
+    total.set("hp2", 55.0)
+    assert total.total == 165.0
+    total.discard("hp1")
+    total.discard("hp2")
+    assert total.total == 165.0
+    assert total
+    assert total.mean is None
+
+
+def test_running_total_resyncs_exactly(monkeypatch):
+    monkeypatch.setattr(cascade, "RESYNC_UPDATES", 10)
+    total = core.RunningTotal()
+
+    for step in range(25):
+        total.set("hp1", 0.1 * step)
+        total.set("hp2", 0.2 * step)
+
+    assert total.total == pytest.approx(0.3 * 24)
+
+
+def test_discard_source_retires_only_its_members():
+    totals = core.CascadeTotals()
+    totals.sources.update({"entry1", "entry2"})
+    totals.set("electrical_energy", ("entry1", 1), 10.0, cumulative=True)
+    totals.set("electrical_energy", ("entry2", 1), 20.0, cumulative=True)
+    totals.set("electrical_power", ("entry1", 1), 700.0)
+    totals.set("electrical_power", ("entry2", 1), 800.0)
+    revision = totals.revision
+
+    totals.discard_source("entry2")
+
+    assert totals.sources == {"entry1"}
+    assert totals.total("electrical_energy") == 30.0
+    assert totals.total("electrical_power") == 700.0
+    assert totals.revision == revision + 2
+    totals.discard_source("entry1")
+    assert totals.total("electrical_power") is None
+    assert totals.total("electrical_energy") == 30.0
+
+
+def test_revision_only_changes_with_values():
+    totals = core.CascadeTotals()
+
+    totals.set("thermal_power", ("entry", 1), 3000.0)
+    revision = totals.revision
+    totals.set("thermal_power", ("entry", 1), 3000.0)
+    totals.discard("thermal_power", ("entry", 2))
+
+    assert totals.revision == revision
+
+
+def test_ratio_requires_denominator_above_minimum():
+    totals = core.CascadeTotals()
+    totals.set("thermal_power", ("entry", 1), 4000.0)
+
+    assert totals.ratio("thermal_power", "electrical_power") is None
+    totals.set("electrical_power", ("entry", 1), 50.0)
+    assert totals.ratio("thermal_power", "electrical_power", minimum=100) is None
+    totals.set("electrical_power", ("entry", 1), 1000.0)
+    assert totals.ratio("thermal_power", "electrical_power", minimum=100) == 4.0
+
+
+def test_module_input_shifts_registers_and_accumulator_key():
+    power = core.ValueSpec(register=1012)
+    template = core.CascadeInput(
+        "electrical_energy", 1,
+        accumulator="heatpump_1_electrical_energy",
+        factory=lambda: accumulators.EnergyAccumulator(power),
+    )
+
+    second = core.module_input(template, 2)
+
+    assert second.module == 2
+    assert second.accumulator == "heatpump_2_electrical_energy"
+    assert second.factory().spec.register == 1112
+    derived = core.DerivedSpec("a - b", (("a", power), ("b", core.ValueSpec(register=1013))))
+    shifted = core.module_spec(derived, 3)
+    assert [spec.register for _, spec in shifted.inputs] == [1212, 1213]
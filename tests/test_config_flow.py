@@ -0,0 +1,51 @@
+"""Tests für den Options-Flow."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from tools import import_integration_module
+
+const = import_integration_module("const")
+config_flow = import_integration_module("config_flow")
+
+ENTRY_DATA = {
+    const.CONF_MODBUS_HOST: "192.0.2.10",
+    const.CONF_MODBUS_PORT: const.DEFAULT_PORT,
+    const.CONF_SLAVE_ID: const.DEFAULT_SLAVE_ID,
+    const.CONF_MODEL: "EU08L",
+    const.CONF_AMOUNT_OF_HEATPUMPS: 2,
+}
+
+
+def _flow(options=None):
+    entry = MockConfigEntry(domain=const.DOMAIN, data=ENTRY_DATA, options=options or {})
+    return config_flow.LambdaHeatpumpsOptionsFlow(entry)
+
+
+def test_options_form_renders_with_entry_values_and_defaults():
+    result = asyncio.run(_flow({const.CONF_UPDATE_INTERVAL: 30}).async_step_init())
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "init"
+    values = result["data_schema"]({})
+    assert values[const.CONF_MODBUS_HOST] == "192.0.2.10"
+    assert values[const.CONF_AMOUNT_OF_HEATPUMPS] == 2
+    assert values[const.CONF_UPDATE_INTERVAL] == 30
+    assert values[const.CONF_MODBUS_SERVER] is False
+    assert values[const.CONF_MODBUS_SERVER_PORT] == const.DEFAULT_MODBUS_SERVER_PORT
+    assert values[const.CONF_MODBUS_SERVER_HOST] == const.DEFAULT_MODBUS_SERVER_HOST
+
+
+def test_options_without_connection_change_are_saved():
+    flow = _flow()
+    form = asyncio.run(flow.async_step_init())
+    user_input = form["data_schema"]({const.CONF_MODBUS_SERVER: True, const.CONF_MODBUS_SERVER_HOST: "0.0.0.0"})
+
+    result = asyncio.run(flow.async_step_init(user_input))
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"][const.CONF_MODBUS_SERVER] is True
+    assert result["data"][const.CONF_MODBUS_SERVER_HOST] == "0.0.0.0"
@@ -0,0 +1,56 @@
+"""Tests für die Zyklusstatistik des Koordinators."""
+from __future__ import annotations
+
+import asyncio
+
+from pymodbus.exceptions import ConnectionException
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+coordinator_module = import_integration_module("coordinator")
+
+
+class UnreachableClient:
+    """Modbus-Client, dessen Verbindung bei jedem Lesezugriff abbricht."""
+
+    def connect(self):
+        return True
+
+    def is_socket_open(self):
+        return True
+
+    def read_holding_registers(self, address, count, slave):
+        raise ConnectionException("connection reset")
+
+    def close(self):
+        pass
+
+
+async def _refresh_unreachable(refreshes):
+    async with async_test_home_assistant() as hass:
+        coordinator = coordinator_module.LambdaHeatpumpCoordinator(
+            hass, core.ModbusConfig(host="192.0.2.10", port=502, slave_id=1), UnreachableClient
+        )
+        coordinator.client.add_register(1000)
+        listener_calls = []
+        unsubscribe = coordinator.async_add_listener(
+            lambda: listener_calls.append(coordinator.last_update_success)
+        )
+        for _ in range(refreshes):
+            await coordinator.async_refresh()
+        unsubscribe()
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+    return coordinator, listener_calls
+
+
+def test_failed_cycles_are_counted_without_listener_notification():
+    coordinator, listener_calls = asyncio.run(_refresh_unreachable(3))
+
+    assert coordinator.last_update_success is False
+    # Home Assistant benachrichtigt nur beim ersten der aufeinanderfolgenden Fehler
+    assert listener_calls == [False]
+    assert coordinator.poll_statistics.cycles == 3
+    assert coordinator.poll_statistics.failed_cycles == 3
@@ -0,0 +1,31 @@
+"""Tests für die berechneten Sensoren."""
+from __future__ import annotations
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+sensor = import_integration_module("sensor")
+
+
+def _thermal_power():
+    return sensor._derived_spec(sensor.DERIVED_SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_thermal_power"])
+
+
+def test_inputs_are_not_rounded_or_filtered():
+    spec = _thermal_power()
+
+    assert spec.precision == 10
+    for _, input_spec in spec.inputs:
+        assert input_spec.precision is None
+        assert input_spec.deadband == 0
+        assert input_spec.min_publish_interval == 0
+
+
+def test_only_the_result_is_rounded():
+    evaluate = core.compile_derived(_thermal_power())
+
+    # Durchfluss 1.12 m³/h, Vorlauf 35.4 °C, Rücklauf 30.24 °C
+    value = evaluate({1004: 354, 1005: 3024, 1006: 112})
+
+    # Mit gerundeten Eingängen (1.1 m³/h, 30.2 °C) wären es 6650 W
+    assert value == 6720
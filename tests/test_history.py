@@ -0,0 +1,97 @@
+"""Tests für den Ringpuffer des Registerverlaufs."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+
+
+def _filled(capacity, rows):
+    history = core.RegisterHistory(capacity)
+    for row in range(rows):
+        history.append(float(row), {1004: row * 10, 1005: row})
+    return history
+
+
+def test_window_is_contiguous_after_wrap():
+    history = _filled(4, 7)
+
+    window = history.window()
+
+    assert len(history) == len(window) == 4
+    assert window.timestamps.tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert window.columns[1004].tolist() == [30, 40, 50, 60]
+    assert history.latest_timestamp == 6.0
+    # Views in den Puffer, keine Kopien
+    assert window.timestamps.base is not None
+    assert not window.columns[1004].flags.writeable
+
+
+def test_window_by_seconds_and_registers():
+    history = _filled(4, 7)
+
+    window = history.window(seconds=1.5, registers=[1005, 2000])
+
+    assert window.timestamps.tolist() == [5.0, 6.0]
+    assert list(window.columns) == [1005]
+    assert window.columns[1005].tolist() == [5, 6]
+
+
+def test_missing_values_are_nan_and_stale_columns_dropped():
+    history = _filled(3, 2)
+
+    history.append(2.0, {1004: 20, 1005: None})
+    assert np.isnan(history.window().columns[1005][-1])
+
+    history.append(3.0, {1004: 30})
+    history.append(4.0, {1004: 40})
+    # 1005 hatte einen vollen Umlauf lang keinen Wert
+    assert history.registers == [1004]
+
+
+def test_scaled_applies_factor():
+    history = _filled(4, 2)
+
+    window = history.window()
+
+    assert window.scaled(core.ValueSpec(register=1004, factor=0.1)).tolist() == pytest.approx([0.0, 1.0])
+    assert np.isnan(window.scaled(core.ValueSpec(register=1010))).all()
+
+
+@pytest.mark.parametrize("capacity", [2, 4, 10])
+def test_resize_keeps_newest_rows(capacity):
+    history = _filled(4, 7)
+
+    history.resize(capacity)
+
+    kept = min(capacity, 4)
+    assert history.capacity == capacity
+    assert history.window().timestamps.tolist() == [float(row) for row in range(7 - kept, 7)]
+
+    # Weiterschreiben über den neuen Umlauf hinweg
+    for row in range(7, 7 + capacity + 1):
+        history.append(float(row), {1004: row * 10, 1005: row})
+    window = history.window()
+    assert window.timestamps.tolist() == [float(row) for row in range(8, 8 + capacity)]
+    assert window.columns[1004].tolist() == [row * 10 for row in range(8, 8 + capacity)]
+
+
+def test_resize_keeps_stale_tracking():
+    history = _filled(4, 3)
+    history.append(3.0, {1004: 30})
+
+    history.resize(2)
+    history.append(4.0, {1004: 40})
+
+    # 1005 zuletzt in Zeile 2 gesehen, zwei Zeilen ohne Wert = voller Umlauf
+    assert history.registers == [1004]
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        core.RegisterHistory(0)
+    with pytest.raises(ValueError):
+        _filled(2, 1).resize(0)
@@ -0,0 +1,126 @@
+"""Tests für den Modbus-TCP-Server über dem Registerabbild."""
+from __future__ import annotations
+
+import asyncio
+import struct
+from datetime import timedelta
+
+from tools import import_integration_module
+
+modbus_server = import_integration_module("modbus_server")
+
+MODULE_COUNTS = {"heatpump": 1, "boiler": 1, "buffer": 0, "solar": 0, "heatingcircuit": 1}
+
+
+class ImageCoordinator:
+    """Koordinator mit festem Registerabbild und aufgezeichneten Abonnements."""
+
+    def __init__(self, image=None):
+        self.update_interval = timedelta(seconds=10)
+        self.register_profile = None
+        self.image = dict(image or {})
+        self.subscribed = {}
+        self.writes = []
+        self.listeners = []
+
+    def async_add_listener(self, listener):
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def read_image(self, address, count, max_age):
+        addresses = range(address, address + count)
+        return [self.image.get(current, 0) for current in addresses], [
+            current for current in addresses if current not in self.image
+        ]
+
+    def is_subscribed(self, address):
+        return address in self.subscribed
+
+    def subscribe_registers(self, registers):
+        self.subscribed.update(registers)
+
+    def unsubscribe_registers(self, registers):
+        for register, _ in registers:
+            del self.subscribed[register]
+
+    async def async_write_registers(self, address, values):
+        self.writes.append((address, values))
+
+    def poll(self):
+        for listener in list(self.listeners):
+            listener()
+
+
+def _server(coordinator):
+    return modbus_server.RegisterImageServer(coordinator, port=0, module_counts=MODULE_COUNTS)
+
+
+def _read(address, count=1):
+    return struct.pack(">BHH", modbus_server.READ_HOLDING_REGISTERS, address, count)
+
+
+def test_read_is_served_from_the_image():
+    server = _server(ImageCoordinator({1004: 215}))
+    response = asyncio.run(server.handle_pdu(_read(1004)))
+    assert response == struct.pack(">BBH", 3, 2, 215)
+
+
+def test_missing_known_register_is_subscribed_with_its_type():
+    coordinator = ImageCoordinator()
+    server = _server(coordinator)
+    response = asyncio.run(server.handle_pdu(_read(1004)))
+    assert response == struct.pack(">BB", 0x83, modbus_server.GATEWAY_TARGET_FAILED)
+    assert coordinator.subscribed == {1004: "int16"}
+
+
+def test_unknown_address_is_rejected_without_subscription():
+    coordinator = ImageCoordinator()
+    server = _server(coordinator)
+    response = asyncio.run(server.handle_pdu(_read(1090)))
+    assert response == struct.pack(">BB", 0x83, modbus_server.ILLEGAL_DATA_ADDRESS)
+    assert coordinator.subscribed == {}
+    assert server.stats.rejected_reads == 1
+
+
+def test_idle_server_subscription_is_released(socket_enabled):
+    coordinator = ImageCoordinator()
+    server = _server(coordinator)
+    asyncio.run(server.start())
+    try:
+        asyncio.run(server.handle_pdu(_read(1004)))
+        for _ in range(modbus_server.SUBSCRIPTION_IDLE_POLLS):
+            coordinator.poll()
+        assert coordinator.subscribed == {1004: "int16"}
+        coordinator.poll()
+        assert coordinator.subscribed == {}
+    finally:
+        asyncio.run(server.stop())
+
+
+def test_write_only_reaches_writable_registers():
+    coordinator = ImageCoordinator()
+    server = _server(coordinator)
+    accepted = struct.pack(">BHH", modbus_server.WRITE_SINGLE_REGISTER, 2050, 500)
+    rejected = struct.pack(">BHH", modbus_server.WRITE_SINGLE_REGISTER, 1000, 1)
+    assert asyncio.run(server.handle_pdu(accepted)) == accepted
+    assert asyncio.run(server.handle_pdu(rejected)) == struct.pack(">BB", 0x86, modbus_server.ILLEGAL_DATA_ADDRESS)
+    assert coordinator.writes == [(2050, [500])]
+
+
+def test_stop_cancels_open_connections(socket_enabled):
+    async def run():
+        server = _server(ImageCoordinator())
+        await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        while not server.stats.active_connections:
+            await asyncio.sleep(0.01)
+        tasks = list(server._connections.values())
+
+        await server.stop()
+
+        assert all(task.cancelled() for task in tasks)
+        assert server.stats.active_connections == 0
+        assert await reader.read() == b""
+        writer.close()
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+"""Tests für die referenzgezählten Abonnements und den Read-Plan."""
+from __future__ import annotations
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+ReadPlanner = core.ReadPlanner
+
+
+def _blocks(planner):
+    return [(block.start, block.count) for block in planner.read_plan]
+
+
+def test_shared_register_is_read_once_until_last_unsubscribe():
+    planner = ReadPlanner(50)
+    assert planner.add_register(1004, "int16") is True
+    assert planner.add_register(1004, "int16") is False
+    assert _blocks(planner) == [(1004, 1)]
+
+    assert planner.remove_register(1004) is False
+    assert _blocks(planner) == [(1004, 1)]
+    assert planner.remove_register(1004) is True
+    assert planner.read_plan == []
+    # Weitere Freigaben sind wirkungslos
+    assert planner.remove_register(1004) is False
+
+
+def test_registers_within_gap_are_merged():
+    planner = ReadPlanner(50)
+    for register in (1000, 1002, 1002 + core.MAX_REGISTER_GAP + 1):
+        planner.add_register(register)
+    assert _blocks(planner) == [(1000, 8)]
+
+
+def test_gap_larger_than_limit_starts_new_block():
+    planner = ReadPlanner(50)
+    planner.add_register(1000)
+    planner.add_register(1000 + core.MAX_REGISTER_GAP + 2)
+    assert _blocks(planner) == [(1000, 1), (1000 + core.MAX_REGISTER_GAP + 2, 1)]
+
+
+def test_block_respects_chunk_size_and_register_width():
+    planner = ReadPlanner(4)
+    planner.add_register(1000, "int16")
+    planner.add_register(1002, "int32")
+    # 1000..1003 passt genau, 1004 würde die Chunk-Größe überschreiten
+    planner.add_register(1004, "int16")
+    assert _blocks(planner) == [(1000, 4), (1004, 1)]
+
+
+def test_blocks_never_cross_module_segments():
+    planner = ReadPlanner(50)
+    planner.add_register(1098)
+    planner.add_register(1100)
+    assert _blocks(planner) == [(1098, 1), (1100, 1)]
+
+
+def test_second_word_of_wide_register_counts_as_subscribed():
+    planner = ReadPlanner(50)
+    planner.add_register(1020, "int32")
+    assert planner.is_subscribed(1020)
+    assert planner.is_subscribed(1021)
+    assert not planner.is_subscribed(1022)
+
+
+def test_chunk_size_change_recompiles_plan():
+    planner = ReadPlanner(50)
+    for register in range(1000, 1006):
+        planner.add_register(register)
+    assert _blocks(planner) == [(1000, 6)]
+    planner.set_chunk_size(3)
+    assert _blocks(planner) == [(1000, 3), (1003, 3)]
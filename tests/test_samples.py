@@ -0,0 +1,105 @@
+"""Tests für die Sample-Datei (Ringdatei fester Größe)."""
+from __future__ import annotations
+
+import csv
+
+import numpy as np
+import pytest
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+
+
+def _write(path, capacity, polls):
+    writer = core.SampleWriter(str(path), capacity)
+    for timestamp in range(polls):
+        writer.append(float(timestamp), {1004: timestamp * 10, 1005: timestamp, 1006: None})
+    return writer
+
+
+def test_samples_are_read_oldest_first_after_wraparound(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    writer = _write(path, 5, 4)
+    writer.close()
+
+    samples = core.read_samples(str(path))
+
+    # 8 Datensätze in 5 Plätzen: die drei ältesten sind überschrieben
+    assert writer.as_dict()["wrapped"] is True
+    assert samples["timestamp"].tolist() == [1.0, 2.0, 2.0, 3.0, 3.0]
+    assert samples["register"].tolist() == [1005, 1004, 1005, 1004, 1005]
+
+
+def test_batch_wraps_across_file_end(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    writer = core.SampleWriter(str(path), 3)
+    writer.append(0.0, {1004: 0, 1005: 1})
+    writer.append(1.0, {1004: 10, 1005: 11})
+    writer.close()
+
+    samples = core.read_samples(str(path))
+
+    assert samples["timestamp"].tolist() == [0.0, 1.0, 1.0]
+    assert samples["value"].tolist() == [1, 10, 11]
+
+
+def test_oversized_batch_keeps_the_last_records(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    writer = core.SampleWriter(str(path), 2)
+    assert writer.append(0.0, {1004: 1, 1005: 2, 1006: 3}) == 2
+    writer.close()
+
+    assert core.read_samples(str(path))["register"].tolist() == [1005, 1006]
+
+
+def test_writer_resumes_file_of_same_capacity(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    _write(path, 5, 2).close()
+
+    resumed = core.SampleWriter(str(path), 5)
+    assert resumed.written == 4
+    resumed.append(5.0, {1004: 50, 1005: 5})
+    resumed.close()
+    assert core.read_samples(str(path))["timestamp"].tolist() == [0.0, 1.0, 1.0, 5.0, 5.0]
+
+    # Andere Kapazität: Datei wird neu angelegt
+    recreated = core.SampleWriter(str(path), 4)
+    assert recreated.written == 0
+    recreated.close()
+
+
+def test_read_filters_and_pivot(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    _write(path, 10, 4).close()
+
+    samples = core.read_samples(str(path), since=2.0, registers=[1004])
+    assert samples["value"].tolist() == [20, 30]
+
+    timestamps, registers, table = core.pivot_samples(core.read_samples(str(path), since=2.0))
+    assert timestamps.tolist() == [2.0, 3.0]
+    assert registers.tolist() == [1004, 1005]
+    assert table.tolist() == [[20, 2], [30, 3]]
+
+
+def test_export_csv(tmp_path):
+    path = tmp_path / "samples.lmbs"
+    _write(path, 5, 4).close()
+    output = tmp_path / "export" / "samples.csv"
+
+    assert core.export_samples(str(path), str(output)) == 5
+
+    with open(output, encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["timestamp", "1004", "1005"]
+    # Der Wert von 1004 zum Zeitpunkt 1 ist bereits überschrieben
+    assert rows[1] == ["1.000", "", "1.0"]
+    assert rows[3] == ["3.000", "30.0", "3.0"]
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "other.lmbs"
+    path.write_bytes(np.zeros(64, dtype=np.uint8).tobytes())
+
+    with pytest.raises(ValueError):
+        core.read_samples(str(path))
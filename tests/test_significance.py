@@ -0,0 +1,57 @@
+"""Tests für den Signifikanzfilter (Totband, Rundung, Mindestabstand)."""
+from __future__ import annotations
+
+from tools import import_integration_module
+
+core = import_integration_module("core")
+registers = import_integration_module("core.registers")
+
+TEMPERATURE = core.ValueSpec(register=1005, factor=0.01, precision=0.1, deadband=0.2)
+
+
+def test_precision_rounds_away_last_digit_noise():
+    convert = core.build_converter(TEMPERATURE)
+
+    assert convert(3024) == 30.2
+    assert convert(3026) == 30.3
+    assert convert(3014) == convert(3006) == 30.1
+
+
+def test_changes_within_deadband_are_suppressed():
+    published = (20.0, 0.0)
+
+    assert not core.is_significant(TEMPERATURE, 20.1, published, 60.0)
+    assert not core.is_significant(TEMPERATURE, 19.9, published, 60.0)
+    # 20.2 - 20.0 ist in Gleitkomma etwas kleiner als 0.2
+    assert core.is_significant(TEMPERATURE, 20.2, published, 60.0)
+    assert core.is_significant(TEMPERATURE, 19.8, published, 60.0)
+
+
+def test_heartbeat_publishes_drift_within_deadband():
+    published = (20.0, 0.0)
+
+    assert not core.is_significant(TEMPERATURE, 20.1, published, registers.PUBLISH_HEARTBEAT - 1)
+    assert core.is_significant(TEMPERATURE, 20.1, published, registers.PUBLISH_HEARTBEAT)
+    # Unverändert bleibt unverändert, auch nach dem Heartbeat
+    assert not core.is_significant(TEMPERATURE, 20.0, published, registers.PUBLISH_HEARTBEAT)
+
+
+def test_min_publish_interval_delays_changes():
+    spec = core.ValueSpec(register=1012, min_publish_interval=30)
+    published = (1500, 100.0)
+
+    assert not core.is_significant(spec, 2500, published, 120.0)
+    assert core.is_significant(spec, 2500, published, 130.0)
+
+
+def test_unavailable_values_are_always_published():
+    spec = core.ValueSpec(register=1012, min_publish_interval=30, deadband=50)
+
+    assert core.is_significant(spec, None, (1500, 100.0), 101.0)
+    assert core.is_significant(spec, 1500, (None, 100.0), 101.0)
+
+
+def test_state_values_ignore_deadband():
+    spec = core.ValueSpec(register=1002, states=((1, "READY"), (5, "CH")), deadband=10)
+
+    assert core.is_significant(spec, "CH", ("READY", 0.0), 1.0)
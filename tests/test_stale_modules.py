@@ -0,0 +1,67 @@
+"""Tests für das Entfernen der Entitäten und Geräte nicht mehr konfigurierter Module."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+from tools import import_integration_module
+
+const = import_integration_module("const")
+integration = import_integration_module("__init__")
+
+ENTRY_DATA = {
+    const.CONF_MODBUS_HOST: "192.0.2.10",
+    const.CONF_AMOUNT_OF_HEATPUMPS: 2,
+    const.CONF_AMOUNT_OF_HEAT_CIRCUITS: 0,
+}
+
+# (Plattform, Key) der Entitäten im Entity Registry
+ENTITIES = (
+    ("climate", "heatpump_1_climate"),
+    ("climate", "heatingcircuit_2_climate"),
+    ("climate", "boiler_1_climate"),
+    ("sensor", "heatpump_2_flowline_temp"),
+    ("sensor", "heatpump_3_flowline_temp"),
+)
+
+
+async def _remaining_after_cleanup():
+    async with async_test_home_assistant() as hass:
+        entry = MockConfigEntry(domain=const.DOMAIN, data=ENTRY_DATA)
+        entry.add_to_hass(hass)
+        entity_registry = er.async_get(hass)
+        for platform, key in ENTITIES:
+            entity_registry.async_get_or_create(
+                platform, const.DOMAIN, f"{entry.entry_id}_{key}", config_entry=entry
+            )
+        device_registry = dr.async_get(hass)
+        for device_key in ("heatpump_1", "heatpump_3", "heatingcircuit_2"):
+            device_registry.async_get_or_create(
+                config_entry_id=entry.entry_id, identifiers={(const.DOMAIN, f"{entry.entry_id}_{device_key}")}
+            )
+
+        integration._async_remove_stale_modules(hass, entry)
+
+        prefix = f"{entry.entry_id}_"
+        entities = sorted(
+            entity.unique_id.removeprefix(prefix)
+            for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id)
+        )
+        devices = sorted(
+            identifier.removeprefix(prefix)
+            for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id)
+            for _, identifier in device.identifiers
+        )
+        await hass.async_stop(force=True)
+    return entities, devices
+
+
+def test_climate_entities_follow_heating_circuit_count():
+    entities, devices = asyncio.run(_remaining_after_cleanup())
+
+    # Die Klima-Entität der Wärmepumpe liegt auf den Registern von Heizkreis 1
+    assert entities == ["boiler_1_climate", "heatpump_2_flowline_temp"]
+    assert devices == ["heatpump_1"]
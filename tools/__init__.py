@@ -0,0 +1,30 @@
+"""Entwicklungswerkzeuge für die Lambda Heatpump Integration.
+
+Die Werkzeuge laufen ohne echte Wärmepumpe und werden aus dem
+Repository-Verzeichnis gestartet, z. B. ``python -m tools.simulator``.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+# Verzeichnis der Integration (enthält manifest.json)
+INTEGRATION_DIR = Path(__file__).resolve().parent.parent
+INTEGRATION_PACKAGE = "lambda_heatpumps"
+
+
+def import_integration_module(name: str) -> types.ModuleType:
+    """Importiere ein Modul der Integration als lambda_heatpumps.<name>.
+
+    Das Paket wird dabei nur als Namensraum registriert; das __init__.py der
+    Integration (und damit der Setup-Code für Home Assistant) wird nicht
+    ausgeführt. Relative Importe zwischen den Modulen funktionieren wie
+    gewohnt.
+    """
+    if INTEGRATION_PACKAGE not in sys.modules:
+        package = types.ModuleType(INTEGRATION_PACKAGE)
+        package.__path__ = [str(INTEGRATION_DIR)]
+        sys.modules[INTEGRATION_PACKAGE] = package
+    return importlib.import_module(f"{INTEGRATION_PACKAGE}.{name}")
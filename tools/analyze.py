@@ -0,0 +1,200 @@
+"""Tagesauswertung einer Aufzeichnung ohne Home Assistant-Instanz.
+
+Liest eine Sample-Datei (Service lambda_heatpumps.start_samples) oder einen
+Modbus-Mitschnitt (Service lambda_heatpumps.start_capture) und berechnet
+pro Tag COP, Verdichterstarts, Takten, Abtauvorgänge und die Effizienz der
+Warmwasserbereitung (core.analytics). Die Werte entstehen aus denselben
+Specs wie die Sensoren und Zähler der Integration; sensor.py und damit
+Home Assistant müssen deshalb importierbar sein::
+
+    python -m tools.analyze samples.lmbs
+    python -m tools.analyze capture.lmbc --heatpump 2 --since 2026-01-01 --output report.json
+    python -m tools.analyze samples.lmbs --min-runtime 900 --episodes
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import import_integration_module
+
+_LOGGER = logging.getLogger(__name__)
+
+# Spalten der Tagesübersicht: (Feld in DailyStatistics, Überschrift, Nachkommastellen)
+DAILY_COLUMNS = (
+    ("hours", "h", 1),
+    ("electrical_kwh", "el kWh", 2),
+    ("thermal_kwh", "th kWh", 2),
+    ("cop", "COP", 2),
+    ("compressor_starts", "Starts", 0),
+    ("compressor_hours", "Laufzeit h", 1),
+    ("short_cycles", "Takten", 0),
+    ("defrosts", "Abtauen", 0),
+    ("defrost_hours", "Abtau h", 2),
+    ("dhw_cycles", "WW", 0),
+    ("dhw_cop", "WW COP", 2),
+)
+
+
+def heatpump_specs() -> Any:
+    """Die Specs der ersten Wärmepumpe aus den Zählern und Sensoren von sensor.py."""
+    const = import_integration_module("const")
+    core = import_integration_module("core")
+    sensor = import_integration_module("sensor")
+    accumulators = sensor.ACCUMULATOR_SENSOR_DESCRIPTIONS_BY_KEY
+    compressor = accumulators["heatpump_1_compressor_starts"].factory()
+    return core.HeatpumpSpecs(
+        electrical_power=accumulators["heatpump_1_electrical_energy"].factory().spec,
+        thermal_power=accumulators["heatpump_1_thermal_energy"].factory().spec,
+        state=compressor.spec,
+        compressor_states=compressor.states,
+        defrost_states=accumulators["heatpump_1_defrost_cycles"].factory().states,
+        request_type=sensor._value_spec(sensor.SENSOR_DESCRIPTIONS_BY_KEY["heatpump_1_request_type"]),
+        dhw_requests=frozenset({const.HP_REQUEST_DHW}),
+    )
+
+
+def parse_since(text: str) -> float:
+    """Unix-Zeitstempel oder ISO-Datum/-Zeit (ohne Zeitzone lokal)."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"Ungültiger Zeitpunkt {text!r}, erwartet z. B. 2026-01-01") from err
+
+
+def local_utc_offset() -> float:
+    offset = datetime.now().astimezone().utcoffset()
+    return offset.total_seconds() if offset else 0.0
+
+
+def _number(value: float, digits: int) -> Optional[float]:
+    if math.isnan(value):
+        return None
+    return int(value) if digits == 0 else round(value, digits)
+
+
+def _date(timestamp: float, utc_offset: float) -> str:
+    return datetime.fromtimestamp(timestamp + utc_offset, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _time(timestamp: float, utc_offset: float) -> str:
+    return datetime.fromtimestamp(timestamp + utc_offset, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def daily_rows(daily: Any, utc_offset: float) -> List[Dict[str, Any]]:
+    fields = [(field, digits) for field, _, digits in DAILY_COLUMNS]
+    fields += [("dhw_electrical_kwh", 2), ("dhw_thermal_kwh", 2)]
+    columns = {field: getattr(daily, field).tolist() for field, _ in fields}
+    return [
+        {"date": _date(start, utc_offset), **{field: _number(columns[field][row], digits) for field, digits in fields}}
+        for row, start in enumerate(daily.start.tolist())
+    ]
+
+
+def episode_rows(episodes: Any, utc_offset: float) -> List[Dict[str, Any]]:
+    return [
+        {
+            "start": _time(start, utc_offset),
+            "minutes": round(duration / 60, 1),
+            "electrical_kwh": round(electrical / 1000, 3),
+            "thermal_kwh": round(thermal / 1000, 3),
+            "cop": _number(cop, 2),
+        }
+        for start, duration, electrical, thermal, cop in zip(
+            episodes.start.tolist(), episodes.duration.tolist(), episodes.electrical_wh.tolist(),
+            episodes.thermal_wh.tolist(), episodes.cop.tolist(),
+        )
+    ]
+
+
+def print_table(rows: List[Dict[str, Any]], columns: Sequence[tuple]) -> None:
+    """Tabelle mit Datum bzw. Beginn in der ersten Spalte; fehlende Werte als --."""
+    first = "date" if rows and "date" in rows[0] else "start"
+    widths = [max(len(label), 6) for _, label in columns]
+    header = f"{first:<19}" + "".join(f"  {label:>{width}}" for (_, label), width in zip(columns, widths))
+    print(header)
+    for row in rows:
+        cells = ("--" if row[field] is None else str(row[field]) for field, _ in columns)
+        print(f"{row[first]:<19}" + "".join(f"  {cell:>{width}}" for cell, width in zip(cells, widths)))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aufzeichnung einer Wärmepumpe pro Tag auswerten")
+    parser.add_argument("path", help="Sample-Datei (.lmbs) oder Mitschnitt (.lmbc)")
+    parser.add_argument("--heatpump", type=int, default=1, help="Nummer der Wärmepumpe (Standard 1)")
+    parser.add_argument("--since", type=parse_since, help="Nur Daten ab diesem Zeitpunkt, z. B. 2026-01-01")
+    parser.add_argument(
+        "--utc-offset", type=float,
+        help="Tagesgrenzen in Stunden gegenüber UTC (Standard: aktuelle lokale Zeitzone, ohne Sommerzeitwechsel)",
+    )
+    parser.add_argument("--max-gap", type=float, help="Längste gezählte Lücke zwischen Abfragen in Sekunden (Standard 300)")
+    parser.add_argument("--min-runtime", type=float, help="Verdichterläufe unter dieser Dauer in Sekunden gelten als Takten (Standard 600)")
+    parser.add_argument("--episodes", action="store_true", help="Auch Taktvorgänge und Warmwasserbereitungen einzeln ausgeben")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    args = parser.parse_args(argv)
+    if args.heatpump < 1:
+        parser.error("--heatpump muss mindestens 1 sein")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lambda_heatpumps").setLevel(logging.WARNING)
+
+    core = import_integration_module("core")
+    specs = heatpump_specs().for_module(args.heatpump)
+    utc_offset = local_utc_offset() if args.utc_offset is None else args.utc_offset * 3600
+    max_gap = core.MAX_INTEGRATION_GAP if args.max_gap is None else args.max_gap
+    min_runtime = core.MIN_COMPRESSOR_RUNTIME if args.min_runtime is None else args.min_runtime
+
+    started = time.perf_counter()
+    try:
+        table = core.read_table(args.path, specs.registers, args.since)
+    except (OSError, ValueError) as err:
+        print(f"Cannot read {args.path}: {err}", file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
+    analysis = core.analyze_heatpump(table, specs, utc_offset, max_gap, min_runtime)
+    finished = time.perf_counter()
+    _LOGGER.info(
+        "%d polls loaded in %.2f s, analyzed in %.2f s", len(table), loaded - started, finished - loaded
+    )
+
+    daily = daily_rows(analysis.daily, utc_offset)
+    short_cycles = episode_rows(analysis.short_cycles, utc_offset)
+    dhw_cycles = episode_rows(analysis.dhw, utc_offset)
+    print_table(daily, [(field, label) for field, label, _ in DAILY_COLUMNS])
+    if args.episodes:
+        episode_columns = [("minutes", "min"), ("electrical_kwh", "el kWh"), ("thermal_kwh", "th kWh"), ("cop", "COP")]
+        print(f"\nTakten ({len(short_cycles)})")
+        print_table(short_cycles, episode_columns)
+        print(f"\nWarmwasserbereitung ({len(dhw_cycles)})")
+        print_table(dhw_cycles, episode_columns)
+
+    if args.output:
+        report = {
+            "path": args.path,
+            "heatpump": args.heatpump,
+            "polls": len(table),
+            "utc_offset_hours": utc_offset / 3600,
+            "min_runtime": min_runtime,
+            "load_seconds": round(loaded - started, 3),
+            "analysis_seconds": round(finished - loaded, 3),
+            "daily": daily,
+            "short_cycles": short_cycles,
+            "defrosts": episode_rows(analysis.defrosts.select(analysis.defrosts.counted), utc_offset),
+            "dhw_cycles": dhw_cycles,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""Benchmark des Abfragezyklus gegen den simulierten Lambda-Controller.
+
+Für jede Kombination aus Anlagengröße und simulierter Round-Trip-Zeit wird
+ein LambdaHeatpumpCoordinator mit allen Registern des Simulators abonniert
+(entspricht "alle Entitäten aktiviert") und _async_update_data mehrfach
+ausgeführt. Gemessen werden pro Zyklus:
+
+- Dauer des Zyklus (Wanduhr)
+- Anzahl der Modbus-Anfragen und übertragene Bytes (Zähler des Simulators)
+- CPU-Zeit des Event-Loop-Threads und des Modbus-Threads
+- Verzögerung des Event-Loops (Lag eines periodischen Monitor-Tasks)
+
+Aufruf aus dem Verzeichnis der Integration::
+
+    python -m tools.benchmark run --output results.json
+    python -m tools.benchmark compare baseline.json results.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import INTEGRATION_DIR, import_integration_module
+from .simulator import LambdaSimulator, SimulatorConfig, SimulatorThread
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anlagengrößen von der kleinsten bis zur größten unterstützten Ausbaustufe
+CONFIGURATIONS: Dict[str, SimulatorConfig] = {
+    "minimal": SimulatorConfig(heatpumps=1, boilers=1, buffers=0, solar=0, heating_circuits=0),
+    "typical": SimulatorConfig(heatpumps=1, boilers=1, buffers=1, solar=0, heating_circuits=2),
+    "medium": SimulatorConfig(heatpumps=2, boilers=3, buffers=2, solar=1, heating_circuits=6),
+    "maximal": SimulatorConfig(heatpumps=3, boilers=5, buffers=5, solar=2, heating_circuits=12),
+}
+# Simulierte Round-Trip-Zeiten in Millisekunden
+RTTS_MS = (0, 5, 50)
+
+DEFAULT_CYCLES = 20
+WARMUP_CYCLES = 2
+# Abtastintervall des Event-Loop-Monitors (Sekunden)
+LAG_INTERVAL = 0.005
+
+# Kennzahlen für den Vergleich: (Pfad im Ergebnis, Toleranz gilt)
+COMPARED_METRICS: Tuple[Tuple[str, bool], ...] = (
+    ("wall_ms.p50", True),
+    ("wall_ms.p95", True),
+    ("cpu_ms.p50", True),
+    ("requests_per_cycle", False),
+    ("bytes_per_cycle", False),
+    ("loop_lag_ms.max", True),
+)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Perzentil nach dem Nearest-Rank-Verfahren."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Mittelwert, Median, p95 und Maximum, auf Mikrosekunden gerundet."""
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 0.50), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "max": round(max(values), 3),
+    }
+
+
+class LoopLagMonitor:
+    """Misst, wie lange der Event-Loop blockiert ist.
+
+    Ein Task schläft jeweils LAG_INTERVAL Sekunden; die Überschreitung der
+    erwarteten Aufwachzeit ist die Zeit, in der der Loop mit anderer Arbeit
+    blockiert war.
+    """
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def reset(self) -> None:
+        self.max_lag = 0.0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - expected)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+async def run_scenario(hass, name: str, config: SimulatorConfig, rtt_ms: float, cycles: int) -> Dict[str, Any]:
+    """Führe die Zyklen für eine Anlagengröße und Round-Trip-Zeit aus."""
+    coordinator_module = import_integration_module("coordinator")
+    loop = asyncio.get_running_loop()
+
+    with SimulatorThread(LambdaSimulator(replace(config, latency=rtt_ms / 1000.0))) as simulator:
+        coordinator = coordinator_module.LambdaHeatpumpCoordinator(
+            hass,
+            coordinator_module.ModbusConfig(host=simulator.host, port=simulator.port, slave_id=1),
+        )
+        coordinator.subscribe_values(
+            coordinator_module.ValueSpec(register=register.address, data_type=register.data_format, factor=register.factor)
+            for register in simulator.registers.values()
+        )
+        # Der Benchmark steuert die Zyklen selbst, keine nachgelagerte Abfrage
+        coordinator._subscription_debouncer.async_cancel()
+
+        def modbus_thread_time() -> "asyncio.Future[float]":
+            return loop.run_in_executor(coordinator.client._executor, time.thread_time)
+
+        monitor = LoopLagMonitor()
+        monitor.start()
+        wall: List[float] = []
+        cpu: List[float] = []
+        lag: List[float] = []
+        requests: List[int] = []
+        transferred: List[int] = []
+        try:
+            for cycle in range(WARMUP_CYCLES + cycles):
+                modbus_cpu = await modbus_thread_time()
+                simulator.stats.reset()
+                monitor.reset()
+                loop_cpu = time.thread_time()
+                started = time.perf_counter()
+
+                await coordinator._async_update_data()
+
+                elapsed = time.perf_counter() - started
+                loop_cpu = time.thread_time() - loop_cpu
+                modbus_cpu = await modbus_thread_time() - modbus_cpu
+                if cycle < WARMUP_CYCLES:
+                    continue
+                wall.append(elapsed * 1000)
+                cpu.append((loop_cpu + modbus_cpu) * 1000)
+                lag.append(monitor.max_lag * 1000)
+                requests.append(simulator.stats.requests)
+                transferred.append(simulator.stats.bytes_in + simulator.stats.bytes_out)
+        finally:
+            await monitor.stop()
+            await coordinator.async_shutdown()
+
+        result = {
+            "configuration": name,
+            "rtt_ms": rtt_ms,
+            "registers": len(simulator.registers),
+            "blocks": len(coordinator.read_plan),
+            "cycles": cycles,
+            "wall_ms": summarize(wall),
+            "cpu_ms": summarize(cpu),
+            "loop_lag_ms": summarize(lag),
+            "requests_per_cycle": round(sum(requests) / len(requests), 2),
+            "bytes_per_cycle": round(sum(transferred) / len(transferred), 1),
+            "handoff_ms_avg": round(coordinator.executor_stats.handoff_avg * 1000, 3),
+        }
+    _LOGGER.info(
+        "%s @ %s ms: %s blocks, p50 %.2f ms, cpu %.2f ms, lag max %.2f ms",
+        name, rtt_ms, result["blocks"], result["wall_ms"]["p50"], result["cpu_ms"]["p50"], result["loop_lag_ms"]["max"],
+    )
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=INTEGRATION_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(configurations: Sequence[str], rtts_ms: Sequence[float], cycles: int) -> Dict[str, Any]:
+    """Führe alle Szenarien aus und liefere das Ergebnis als JSON-fähiges Dict."""
+    from homeassistant.core import HomeAssistant
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results = []
+        for name in configurations:
+            for rtt_ms in rtts_ms:
+                results.append(await run_scenario(hass, name, CONFIGURATIONS[name], rtt_ms, cycles))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cycles": cycles,
+            "warmup_cycles": WARMUP_CYCLES,
+        },
+        "results": results,
+    }
+
+
+def _metric(result: Dict[str, Any], path: str) -> float:
+    value: Any = result
+    for key in path.split("."):
+        value = value[key]
+    return float(value)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> Tuple[List[str], int]:
+    """Vergleiche zwei Ergebnisse; liefert Tabellenzeilen und die Anzahl der Regressionen.
+
+    Zeitmessungen gelten erst ab threshold Prozent Verschlechterung als
+    Regression, Anfragen und Bytes sind deterministisch und werden exakt
+    verglichen.
+    """
+    baseline_results = {(r["configuration"], r["rtt_ms"]): r for r in baseline["results"]}
+    lines = [f"{'scenario':<20} {'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}"]
+    regressions = 0
+    for result in current["results"]:
+        key = (result["configuration"], result["rtt_ms"])
+        previous = baseline_results.get(key)
+        scenario = f"{key[0]}@{key[1]:g}ms"
+        if previous is None:
+            lines.append(f"{scenario:<20} (not in baseline)")
+            continue
+        for path, tolerant in COMPARED_METRICS:
+            old, new = _metric(previous, path), _metric(result, path)
+            change = (new - old) / old * 100 if old else 0.0
+            regressed = new > old * (1 + threshold / 100) if tolerant else new > old
+            regressions += regressed
+            marker = "  !" if regressed else ""
+            lines.append(f"{scenario:<20} {path:<20} {old:>12.3f} {new:>12.3f} {change:>+8.1f}%{marker}")
+    return lines, regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des Abfragezyklus gegen den Simulator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Benchmark ausführen")
+    run_parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    run_parser.add_argument(
+        "--configurations", default=",".join(CONFIGURATIONS),
+        help=f"Kommagetrennt, verfügbar: {', '.join(CONFIGURATIONS)}",
+    )
+    run_parser.add_argument(
+        "--rtt", default=",".join(str(rtt) for rtt in RTTS_MS), help="Round-Trip-Zeiten in ms, kommagetrennt",
+    )
+    run_parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+    run_parser.add_argument("--compare", metavar="BASELINE", help="Ergebnis direkt mit einer Baseline vergleichen")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="Toleranz für Zeitmessungen in Prozent")
+
+    compare_parser = subparsers.add_parser("compare", help="Zwei Ergebnisdateien vergleichen")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Toleranz für Zeitmessungen in Prozent")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Debug-Ausgaben des Koordinators würden die Messung verfälschen
+    logging.getLogger("lambda_heatpumps").setLevel(logging.WARNING)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.current, encoding="utf-8") as file:
+            current = json.load(file)
+    else:
+        configurations = [name for name in args.configurations.split(",") if name]
+        unknown = [name for name in configurations if name not in CONFIGURATIONS]
+        if unknown:
+            parser.error(f"Unbekannte Konfiguration: {', '.join(unknown)}")
+        rtts = [float(rtt) for rtt in args.rtt.split(",") if rtt]
+        current = asyncio.run(run_benchmark(configurations, rtts, args.cycles))
+        output = json.dumps(current, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            print(output)
+        if not args.compare:
+            return 0
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    lines, regressions = compare(baseline, current, args.threshold)
+    print("\n".join(lines))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
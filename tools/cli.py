@@ -0,0 +1,335 @@
+"""Kommandozeile für den Lambda-Controller ohne Home Assistant.
+
+Nutzt den Kern der Integration (core.LambdaClient) direkt und eignet sich
+damit zum Testen eines Controllers und zum Messen der Abfrage aus der Shell::
+
+    python -m tools.cli --host 192.168.1.50 poll
+    python -m tools.cli --host 192.168.1.50 --modules heatpump=2,heatingcircuit=3 watch --filter temp
+    python -m tools.cli --host 192.168.1.50 dump 1000 30
+    python -m tools.cli --host 192.168.1.50 write 5050 215 --read-back
+    python -m tools.cli --host 192.168.1.50 bench --cycles 50 --output bench.json
+    python -m tools.cli --host 192.168.1.50 scan --output profile.json
+    python -m tools.cli --host 192.168.1.50 --profile profile.json poll
+
+Die Register stammen aus const.SENSOR_CONFIG, expandiert auf die mit
+``--modules`` angegebene Anzahl je Modultyp (sonst die Standardanzahl).
+Mit ``--profile`` liest der Client nur die laut Registerprofil vorhandenen
+Adressen, jeweils mit dem passenden Funktionscode.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import import_integration_module
+from .benchmark import summarize
+
+DEFAULT_BENCH_CYCLES = 20
+WARMUP_CYCLES = 2
+
+
+def parse_modules(text: str) -> Dict[str, int]:
+    """Lies "heatpump=2,boiler=1" in ein Dict Modultyp -> Anzahl."""
+    const = import_integration_module("const")
+    counts = {}
+    for item in filter(None, text.split(",")):
+        module_type, _, count = item.partition("=")
+        if module_type not in const.MODULE_TYPES or not count.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Ungültige Modulangabe {item!r}, erwartet z. B. heatpump=2 ({', '.join(const.MODULE_TYPES)})"
+            )
+        counts[module_type] = int(count)
+    return counts
+
+
+def parse_word(text: str) -> int:
+    """Registerwert als Zahl (auch 0x...); negative Werte als int16."""
+    value = int(text, 0)
+    if not -0x8000 <= value <= 0xFFFF:
+        raise argparse.ArgumentTypeError(f"Wert außerhalb von 16 Bit: {text}")
+    return value & 0xFFFF
+
+
+def parse_scan_ranges(text: str) -> List[Any]:
+    try:
+        return import_integration_module("core").parse_ranges(text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"Ungültige Adressbereiche {text!r}, erwartet z. B. 0-199,1000-1299") from err
+
+
+def format_value(value: Any, unit: Optional[str]) -> str:
+    if value is None:
+        return "--"
+    if isinstance(value, float):
+        value = round(value, 3)
+    return f"{value} {unit}" if unit else str(value)
+
+
+def select_definitions(args: argparse.Namespace) -> List[Any]:
+    core = import_integration_module("core")
+    definitions = core.register_map(args.modules)
+    if args.filter:
+        definitions = [definition for definition in definitions if args.filter in definition.name]
+    return definitions
+
+
+async def poll_once(client) -> bool:
+    """Eine Abfrage; Fehler werden ausgegeben statt geworfen."""
+    core = import_integration_module("core")
+    try:
+        await client.async_poll()
+    except core.LambdaClientError as err:
+        print(f"Poll failed: {err}", file=sys.stderr)
+        return False
+    return True
+
+
+async def cmd_poll(client, args: argparse.Namespace) -> int:
+    definitions = select_definitions(args)
+    client.subscribe_values(definition.spec for definition in definitions)
+    if not await poll_once(client):
+        return 1
+    if args.json:
+        print(json.dumps({definition.name: client.values.get(definition.spec) for definition in definitions}, indent=2))
+        return 0
+    width = max((len(definition.name) for definition in definitions), default=0)
+    for definition in definitions:
+        value = client.values.get(definition.spec)
+        print(f"{definition.name:<{width}}  {definition.spec.register:>5}  {format_value(value, definition.unit)}")
+    return 0
+
+
+async def cmd_dump(client, args: argparse.Namespace) -> int:
+    client.subscribe_registers((address, "uint16") for address in range(args.address, args.address + args.count))
+    if not await poll_once(client):
+        return 1
+    words, unavailable = client.read_image(args.address, args.count, math.inf)
+    missing = set(unavailable)
+    for offset, word in enumerate(words):
+        address = args.address + offset
+        if address in missing:
+            print(f"{address:>5}  ------")
+        else:
+            signed = word - 0x10000 if word & 0x8000 else word
+            print(f"{address:>5}  0x{word:04X}  {word:>5}  {signed:>6}")
+    return 0
+
+
+async def cmd_watch(client, args: argparse.Namespace) -> int:
+    definitions = select_definitions(args)
+    client.subscribe_values(definition.spec for definition in definitions)
+    interval = args.interval if args.interval is not None else client.config.update_interval.total_seconds()
+    previous: Dict[Any, Any] = {}
+    cycle = 0
+    while not args.count or cycle < args.count:
+        started = time.monotonic()
+        if await poll_once(client):
+            stamp = datetime.now().strftime("%H:%M:%S")
+            for definition in definitions:
+                value = client.values.get(definition.spec)
+                if definition.spec not in previous or previous[definition.spec] != value:
+                    print(f"{stamp}  {definition.name}  {format_value(value, definition.unit)}")
+                previous[definition.spec] = value
+            sys.stdout.flush()
+        cycle += 1
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+    return 0
+
+
+async def cmd_write(client, args: argparse.Namespace) -> int:
+    core = import_integration_module("core")
+    try:
+        await client.async_write_registers(args.address, args.values)
+    except core.LambdaClientError as err:
+        print(f"Write failed: {err}", file=sys.stderr)
+        return 1
+    print(f"Wrote {len(args.values)} register(s) at {args.address}")
+    if args.read_back:
+        args.count = len(args.values)
+        return await cmd_dump(client, args)
+    return 0
+
+
+async def cmd_bench(client, args: argparse.Namespace) -> int:
+    definitions = select_definitions(args)
+    client.subscribe_values(definition.spec for definition in definitions)
+    loop = asyncio.get_running_loop()
+    wall: List[float] = []
+    cpu: List[float] = []
+    requests: List[int] = []
+    transferred: List[int] = []
+    failures = 0
+    for cycle in range(WARMUP_CYCLES + args.cycles):
+        modbus_cpu = await loop.run_in_executor(client._executor, time.thread_time)
+        loop_cpu = time.thread_time()
+        ok = await poll_once(client)
+        loop_cpu = time.thread_time() - loop_cpu
+        modbus_cpu = await loop.run_in_executor(client._executor, time.thread_time) - modbus_cpu
+        if cycle >= WARMUP_CYCLES:
+            metrics = client.last_cycle
+            failures += not ok
+            wall.append(metrics.duration * 1000)
+            cpu.append((loop_cpu + modbus_cpu) * 1000)
+            requests.append(metrics.requests)
+            transferred.append(metrics.bytes_total)
+        if args.interval:
+            await asyncio.sleep(args.interval)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": f"{client.config.host}:{client.config.port}",
+            "cycles": args.cycles,
+            "warmup_cycles": WARMUP_CYCLES,
+            "max_register_chunk_size": client.config.max_register_chunk_size,
+        },
+        "registers": len(client.planner.registers),
+        "blocks": len(client.read_plan),
+        "failed_cycles": failures,
+        "wall_ms": summarize(wall),
+        "cpu_ms": summarize(cpu),
+        "requests_per_cycle": round(sum(requests) / len(requests), 2),
+        "bytes_per_cycle": round(sum(transferred) / len(transferred), 1),
+        "handoff_ms_avg": round(client.executor_stats.handoff_avg * 1000, 3),
+        "errors": dict(client.transport.errors),
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 1 if failures else 0
+
+
+async def cmd_scan(client, args: argparse.Namespace) -> int:
+    core = import_integration_module("core")
+    scanner = core.RegisterScanner(client, max_block=args.block, skip_absent_modules=not args.full)
+    try:
+        profile = await scanner.async_scan(args.ranges)
+    except core.LambdaClientError as err:
+        print(f"Scan failed: {err}", file=sys.stderr)
+        return 1
+    for function_code, ranges in sorted(profile.ranges.items()):
+        print(f"FC {function_code}: " + ", ".join(f"{start}-{end - 1}" for start, end in ranges))
+    print(
+        f"{sum(profile.served_addresses(function_code) for function_code in profile.ranges)} addresses, "
+        f"{profile.requests} requests in {profile.duration:.2f} s"
+    )
+    if args.output:
+        profile.save(args.output)
+        print(f"Profile written to {args.output}")
+    return 0
+
+
+COMMANDS = {
+    "poll": cmd_poll,
+    "dump": cmd_dump,
+    "watch": cmd_watch,
+    "write": cmd_write,
+    "bench": cmd_bench,
+    "scan": cmd_scan,
+}
+
+
+async def run(config, args: argparse.Namespace, profile=None) -> int:
+    client = import_integration_module("core").LambdaClient(config)
+    client.apply_profile(profile)
+    try:
+        return await COMMANDS[args.command](client, args)
+    finally:
+        await client.async_close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lambda-Controller ohne Home Assistant abfragen")
+    parser.add_argument("--host", required=True, help="Adresse des Lambda-Controllers")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--slave-id", type=int, default=1)
+    parser.add_argument("--timeout", type=int, default=5, help="connection_timeout in Sekunden")
+    parser.add_argument("--chunk-size", type=int, default=50, help="max_register_chunk_size des Read-Plans")
+    parser.add_argument(
+        "--modules", type=parse_modules, default={},
+        help="Anzahl je Modultyp, z. B. heatpump=2,boiler=1,heatingcircuit=3",
+    )
+    parser.add_argument("--profile", help="Registerprofil aus scan --output verwenden")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Debug-Ausgaben der Integration")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    poll_parser = subparsers.add_parser("poll", help="Alle Werte einmal lesen")
+    poll_parser.add_argument("--filter", help="Nur Werte, deren Name diesen Text enthält")
+    poll_parser.add_argument("--json", action="store_true", help="Ausgabe als JSON")
+
+    dump_parser = subparsers.add_parser("dump", help="Rohwerte eines Adressbereichs lesen")
+    dump_parser.add_argument("address", type=int)
+    dump_parser.add_argument("count", type=int)
+
+    watch_parser = subparsers.add_parser("watch", help="Zyklisch lesen und Änderungen ausgeben")
+    watch_parser.add_argument("--filter", help="Nur Werte, deren Name diesen Text enthält")
+    watch_parser.add_argument("--interval", type=float, help="Abfrageintervall in Sekunden (Standard 10)")
+    watch_parser.add_argument("--count", type=int, default=0, help="Anzahl der Zyklen, 0 = bis Strg+C")
+
+    write_parser = subparsers.add_parser("write", help="Register schreiben (FC 16)")
+    write_parser.add_argument("address", type=int)
+    write_parser.add_argument("values", type=parse_word, nargs="+", help="16-Bit-Werte, negative als int16")
+    write_parser.add_argument("--read-back", action="store_true", help="Register danach erneut lesen")
+
+    bench_parser = subparsers.add_parser("bench", help="Abfragezyklen messen")
+    bench_parser.add_argument("--filter", help="Nur Werte, deren Name diesen Text enthält")
+    bench_parser.add_argument("--cycles", type=int, default=DEFAULT_BENCH_CYCLES)
+    bench_parser.add_argument("--interval", type=float, default=0.0, help="Pause zwischen den Zyklen in Sekunden")
+    bench_parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+
+    scan_parser = subparsers.add_parser("scan", help="Vorhandene Adressen ermitteln (Registerprofil)")
+    scan_parser.add_argument(
+        "--ranges", type=parse_scan_ranges,
+        help="Adressbereiche, z. B. 0-199,1000-1299 (Standard: alle Modulfenster)",
+    )
+    scan_parser.add_argument("--full", action="store_true", help="Auch Fenster ohne Antwort an der ersten Adresse scannen")
+    scan_parser.add_argument("--block", type=int, default=125, help="Maximale Registeranzahl je Anfrage")
+    scan_parser.add_argument("--output", help="Profil als JSON in diese Datei schreiben")
+
+    args = parser.parse_args(argv)
+    if args.command == "bench" and args.cycles < 1:
+        parser.error("--cycles muss mindestens 1 sein")
+    if args.command == "scan" and not 1 <= args.block <= 125:
+        parser.error("--block muss zwischen 1 und 125 liegen")
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    if args.verbose:
+        logging.getLogger("lambda_heatpumps").setLevel(logging.DEBUG)
+
+    core = import_integration_module("core")
+    config = core.ModbusConfig(
+        host=args.host,
+        port=args.port,
+        slave_id=args.slave_id,
+        connection_timeout=args.timeout,
+        max_register_chunk_size=args.chunk_size,
+    )
+    try:
+        config.validate()
+    except ValueError as err:
+        parser.error(str(err))
+
+    profile = None
+    if args.profile and args.command != "scan":
+        try:
+            profile = core.RegisterProfile.load(args.profile)
+        except (OSError, ValueError) as err:
+            parser.error(f"Registerprofil {args.profile}: {err}")
+
+    try:
+        return asyncio.run(run(config, args, profile))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
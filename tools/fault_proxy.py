@@ -0,0 +1,343 @@
+"""TCP-Proxy mit Fehlerinjektion zwischen Koordinator und Lambda-Controller.
+
+Der Proxy leitet den Modbus-TCP-Verkehr unverändert weiter und kann dabei
+gezielt Fehler einspeisen:
+
+- ``latency``: Verzögerung jeder Antwort nach einer Verteilung
+  (konstant, gleichverteilt, normalverteilt, exponentiell)
+- ``stall``: Antworten werden zurückgehalten und erst nach Ende der
+  Störung (verspätet) ausgeliefert
+- ``reset``: bestehende Verbindungen werden per RST abgebrochen, neue
+  Verbindungen sofort wieder geschlossen
+- ``half_open``: Verbindungen bleiben offen, der Verkehr verschwindet aber
+  in beide Richtungen; nach Ende der Störung sind diese Verbindungen tot
+  und werden abgebrochen (wie nach einem Neustart des Controllers)
+- ``slow_drip``: Antworten werden byteweise mit Pause ausgeliefert
+
+Für manuelle Tests mit Home Assistant::
+
+    python -m tools.simulator --port 5020
+    python -m tools.fault_proxy --upstream 127.0.0.1:5020 --port 5021 --latency 0.05 --distribution normal
+
+Die Störungen lassen sich interaktiv per Eingabe (``stall``, ``reset``,
+``half_open``, ``slow_drip``, ``none``) umschalten.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+_LOGGER = logging.getLogger(__name__)
+
+FAULT_NONE = "none"
+FAULT_STALL = "stall"
+FAULT_RESET = "reset"
+FAULT_HALF_OPEN = "half_open"
+FAULT_SLOW_DRIP = "slow_drip"
+FAULTS = (FAULT_NONE, FAULT_STALL, FAULT_RESET, FAULT_HALF_OPEN, FAULT_SLOW_DRIP)
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "exponential")
+
+READ_CHUNK = 4096
+
+
+@dataclass
+class LatencyProfile:
+    """Verteilung der zusätzlichen Antwortlatenz in Sekunden.
+
+    latency ist der Mittelwert, spread die Breite (uniform: ±spread,
+    normal: Standardabweichung); exponential nutzt nur den Mittelwert.
+    """
+    latency: float = 0.0
+    spread: float = 0.0
+    distribution: str = "constant"
+
+    def __post_init__(self) -> None:
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            value = rng.uniform(self.latency - self.spread, self.latency + self.spread)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.latency, self.spread)
+        elif self.distribution == "exponential":
+            value = rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        else:
+            value = self.latency
+        return max(0.0, value)
+
+
+@dataclass
+class ProxyStatistics:
+    """Zähler des Proxys."""
+    connections: int = 0
+    resets: int = 0
+    bytes_up: int = 0
+    bytes_down: int = 0
+    dropped_bytes: int = 0
+
+
+class _Connection:
+    """Eine weitergeleitete Verbindung: Client-Seite und Controller-Seite."""
+
+    def __init__(self, client: asyncio.StreamWriter, upstream: asyncio.StreamWriter):
+        self.client = client
+        self.upstream = upstream
+        self.half_open = False
+        self.tasks: Set[asyncio.Task] = set()
+
+    def abort(self) -> None:
+        """Beide Seiten sofort mit RST schließen."""
+        for writer in (self.client, self.upstream):
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                except OSError:
+                    pass
+            writer.transport.abort()
+        for task in self.tasks:
+            task.cancel()
+
+
+class FaultProxy:
+    """asyncio-TCP-Proxy mit umschaltbaren Störungen.
+
+    set_fault() und set_latency() dürfen aus jedem Thread aufgerufen werden,
+    die Änderung wird im Event-Loop des Proxys ausgeführt.
+    """
+
+    def __init__(
+        self,
+        upstream_host: str,
+        upstream_port: int,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyProfile] = None,
+        drip_interval: float = 0.2,
+        seed: int = 0,
+    ):
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.host = host
+        self.port = port
+        self.latency = latency or LatencyProfile()
+        self.drip_interval = drip_interval
+        self.fault = FAULT_NONE
+        self.stats = ProxyStatistics()
+        self._rng = random.Random(seed)
+        self._connections: Dict[asyncio.StreamWriter, _Connection] = {}
+        self._released = asyncio.Event()
+        self._released.set()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # Steuerung
+
+    def set_fault(self, fault: str) -> None:
+        """Aktiviere eine Störung (FAULT_NONE beendet die aktuelle)."""
+        if fault not in FAULTS:
+            raise ValueError(f"Unknown fault: {fault}")
+        self._call_in_loop(self._apply_fault, fault)
+
+    def clear_fault(self) -> None:
+        self.set_fault(FAULT_NONE)
+
+    def set_latency(self, latency: LatencyProfile) -> None:
+        self._call_in_loop(setattr, self, "latency", latency)
+
+    def _call_in_loop(self, func, *args) -> None:
+        if self._loop is None or self._is_loop_thread():
+            func(*args)
+            return
+        done = threading.Event()
+
+        def run() -> None:
+            try:
+                func(*args)
+            finally:
+                done.set()
+
+        self._loop.call_soon_threadsafe(run)
+        done.wait(timeout=10)
+
+    def _is_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _apply_fault(self, fault: str) -> None:
+        previous, self.fault = self.fault, fault
+        _LOGGER.info("Fault: %s -> %s", previous, fault)
+        if fault == FAULT_STALL:
+            self._released.clear()
+        else:
+            self._released.set()
+        if fault == FAULT_RESET:
+            for connection in list(self._connections.values()):
+                self.stats.resets += 1
+                connection.abort()
+            self._connections.clear()
+        elif fault == FAULT_HALF_OPEN:
+            for connection in self._connections.values():
+                connection.half_open = True
+        elif previous == FAULT_HALF_OPEN:
+            # Die Gegenstelle kennt diese Verbindungen nicht mehr
+            for writer, connection in list(self._connections.items()):
+                if connection.half_open:
+                    self.stats.resets += 1
+                    connection.abort()
+                    del self._connections[writer]
+
+    # Server
+
+    async def start(self) -> None:
+        """Starte den Proxy; bei port=0 wird ein freier Port gewählt."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.info(
+            "Fault proxy listening on %s:%d -> %s:%d",
+            self.host, self.port, self.upstream_host, self.upstream_port,
+        )
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            tasks = [task for connection in self._connections.values() for task in connection.tasks]
+            for connection in self._connections.values():
+                connection.abort()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.clear()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        if self.fault == FAULT_RESET:
+            self.stats.resets += 1
+            _Connection(writer, writer).abort()
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(self.upstream_host, self.upstream_port)
+        except OSError as err:
+            _LOGGER.warning("Upstream connection failed: %s", err)
+            writer.close()
+            return
+
+        connection = _Connection(writer, upstream_writer)
+        connection.half_open = self.fault == FAULT_HALF_OPEN
+        self._connections[writer] = connection
+        connection.tasks = {
+            asyncio.current_task(),
+            asyncio.get_running_loop().create_task(self._pump_down(connection, upstream_reader)),
+        }
+        try:
+            await self._pump_up(connection, reader)
+        finally:
+            self._connections.pop(writer, None)
+            for task in connection.tasks - {asyncio.current_task()}:
+                task.cancel()
+            upstream_writer.close()
+            writer.close()
+
+    async def _pump_up(self, connection: _Connection, reader: asyncio.StreamReader) -> None:
+        """Client -> Controller."""
+        try:
+            while data := await reader.read(READ_CHUNK):
+                if connection.half_open:
+                    self.stats.dropped_bytes += len(data)
+                    continue
+                self.stats.bytes_up += len(data)
+                connection.upstream.write(data)
+                await connection.upstream.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    async def _pump_down(self, connection: _Connection, reader: asyncio.StreamReader) -> None:
+        """Controller -> Client, mit Latenz, Stall und Slow-Drip."""
+        try:
+            while data := await reader.read(READ_CHUNK):
+                delay = self.latency.sample(self._rng)
+                if delay:
+                    await asyncio.sleep(delay)
+                await self._released.wait()
+                if connection.half_open:
+                    self.stats.dropped_bytes += len(data)
+                    continue
+                self.stats.bytes_down += len(data)
+                if self.fault == FAULT_SLOW_DRIP:
+                    for index in range(len(data)):
+                        connection.client.write(data[index:index + 1])
+                        await connection.client.drain()
+                        await asyncio.sleep(self.drip_interval)
+                else:
+                    connection.client.write(data)
+                    await connection.client.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+def parse_address(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def _interactive(proxy: FaultProxy) -> None:
+    await proxy.start()
+    loop = asyncio.get_running_loop()
+    print(f"Faults: {', '.join(FAULTS)}", flush=True)
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        try:
+            proxy.set_fault(line.strip() or FAULT_NONE)
+        except ValueError as err:
+            print(err, flush=True)
+    await proxy.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TCP-Proxy mit Fehlerinjektion für Modbus TCP")
+    parser.add_argument("--upstream", required=True, help="host:port des Controllers bzw. Simulators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5021)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mittlere Zusatzlatenz in Sekunden")
+    parser.add_argument("--spread", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="constant")
+    parser.add_argument("--drip-interval", type=float, default=0.2, help="Pause pro Byte bei slow_drip")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    upstream_host, upstream_port = parse_address(args.upstream)
+    proxy = FaultProxy(
+        upstream_host, upstream_port, args.host, args.port,
+        latency=LatencyProfile(args.latency, args.spread, args.distribution),
+        drip_interval=args.drip_interval,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_interactive(proxy))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""pytest-Plugin mit dem simulierten Lambda-Controller als Fixture.
+
+Aktivierung mit ``pytest -p tools.pytest_plugin`` oder per
+``pytest_plugins = ["tools.pytest_plugin"]`` in einer conftest.py.
+Die Modulanzahlen und die Latenz lassen sich pro Test über
+``@pytest.mark.lambda_simulator(heatpumps=2, latency=0.005)`` festlegen.
+"""
+from __future__ import annotations
+
+import pytest
+
+from .simulator import LambdaSimulator, SimulatorConfig, SimulatorThread
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "lambda_simulator(**kwargs): SimulatorConfig-Werte für die Fixture lambda_simulator",
+    )
+
+
+@pytest.fixture
+def lambda_simulator(request: pytest.FixtureRequest):
+    """Laufender Simulator auf 127.0.0.1 mit freiem Port (simulator.host/.port)."""
+    marker = request.node.get_closest_marker("lambda_simulator")
+    config = SimulatorConfig(**(marker.kwargs if marker else {}))
+    with SimulatorThread(LambdaSimulator(config)) as simulator:
+        yield simulator
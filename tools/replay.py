@@ -0,0 +1,153 @@
+"""Wiedergabe eines Modbus-Mitschnitts durch den Koordinator.
+
+Ein mit dem Service lambda_heatpumps.start_capture aufgezeichneter
+Mitschnitt wird über capture.ReplayClient in einen LambdaHeatpumpCoordinator
+gespeist. Abonniert werden alle Werte aus const.SENSOR_CONFIG, deren
+Register im Mitschnitt vorkommen; für jeden Wert wird ein Listener wie von
+einer Entität registriert.
+
+Mit ``--speed 0`` (Standard) läuft die Wiedergabe deterministisch und ohne
+Wartezeit, jeder Zyklus entspricht einem mitgeschnittenen Zyklus. Die
+Ausgabe (``--output``, JSON Lines mit den geänderten Werten pro Zyklus)
+lässt sich daher zwischen zwei Ständen des Dekoders direkt vergleichen::
+
+    python -m tools.replay capture.lmbc --output before.jsonl
+    python -m tools.replay capture.lmbc --speed 10 --interval 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import import_integration_module
+from .benchmark import summarize
+from .simulator import MODULE_BASES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Höchste Modulanzahl pro Typ, nach der im Mitschnitt gesucht wird
+MAX_MODULES = 16
+
+
+def value_specs_for(frames: Sequence[Any]) -> List[Any]:
+    """ValueSpecs für alle Werte aus SENSOR_CONFIG, die der Mitschnitt vollständig enthält."""
+    const = import_integration_module("const")
+    core = import_integration_module("core")
+    covered = set()
+    for frame in frames:
+        if frame.ok:
+            covered.update(range(frame.address, frame.address + len(frame.words)))
+
+    specs = []
+    seen = set()
+    for entry in const.SENSOR_CONFIG:
+        bereich = entry["bereich"]
+        module_type = bereich if bereich in MODULE_BASES else bereich.rsplit("_", 1)[0]
+        base = MODULE_BASES[module_type]
+        data_type = entry.get("data_format", "int16")
+        width = core.REGISTER_WIDTHS.get(data_type, 1)
+        for index in range(MAX_MODULES):
+            address = entry["register"] + index * core.MODULE_SEGMENT_SIZE
+            if address - base >= MAX_MODULES * core.MODULE_SEGMENT_SIZE:
+                break
+            # SENSOR_CONFIG führt manche Register mehrfach, der erste Eintrag gilt
+            if address not in seen and all(address + word in covered for word in range(width)):
+                seen.add(address)
+                specs.append(core.ValueSpec(
+                    register=address, data_type=data_type, factor=entry.get("factor", 1) or 1,
+                ))
+    return specs
+
+
+async def replay(path: str, speed: float, interval: float, output: Optional[str]) -> Dict[str, Any]:
+    """Spiele den Mitschnitt ab und liefere eine Zusammenfassung."""
+    from homeassistant.core import HomeAssistant
+
+    capture = import_integration_module("capture")
+    coordinator_module = import_integration_module("coordinator")
+    frames = list(capture.read_capture(path))
+    client = capture.ReplayClient(frames, speed=speed)
+    specs = value_specs_for(frames)
+
+    cycle_times: List[float] = []
+    notifications = 0
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as config_dir, open(output or os.devnull, "w", encoding="utf-8") as out:
+        hass = HomeAssistant(config_dir)
+        coordinator = coordinator_module.LambdaHeatpumpCoordinator(
+            hass,
+            coordinator_module.ModbusConfig(host="replay", port=502, slave_id=1),
+            client_factory=lambda: client,
+        )
+        # Die Zyklen werden hier gesteuert, nicht vom Intervall des Koordinators
+        coordinator.update_interval = None
+        coordinator.subscribe_values(specs)
+        coordinator._subscription_debouncer.async_cancel()
+
+        changes: Dict[int, Any] = {}
+
+        def make_listener(spec):
+            def listener() -> None:
+                nonlocal notifications
+                notifications += 1
+                changes[spec.register] = coordinator.values.get(spec)
+            return listener
+
+        for spec in specs:
+            coordinator.async_add_listener(make_listener(spec), frozenset((spec,)))
+
+        try:
+            cycle = 0
+            while not client.exhausted:
+                changes.clear()
+                started = time.perf_counter()
+                await coordinator.async_refresh()
+                elapsed = time.perf_counter() - started
+                if not coordinator.last_update_success:
+                    if client.exhausted:
+                        break
+                    failures += 1
+                cycle_times.append(elapsed * 1000)
+                out.write(json.dumps({"cycle": cycle, "changes": {str(k): v for k, v in sorted(changes.items())}}) + "\n")
+                cycle += 1
+                if speed > 0:
+                    await asyncio.sleep(max(0.0, interval / speed - elapsed))
+        finally:
+            await coordinator.async_shutdown()
+
+    return {
+        "frames": len(frames),
+        "values": len(specs),
+        "cycles": len(cycle_times),
+        "failed_cycles": failures,
+        "notifications": notifications,
+        "cycle_ms": summarize(cycle_times),
+        "writes_ignored": len(client.writes),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Modbus-Mitschnitt durch den Koordinator abspielen")
+    parser.add_argument("capture", help="Mitschnittdatei (.lmbc)")
+    parser.add_argument("--speed", type=float, default=0.0, help="0 = deterministisch ohne Wartezeit, 1 = Echtzeit, 10 = zehnfach")
+    parser.add_argument("--interval", type=float, default=10.0, help="Abfrageintervall der Aufzeichnung in Sekunden")
+    parser.add_argument("--output", help="Geänderte Werte pro Zyklus als JSON Lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lambda_heatpumps").setLevel(logging.WARNING)
+    summary = asyncio.run(replay(args.capture, args.speed, args.interval, args.output))
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""Szenarien zur Ausfallsicherheit des Koordinators.
+
+Jedes Szenario betreibt einen LambdaHeatpumpCoordinator über den
+FaultProxy gegen den Simulator, fragt im eingestellten Intervall ab und
+speist nach einer Einschwingphase eine Störung für eine feste Dauer ein.
+Gemessen werden:
+
+- time_to_detect: Zeit vom Beginn der Störung bis zum Ende des ersten
+  fehlerhaften Zyklus (fehlgeschlagen oder mit fehlenden Werten)
+- time_to_recover: Zeit vom Ende der Störung bis zum Ende des ersten
+  wieder vollständigen Zyklus
+- max_staleness: größtes Alter des ältesten Registerwerts
+- longest_cycle: längster Zyklus (so lange ist der Modbus-Thread belegt)
+
+Die Grenzwerte sind Vielfache des Abfrageintervalls und des
+Verbindungs-Timeouts, damit die Suite auch mit anderen Einstellungen für
+retry_on_failure, _ensure_client und connection_timeout aussagekräftig
+bleibt::
+
+    python -m tools.resilience
+    python -m tools.resilience --scenarios stall,reset --connection-timeout 2 --output resilience.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import import_integration_module
+from .fault_proxy import (
+    FAULT_HALF_OPEN,
+    FAULT_NONE,
+    FAULT_RESET,
+    FAULT_SLOW_DRIP,
+    FAULT_STALL,
+    FaultProxy,
+    LatencyProfile,
+)
+from .simulator import LambdaSimulator, SimulatorConfig, SimulatorThread
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 2.0
+WARMUP_CYCLES = 3
+# Abtastintervall für das Alter der Werte (Sekunden)
+SAMPLE_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Grenzwert als Vielfaches von Abfrageintervall und Verbindungs-Timeout."""
+    intervals: float = 0.0
+    timeouts: float = 0.0
+    seconds: float = 0.0
+
+    def resolve(self, interval: float, timeout: float) -> float:
+        return self.intervals * interval + self.timeouts * timeout + self.seconds
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Eine Störung mit Dauer und Grenzwerten."""
+    name: str
+    fault: str
+    duration: float
+    description: str
+    latency: Optional[LatencyProfile] = None
+    # None: die Störung darf nicht als Fehler sichtbar werden
+    detect_limit: Optional[Limit] = None
+    recover_limit: Limit = Limit(intervals=2)
+    # Zusätzlich zur Dauer der Störung erlaubtes Alter der Werte
+    staleness_limit: Limit = Limit(intervals=2)
+
+
+# Eine Anfrage ohne Antwort wiederholt pymodbus bis zu dreimal (retries=3) mit
+# jeweils connection_timeout; danach bricht der Client den Zyklus ab, ohne
+# weitere Blöcke anzufragen. Eine hängende Verbindung wird daher spätestens
+# nach drei Timeouts im laufenden Zyklus erkannt.
+HUNG_REQUEST = Limit(intervals=1, timeouts=3)
+
+SCENARIOS: Tuple[Scenario, ...] = (
+    Scenario(
+        "latency", FAULT_NONE, 10.0,
+        "Normalverteilte Zusatzlatenz 50 ± 20 ms pro Antwort",
+        latency=LatencyProfile(0.05, 0.02, "normal"),
+    ),
+    Scenario(
+        "stall", FAULT_STALL, 10.0,
+        "Antworten werden zurückgehalten und verspätet zugestellt",
+        detect_limit=HUNG_REQUEST,
+        recover_limit=Limit(intervals=2, timeouts=2),
+        staleness_limit=Limit(intervals=2, timeouts=3),
+    ),
+    Scenario(
+        "reset", FAULT_RESET, 5.0,
+        "Verbindungen werden per RST abgebrochen und neue sofort geschlossen",
+        detect_limit=Limit(intervals=1, seconds=1),
+        recover_limit=Limit(intervals=2, seconds=3),
+        staleness_limit=Limit(intervals=2, seconds=3),
+    ),
+    Scenario(
+        "half_open", FAULT_HALF_OPEN, 10.0,
+        "Verbindung bleibt offen, der Verkehr verschwindet in beide Richtungen",
+        detect_limit=HUNG_REQUEST,
+        recover_limit=Limit(intervals=2, timeouts=2),
+        staleness_limit=Limit(intervals=2, timeouts=3),
+    ),
+    Scenario(
+        "slow_drip", FAULT_SLOW_DRIP, 10.0,
+        "Antworten werden byteweise mit 200 ms Pause zugestellt",
+        detect_limit=HUNG_REQUEST,
+        recover_limit=Limit(intervals=2, timeouts=2),
+        staleness_limit=Limit(intervals=2, timeouts=3),
+    ),
+)
+
+
+@dataclass
+class Cycle:
+    start: float
+    end: float
+    healthy: bool
+
+
+async def run_scenario(hass, scenario: Scenario, interval: float, timeout: int) -> Dict[str, Any]:
+    """Führe ein Szenario aus und bewerte es gegen seine Grenzwerte."""
+    coordinator_module = import_integration_module("coordinator")
+    loop = asyncio.get_running_loop()
+
+    with SimulatorThread(LambdaSimulator(SimulatorConfig())) as simulator, \
+            SimulatorThread(FaultProxy(simulator.host, simulator.port)) as proxy:
+        coordinator = coordinator_module.LambdaHeatpumpCoordinator(
+            hass,
+            coordinator_module.ModbusConfig(
+                host=proxy.host,
+                port=proxy.port,
+                slave_id=1,
+                connection_timeout=timeout,
+                update_interval=timedelta(seconds=interval),
+            ),
+        )
+        coordinator.subscribe_values(
+            coordinator_module.ValueSpec(register=register.address, data_type=register.data_format, factor=register.factor)
+            for register in simulator.registers.values()
+        )
+        coordinator._subscription_debouncer.async_cancel()
+
+        cycles: List[Cycle] = []
+        staleness: List[Tuple[float, float]] = []
+
+        async def poll() -> None:
+            # Wie der DataUpdateCoordinator: nächster Zyklus ein Intervall nach dem Ende des vorigen
+            while True:
+                start = time.monotonic()
+                await coordinator.async_refresh()
+                healthy = coordinator.last_update_success and None not in coordinator.client.decoded.values()
+                cycles.append(Cycle(start, time.monotonic(), healthy))
+                await asyncio.sleep(interval)
+
+        async def sample() -> None:
+            while True:
+                await asyncio.sleep(SAMPLE_INTERVAL)
+                if coordinator.client._image_timestamps:
+                    now = time.monotonic()
+                    staleness.append((now, now - min(coordinator.client._image_timestamps.values())))
+
+        tasks = [loop.create_task(poll()), loop.create_task(sample())]
+        try:
+            while sum(cycle.healthy for cycle in cycles) < WARMUP_CYCLES:
+                await asyncio.sleep(SAMPLE_INTERVAL)
+
+            fault_start = time.monotonic()
+            if scenario.latency:
+                await loop.run_in_executor(None, proxy.set_latency, scenario.latency)
+            await loop.run_in_executor(None, proxy.set_fault, scenario.fault)
+            await asyncio.sleep(scenario.duration)
+            fault_end = time.monotonic()
+            await loop.run_in_executor(None, proxy.set_latency, LatencyProfile())
+            await loop.run_in_executor(None, proxy.clear_fault)
+
+            recover_limit = scenario.recover_limit.resolve(interval, timeout)
+            deadline = fault_end + 2 * recover_limit + interval
+            while time.monotonic() < deadline and not any(
+                cycle.healthy and cycle.end > fault_end for cycle in cycles
+            ):
+                await asyncio.sleep(SAMPLE_INTERVAL)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await coordinator.async_shutdown()
+
+        proxy_resets = proxy.stats.resets
+
+    detected = next((c for c in cycles if not c.healthy and c.end >= fault_start), None)
+    recovered = next((c for c in cycles if c.healthy and c.end > fault_end), None)
+    during = [c for c in cycles if c.end >= fault_start]
+    result: Dict[str, Any] = {
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "duration": scenario.duration,
+        "time_to_detect": round(detected.end - fault_start, 3) if detected else None,
+        "time_to_recover": round(recovered.end - fault_end, 3) if recovered else None,
+        "max_staleness": round(max((age for at, age in staleness if at >= fault_start), default=0.0), 3),
+        "longest_cycle": round(max((c.end - c.start for c in during), default=0.0), 3),
+        "failed_cycles": sum(not c.healthy for c in during),
+        "proxy_resets": proxy_resets,
+    }
+
+    failures = []
+    if scenario.detect_limit is None:
+        if detected:
+            failures.append("fault became visible")
+    else:
+        limit = scenario.detect_limit.resolve(interval, timeout)
+        if detected is None:
+            failures.append("fault not detected")
+        elif result["time_to_detect"] > limit:
+            failures.append(f"time_to_detect > {limit:g}s")
+    limit = scenario.recover_limit.resolve(interval, timeout)
+    if recovered is None:
+        failures.append("not recovered")
+    elif result["time_to_recover"] > limit:
+        failures.append(f"time_to_recover > {limit:g}s")
+    limit = scenario.staleness_limit.resolve(interval, timeout)
+    if scenario.detect_limit is not None:
+        limit += scenario.duration
+    if result["max_staleness"] > limit:
+        failures.append(f"max_staleness > {limit:g}s")
+    result["passed"] = not failures
+    result["failures"] = failures
+
+    _LOGGER.info(
+        "%-10s %s  detect %s  recover %s  staleness %.1fs  %s",
+        scenario.name, "PASS" if not failures else "FAIL",
+        result["time_to_detect"], result["time_to_recover"], result["max_staleness"], ", ".join(failures),
+    )
+    return result
+
+
+async def run_suite(scenarios: Sequence[Scenario], interval: float, timeout: int) -> Dict[str, Any]:
+    from homeassistant.core import HomeAssistant
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results = [await run_scenario(hass, scenario, interval, timeout) for scenario in scenarios]
+    return {"interval": interval, "connection_timeout": timeout, "results": results}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    coordinator_module = import_integration_module("coordinator")
+    by_name = {scenario.name: scenario for scenario in SCENARIOS}
+
+    parser = argparse.ArgumentParser(description="Ausfallszenarien über den FaultProxy")
+    parser.add_argument("--scenarios", default=",".join(by_name), help=f"Kommagetrennt, verfügbar: {', '.join(by_name)}")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Abfrageintervall in Sekunden")
+    parser.add_argument(
+        "--connection-timeout", type=int, default=coordinator_module.ModbusConfig.connection_timeout,
+        help="connection_timeout der ModbusConfig in Sekunden",
+    )
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        parser.error(f"Unbekanntes Szenario: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name in ("lambda_heatpumps", "tools.simulator", "tools.fault_proxy", "pymodbus", "pymodbus.logging"):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    summary = asyncio.run(run_suite([by_name[name] for name in names], args.interval, args.connection_timeout))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+            file.write("\n")
+    return 0 if all(result["passed"] for result in summary["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
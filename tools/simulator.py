@@ -0,0 +1,468 @@
+"""Lokaler Simulator eines Lambda-Controllers mit vollständiger Register-Map.
+
+Der Simulator baut die Register-Map aus ``const.SENSOR_CONFIG`` und dem
+Modul-Layout des Controllers auf:
+
+- General Ambient 0-4, E-Manager 100-104
+- Wärmepumpen ab 1000, Boiler ab 2000, Puffer ab 3000, Solar ab 4000,
+  Heizkreise ab 5000 (jedes weitere Modul +100)
+
+Er liefert plausible, zeitlich veränderliche Werte (inklusive Rauschen in der
+letzten Stelle), nimmt Schreibzugriffe auf Sollwert-Register (Offset >= 50 im
+Modul) an und antwortet auf fehlende Register mit "Illegal Data Address".
+Pro Anfrage kann eine Latenz simuliert werden.
+
+Start als eigener Prozess::
+
+    python -m tools.simulator --port 5020 --heatpumps 2 --boilers 1 --latency 0.005
+
+In pytest steht er über das Plugin ``tools.pytest_plugin`` als Fixture
+``lambda_simulator`` zur Verfügung.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import import_integration_module
+
+_LOGGER = logging.getLogger(__name__)
+
+# Modbus-Funktionscodes
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+# Modbus-Exception-Codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+
+# Erstes Register je Modultyp; weitere Module liegen jeweils 100 Register höher
+MODULE_BASES = {
+    "general_ambient": 0,
+    "e_manager": 100,
+    "heatpump": 1000,
+    "boiler": 2000,
+    "buffer": 3000,
+    "solar": 4000,
+    "heatingcircuit": 5000,
+}
+
+# Offset innerhalb eines Moduls, ab dem Register beschreibbar sind (Sollwerte)
+WRITABLE_OFFSET = 50
+
+# Typische Werte (Mittelwert, Amplitude) für Temperaturen nach Namensbestandteil
+TEMPERATURE_PROFILES = (
+    ("ambient", 5.0, 3.0),
+    ("flow_line", 35.0, 3.0),
+    ("flowline", 35.0, 3.0),
+    ("return", 30.0, 3.0),
+    ("source_inlet", 8.0, 1.5),
+    ("source_outlet", 5.0, 1.5),
+    ("boiler", 48.0, 4.0),
+    ("buffer", 40.0, 4.0),
+    ("collector", 45.0, 15.0),
+    ("room", 21.0, 0.5),
+    ("difference", 5.0, 0.0),
+)
+
+
+@dataclass
+class SimulatorConfig:
+    """Konfiguration des simulierten Controllers."""
+    heatpumps: int = 1
+    boilers: int = 1
+    buffers: int = 0
+    solar: int = 0
+    heating_circuits: int = 1
+    # Feste Latenz pro Anfrage und zusätzliche gleichverteilte Streuung (Sekunden)
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Rauschen in Roh-Einheiten (letzte Stelle), das auf Messwerte addiert wird
+    noise: int = 1
+    # Zeitraffer für die zeitabhängigen Werte (1.0 = Echtzeit)
+    time_scale: float = 1.0
+    seed: int = 0
+
+    def module_count(self, module_type: str) -> int:
+        """Anzahl der simulierten Module eines Typs."""
+        return {
+            "general_ambient": 1,
+            "e_manager": 1,
+            "heatpump": self.heatpumps,
+            "boiler": self.boilers,
+            "buffer": self.buffers,
+            "solar": self.solar,
+            "heatingcircuit": self.heating_circuits,
+        }[module_type]
+
+
+@dataclass
+class SimulatedRegister:
+    """Ein Wert der Register-Map; int32-Werte belegen zwei Register."""
+    name: str
+    address: int
+    data_format: str
+    factor: float
+    # Wert in physikalischer Einheit in Abhängigkeit von der Zeit in Sekunden
+    profile: Callable[[float], float]
+    writable: bool = False
+    noisy: bool = False
+    written: Optional[int] = None
+
+    @property
+    def width(self) -> int:
+        return 2 if self.data_format in ("int32", "float32") else 1
+
+
+@dataclass
+class SimulatorStatistics:
+    """Zähler für Anfragen und übertragene Bytes."""
+    requests: int = 0
+    exceptions: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    by_function: Dict[int, int] = field(default_factory=dict)
+    connections: int = 0
+
+    def reset(self) -> None:
+        self.requests = self.exceptions = self.bytes_in = self.bytes_out = 0
+        self.by_function.clear()
+
+
+# Zustandsfolgen je states_function, ein Schritt pro STATE_STEP Sekunden. Die
+# Folgen von Zustand (1002) und Betriebszustand (1003) der Wärmepumpe laufen
+# synchron: Verdichterstart, Regelung, Abtauung, Stopp.
+STATE_SEQUENCES = {
+    "get_hp_states": (3, 5, 7, 7, 7, 10, 7, 20),
+    "get_hp_operation_states": (0, 1, 1, 2, 1, 5, 1, 0),
+    "get_operating_states": (1,),
+    "get_boiler_operating_states": (0, 1),
+    "get_buffer_operating_states": (0, 1),
+    "get_solar_operating_states": (0, 1),
+}
+STATE_STEP = 60.0
+
+
+def is_setpoint(name: str, entry: dict) -> bool:
+    """Sollwert-artige Register haben einen Wertebereich oder "setting" im Namen."""
+    return "min" in entry or "setting" in name or "requested" in name
+
+
+def _temperature_profile(name: str, entry: dict, phase: float) -> Callable[[float], float]:
+    if "min" in entry and "max" in entry:
+        # Sollwert-ähnliche Register: konstant in der Mitte des erlaubten Bereichs
+        middle = round((entry["min"] + entry["max"]) / 2)
+        return lambda t: middle
+    for keyword, mean, amplitude in TEMPERATURE_PROFILES:
+        if keyword in name:
+            break
+    else:
+        mean, amplitude = 45.0, 2.0
+    if is_setpoint(name, entry):
+        return lambda t: mean
+    return lambda t: mean + amplitude * math.sin(2 * math.pi * t / 900.0 + phase)
+
+
+def _state_profile(entry: dict) -> Callable[[float], float]:
+    sequence = STATE_SEQUENCES.get(entry.get("states_function"), (0,))
+    return lambda t: sequence[int(t // STATE_STEP) % len(sequence)]
+
+
+def _build_profile(name: str, entry: dict, phase: float) -> Tuple[Callable[[float], float], bool]:
+    """Profil und Rausch-Eignung für einen Eintrag aus SENSOR_CONFIG."""
+    sensor_type = entry.get("type")
+    unit = entry.get("unit_of_measurement")
+    if sensor_type == "LambdaTemperaturSensor":
+        return _temperature_profile(name, entry, phase), not is_setpoint(name, entry)
+    if sensor_type == "LambdaFlowSensor":
+        return (lambda t: 1.2 + 0.1 * math.sin(2 * math.pi * t / 300.0 + phase)), True
+    if sensor_type == "LambdaPowerSensor":
+        mean = 6.0 if unit == "kW" else 1500.0
+        return (lambda t: mean * (1 + 0.3 * math.sin(2 * math.pi * t / 600.0 + phase))), True
+    if sensor_type == "LambdaPercentageSensor":
+        mean = 4.0 if "coefficient" in name else 60.0
+        return (lambda t: mean * (1 + 0.2 * math.sin(2 * math.pi * t / 600.0 + phase))), False
+    if sensor_type == "LambdaEnergySensor":
+        # Zählerstand in Wh, thermische Leistung ~4x elektrische
+        rate = 6000.0 if "thermal" in name else 1500.0
+        return (lambda t: 1_000_000 + rate * t / 3600.0), False
+    if sensor_type == "LambdaStateSensor":
+        return _state_profile(entry), False
+    return (lambda t: 0), False
+
+
+def build_register_map(config: SimulatorConfig) -> Dict[int, SimulatedRegister]:
+    """Erzeuge die Register-Map für die konfigurierten Modulanzahlen."""
+    const = import_integration_module("const")
+    registers: Dict[int, SimulatedRegister] = {}
+    rng = random.Random(config.seed)
+
+    for entry in const.SENSOR_CONFIG:
+        bereich = entry["bereich"]
+        module_type = bereich if bereich in MODULE_BASES else bereich.rsplit("_", 1)[0]
+        base = MODULE_BASES[module_type]
+        offset = entry["register"] - base
+        suffix = entry["name"][len(bereich):]
+
+        for index in range(config.module_count(module_type)):
+            address = base + index * 100 + offset
+            name = f"{module_type}_{index + 1}{suffix}" if bereich != module_type else entry["name"]
+            profile, noisy = _build_profile(entry["name"], entry, rng.uniform(0, 2 * math.pi))
+            registers[address] = SimulatedRegister(
+                name=name,
+                address=address,
+                data_format=entry.get("data_format", "int16"),
+                factor=entry.get("factor", 1) or 1,
+                profile=profile,
+                writable=module_type not in ("general_ambient", "e_manager") and offset >= WRITABLE_OFFSET,
+                noisy=noisy,
+            )
+    return registers
+
+
+class LambdaSimulator:
+    """Modbus-TCP-Server, der einen Lambda-Controller simuliert."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or SimulatorConfig()
+        self.host = host
+        self.port = port
+        self.registers = build_register_map(self.config)
+        self.stats = SimulatorStatistics()
+        self._words: Dict[int, Tuple[SimulatedRegister, int]] = {}
+        for register in self.registers.values():
+            for word in range(register.width):
+                self._words[register.address + word] = (register, word)
+        self._rng = random.Random(self.config.seed)
+        self._start = time.monotonic()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    # Register-Map
+
+    def elapsed(self) -> float:
+        """Simulierte Zeit seit dem Start in Sekunden."""
+        return (time.monotonic() - self._start) * self.config.time_scale
+
+    def raw_value(self, register: SimulatedRegister, t: Optional[float] = None) -> int:
+        """Aktueller Rohwert eines Registers (vorzeichenbehaftet für int-Typen)."""
+        if register.written is not None:
+            return register.written
+        value = round(register.profile(self.elapsed() if t is None else t) / register.factor)
+        if register.noisy and self.config.noise:
+            value += self._rng.randint(-self.config.noise, self.config.noise)
+        return value
+
+    def read_words(self, address: int, count: int) -> Optional[List[int]]:
+        """Lies count Register ab address oder None, wenn eines davon fehlt."""
+        t = self.elapsed()
+        words: List[int] = []
+        cache: Dict[int, bytes] = {}
+        for current in range(address, address + count):
+            located = self._words.get(current)
+            if located is None:
+                return None
+            register, word = located
+            packed = cache.get(register.address)
+            if packed is None:
+                packed = cache[register.address] = self._pack(register, self.raw_value(register, t))
+            words.append(struct.unpack_from(">H", packed, word * 2)[0])
+        return words
+
+    def write_words(self, address: int, values: List[int]) -> bool:
+        """Schreibe Register; nur Sollwert-Register sind beschreibbar."""
+        targets = [self._words.get(address + i) for i in range(len(values))]
+        if any(target is None or not target[0].writable for target in targets):
+            return False
+        for (register, word), value in zip(targets, values):
+            if register.width == 1:
+                register.written = struct.unpack(">h" if register.data_format == "int16" else ">H", struct.pack(">H", value))[0]
+            else:
+                packed = bytearray(self._pack(register, self.raw_value(register)))
+                struct.pack_into(">H", packed, word * 2, value)
+                register.written = struct.unpack(">i" if register.data_format == "int32" else ">f", bytes(packed))[0]
+        return True
+
+    @staticmethod
+    def _pack(register: SimulatedRegister, value) -> bytes:
+        if register.data_format == "int16":
+            return struct.pack(">h", max(-32768, min(32767, int(value))))
+        if register.data_format == "uint16":
+            return struct.pack(">H", max(0, min(65535, int(value))))
+        if register.data_format == "int32":
+            return struct.pack(">i", int(value))
+        return struct.pack(">f", float(value))
+
+    # Modbus TCP
+
+    async def start(self) -> None:
+        """Starte den Server; bei port=0 wird ein freier Port gewählt."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.info("Lambda simulator listening on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in self._connections.values():
+                task.cancel()
+            await asyncio.gather(*self._connections.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction_id, protocol_id, length, unit_id = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                self.stats.bytes_in += len(header) + len(pdu)
+
+                delay = self.config.latency
+                if self.config.jitter:
+                    delay += self._rng.uniform(0, self.config.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                response = self.handle_pdu(pdu)
+                frame = struct.pack(">HHHB", transaction_id, protocol_id, len(response) + 1, unit_id) + response
+                self.stats.bytes_out += len(frame)
+                writer.write(frame)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    def handle_pdu(self, pdu: bytes) -> bytes:
+        """Beantworte eine Modbus-PDU (ohne MBAP-Header)."""
+        function_code = pdu[0]
+        self.stats.requests += 1
+        self.stats.by_function[function_code] = self.stats.by_function.get(function_code, 0) + 1
+
+        if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            address, count = struct.unpack_from(">HH", pdu, 1)
+            if not 1 <= count <= 125:
+                return self._exception(function_code, ILLEGAL_DATA_VALUE)
+            words = self.read_words(address, count)
+            if words is None:
+                return self._exception(function_code, ILLEGAL_DATA_ADDRESS)
+            return struct.pack(f">BB{count}H", function_code, count * 2, *words)
+
+        if function_code == WRITE_SINGLE_REGISTER:
+            address, value = struct.unpack_from(">HH", pdu, 1)
+            if not self.write_words(address, [value]):
+                return self._exception(function_code, ILLEGAL_DATA_ADDRESS)
+            return pdu[:5]
+
+        if function_code == WRITE_MULTIPLE_REGISTERS:
+            address, count, _ = struct.unpack_from(">HHB", pdu, 1)
+            values = list(struct.unpack_from(f">{count}H", pdu, 6))
+            if not self.write_words(address, values):
+                return self._exception(function_code, ILLEGAL_DATA_ADDRESS)
+            return struct.pack(">BHH", function_code, address, count)
+
+        return self._exception(function_code, ILLEGAL_FUNCTION)
+
+    def _exception(self, function_code: int, code: int) -> bytes:
+        self.stats.exceptions += 1
+        return struct.pack(">BB", function_code | 0x80, code)
+
+
+class SimulatorThread:
+    """Betreibt einen LambdaSimulator in einem eigenen Thread mit eigenem Event-Loop.
+
+    So kann auch ein blockierender Modbus-Client im Test-Thread gegen den
+    Simulator laufen. Andere Server mit start()/stop() (z. B. der
+    FaultProxy) lassen sich auf die gleiche Weise betreiben.
+    """
+
+    def __init__(self, simulator: LambdaSimulator):
+        self.simulator = simulator
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="lambda_simulator", daemon=True)
+
+    def start(self) -> LambdaSimulator:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.simulator.start(), self._loop).result(timeout=10)
+        return self.simulator
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.simulator.stop(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+
+    def __enter__(self) -> LambdaSimulator:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_simulator_arguments(parser: argparse.ArgumentParser) -> None:
+    """Gemeinsame Kommandozeilenoptionen für die Modulanzahlen und die Latenz."""
+    parser.add_argument("--heatpumps", type=int, default=1)
+    parser.add_argument("--boilers", type=int, default=1)
+    parser.add_argument("--buffers", type=int, default=0)
+    parser.add_argument("--solar", type=int, default=0)
+    parser.add_argument("--heating-circuits", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latenz pro Anfrage in Sekunden")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Zusätzliche zufällige Latenz in Sekunden")
+    parser.add_argument("--noise", type=int, default=1, help="Rauschen in Roh-Einheiten")
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_arguments(args: argparse.Namespace) -> SimulatorConfig:
+    return SimulatorConfig(
+        heatpumps=args.heatpumps,
+        boilers=args.boilers,
+        buffers=args.buffers,
+        solar=args.solar,
+        heating_circuits=args.heating_circuits,
+        latency=args.latency,
+        jitter=args.jitter,
+        noise=args.noise,
+        time_scale=args.time_scale,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulierter Lambda-Controller (Modbus TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    add_simulator_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    simulator = LambdaSimulator(config_from_arguments(args), host=args.host, port=args.port)
+    _LOGGER.info("Simulating %d registers", len(simulator.registers))
+    try:
+        asyncio.run(simulator.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Zeitleiste der Modbus-Anfragen im Chrome Trace Event Format.
+
+Die Ereignisse landen in einem Ringpuffer fester Größe und lassen sich für
+die letzten N Sekunden als JSON exportieren, das Perfetto
+(https://ui.perfetto.dev) und chrome://tracing direkt öffnen.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Bei etwa 100 Ereignissen pro Zyklus gut eine halbe Stunde mit 10 s Intervall
+TRACE_BUFFER_SIZE = 20000
+DEFAULT_TRACE_SECONDS = 300
+TRACE_SUFFIX = ".json"
+
+# Spuren (Thread-IDs) in der Zeitleiste
+TID_LOOP = 1
+TID_MODBUS = 2
+THREAD_NAMES = {TID_LOOP: "event loop", TID_MODBUS: "modbus thread"}
+
+CAT_CYCLE = "cycle"
+CAT_EXECUTOR = "executor"
+CAT_TRANSPORT = "transport"
+CAT_DECODE = "decode"
+CAT_NOTIFY = "notify"
+
+# (Zeitstempel, Phase, Name, Kategorie, Spur, Dauer, Argumente); Zeiten in
+# Sekunden von time.perf_counter()
+TraceEvent = Tuple[float, str, str, str, int, float, Optional[Dict[str, Any]]]
+
+
+class TraceRecorder:
+    """Ringpuffer für Trace-Ereignisse.
+
+    deque.append ist atomar, daher dürfen Event-Loop und Modbus-Thread ohne
+    Sperre schreiben; nur der Export kopiert den Puffer unter einer Sperre.
+    """
+
+    def __init__(self, name: str, capacity: int = TRACE_BUFFER_SIZE):
+        self.name = name
+        self.started = time.time()
+        self._events: Deque[TraceEvent] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def complete(
+        self, name: str, category: str, start: float, end: float, tid: int,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Abschnitt mit Dauer (Phase "X")."""
+        self._events.append((start, "X", name, category, tid, end - start, args))
+
+    def instant(
+        self, name: str, category: str, timestamp: float, tid: int,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Zeitpunkt ohne Dauer (Phase "i")."""
+        self._events.append((timestamp, "i", name, category, tid, 0.0, args))
+
+    def export(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Ereignisse der letzten seconds Sekunden (alle bei None) als Trace-JSON."""
+        with self._lock:
+            events = list(self._events)
+        if seconds is not None:
+            since = time.perf_counter() - seconds
+            events = [event for event in events if event[0] + event[5] >= since]
+
+        trace: List[Dict[str, Any]] = [
+            {"ph": "M", "pid": 1, "tid": 0, "name": "process_name", "args": {"name": self.name}},
+        ]
+        trace.extend(
+            {"ph": "M", "pid": 1, "tid": tid, "name": "thread_name", "args": {"name": name}}
+            for tid, name in THREAD_NAMES.items()
+        )
+        for timestamp, phase, name, category, tid, duration, args in events:
+            event: Dict[str, Any] = {
+                "ph": phase,
+                "name": name,
+                "cat": category,
+                "pid": 1,
+                "tid": tid,
+                "ts": round(timestamp * 1e6, 1),
+            }
+            if phase == "X":
+                event["dur"] = round(duration * 1e6, 1)
+            else:
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str, seconds: Optional[float] = None) -> int:
+        """Schreibe den Export nach path und liefere die Anzahl der Ereignisse."""
+        trace = self.export(seconds)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(trace, file, separators=(",", ":"))
+        return len(trace["traceEvents"]) - 1 - len(THREAD_NAMES)